@@ -1,25 +1,71 @@
+import asyncio
 import time
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
-import dotenv
-
-from agents.aggregation.prompt import research_aggregation_prompt
+from agents.aggregation.prompt import build_aggregation_prompt
 from models.state import EquityResearchState
-from agents.shared.agent_utils import run_agent_with_tools
+from agents.shared.agent_utils import _extract_token_usage, check_token_budget
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
+from agents.shared.openai_direct import chat_complete, count_tokens
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
-from models.metrics import AgentMetrics
+from models.metrics import AgentMetrics, TokenUsage
+from util.logger import get_logger
+from util.env import load_env
 
 
-dotenv.load_dotenv()
+load_env()
+logger = get_logger(__name__)
 
 AGENT_NAME = "aggregation"
 
+# Defaults for batched aggregation across tickers
+DEFAULT_BATCH_SIZE = 5
+DEFAULT_BATCH_DELAY = 1.0  # seconds between batches to respect rate limits
+
+
+def _run_aggregation(
+    prompt: str,
+    model: str,
+    config: AgentTokenConfig,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, TokenUsage]:
+    """Call the OpenAI SDK directly; aggregation needs no LangChain features."""
+    # Check token budget before the call
+    if config.token_budget:
+        try:
+            input_tokens = count_tokens(model, prompt)
+            if not check_token_budget(input_tokens, config.token_budget):
+                logger.warning(
+                    f"Token budget would be exceeded by input: {input_tokens}/{config.token_budget}"
+                )
+                return (
+                    f"Token budget exceeded by input: {input_tokens}/{config.token_budget} tokens",
+                    TokenUsage(input_tokens=input_tokens, total_tokens=input_tokens),
+                )
+        except Exception as e:
+            logger.warning(f"Could not estimate tokens before call: {e}")
+
+    try:
+        return chat_complete(
+            model,
+            prompt,
+            temperature=0.2,
+            max_tokens=config.max_output_tokens,
+            stream=on_token is not None,
+            on_token=on_token,
+        )
+    except Exception as e:
+        logger.error(f"Error in aggregation: {e}", exc_info=True)
+        return f"Error executing agent: {str(e)}", TokenUsage()
+
 
 def get_aggregated_sentiment(
     state: EquityResearchState,
     iteration: int = 1,
     token_config: Optional[AgentTokenConfig] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[str, AgentMetrics]:
     """
     Aggregate sentiment from all research agents.
@@ -28,37 +74,24 @@ def get_aggregated_sentiment(
         state: The current equity research state
         iteration: The iteration number (1-based) for the aggregation loop
         token_config: Optional token configuration for this agent
+        on_token: Optional callback to stream the report as it is generated
+        budget_pool: Optional request-wide pool to reserve tokens from
 
     Returns:
         Tuple of (aggregated sentiment string, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.aggregation
     model = LLM_MODELS["open_ai_smart"]
 
-    if state.feedback:
-        prompt = f"Your original response: {state.combined_sentiment}. Revise your response based on this feedback: {state.feedback}"
-    else:
-        prompt = f"{research_aggregation_prompt}\n\nAggregate the following equity research:\n\n"
-        prompt += f"Ticker: {state.ticker}\n"
-        prompt += f"Trade Duration: {state.trade_duration.value}\n"
-        prompt += f"Trade Direction: {state.trade_direction.value}"
-        prompt += f"Fundamental Analysis:\n{state.fundamental_sentiment}\n\n"
-        prompt += f"Technical Analysis:\n{state.technical_sentiment}\n\n"
-        prompt += f"Macro Analysis:\n{state.macro_sentiment}\n\n"
-        prompt += f"Peer Analysis:\n{state.peer_sentiment}\n\n"
-        prompt += f"Industry Analysis:\n{state.industry_sentiment}\n\n"
-        prompt += f"Headline Analysis:\n{state.headline_sentiment}\n\n"
-        prompt += f"SEC Filings Analysis:\n{state.filings_sentiment}\n\n"
+    prompt = build_aggregation_prompt(state)
 
-    llm = get_openai_llm(
-        model=model,
-        temperature=0.2,
-        max_tokens=config.max_output_tokens,
-    )
-    result, token_usage = run_agent_with_tools(
-        llm, prompt, track_tokens=True, token_budget=config.token_budget
-    )
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = _run_aggregation(prompt, model, config, on_token)
+        reservation.commit(token_usage.total_tokens)
 
     # Check if budget was exceeded
     budget_exceeded = False
@@ -76,3 +109,71 @@ def get_aggregated_sentiment(
         budget_exceeded=budget_exceeded,
     )
     return result, metrics
+
+
+async def get_aggregated_sentiment_batch(
+    states: List[EquityResearchState],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    delay: float = DEFAULT_BATCH_DELAY,
+    token_config: Optional[AgentTokenConfig] = None,
+) -> List[Tuple[Optional[str], AgentMetrics]]:
+    """
+    Aggregate sentiment for several tickers with batched LLM requests.
+
+    Args:
+        states: Research states to aggregate, one per ticker
+        batch_size: Maximum number of concurrent requests per batch
+        delay: Seconds to wait between batches
+        token_config: Optional token configuration for this agent
+
+    Returns:
+        List of (aggregated sentiment string, AgentMetrics) aligned with states.
+        The sentiment is None for any ticker whose request failed.
+    """
+    config = token_config or DEFAULT_TOKEN_CONFIG.aggregation
+    model = LLM_MODELS["open_ai_smart"]
+    llm = get_openai_llm(
+        model=model,
+        temperature=0.2,
+        max_tokens=config.max_output_tokens,
+    )
+
+    results = []
+    for start in range(0, len(states), batch_size):
+        if start:
+            await asyncio.sleep(delay)
+
+        batch = states[start : start + batch_size]
+        prompts = [build_aggregation_prompt(state) for state in batch]
+        start_time = time.perf_counter()
+        responses = await llm.abatch(
+            prompts, config={"max_concurrency": batch_size}, return_exceptions=True
+        )
+        latency_ms = (time.perf_counter() - start_time) * 1000
+
+        for state, response in zip(batch, responses):
+            if isinstance(response, Exception):
+                logger.error(
+                    f"Batched aggregation failed for {state.ticker}: {response}"
+                )
+                result, token_usage = None, TokenUsage()
+            else:
+                result, token_usage = response.content, _extract_token_usage(response)
+
+            budget_exceeded = bool(
+                config.token_budget and token_usage.total_tokens > config.token_budget
+            )
+            results.append(
+                (
+                    result,
+                    AgentMetrics(
+                        agent_name=f"{AGENT_NAME}_{state.ticker}",
+                        latency_ms=latency_ms,
+                        token_usage=token_usage,
+                        model=model,
+                        budget_exceeded=budget_exceeded,
+                    ),
+                )
+            )
+
+    return results
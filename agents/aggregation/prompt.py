@@ -1,3 +1,7 @@
+from string import Template
+
+from models.state import EquityResearchState
+
 research_aggregation_prompt = """
     You are a senior equity research analyst responsible for synthesizing multiple research perspectives 
     into a cohesive investment thesis. You structure a compelling narrative intended for a sophisticated financial audience.
@@ -58,3 +62,47 @@ research_aggregation_prompt = """
     
     Keep your entire response under 400 words. Be decisive yet acknowledge uncertainty where appropriate.
     """
+
+# Templates are compiled once at import so every call shares a byte-identical
+# static prefix, which keeps it eligible for provider-side prompt caching
+AGGREGATION_TEMPLATE = Template(
+    research_aggregation_prompt
+    + "\n\nAggregate the following equity research:\n\n"
+    "Ticker: $ticker\n"
+    "Trade Duration: $trade_duration\n"
+    "Trade Direction: $trade_direction\n\n"
+    "Fundamental Analysis:\n$fundamental_sentiment\n\n"
+    "Technical Analysis:\n$technical_sentiment\n\n"
+    "Macro Analysis:\n$macro_sentiment\n\n"
+    "Peer Analysis:\n$peer_sentiment\n\n"
+    "Industry Analysis:\n$industry_sentiment\n\n"
+    "Headline Analysis:\n$headline_sentiment\n\n"
+    "SEC Filings Analysis:\n$filings_sentiment\n\n"
+)
+
+REVISION_TEMPLATE = Template(
+    research_aggregation_prompt
+    + "\n\nYour original response: $combined_sentiment. "
+    "Revise your response based on this feedback: $feedback"
+)
+
+
+def build_aggregation_prompt(state: EquityResearchState) -> str:
+    """Build the aggregation prompt, or the revision prompt if feedback exists."""
+    if state.feedback:
+        return REVISION_TEMPLATE.substitute(
+            combined_sentiment=state.combined_sentiment,
+            feedback=state.feedback,
+        )
+    return AGGREGATION_TEMPLATE.substitute(
+        ticker=state.ticker,
+        trade_duration=state.trade_duration.value,
+        trade_direction=state.trade_direction.value,
+        fundamental_sentiment=state.fundamental_sentiment,
+        technical_sentiment=state.technical_sentiment,
+        macro_sentiment=state.macro_sentiment,
+        peer_sentiment=state.peer_sentiment,
+        industry_sentiment=state.industry_sentiment,
+        headline_sentiment=state.headline_sentiment,
+        filings_sentiment=state.filings_sentiment,
+    )
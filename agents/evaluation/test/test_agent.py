@@ -0,0 +1,36 @@
+from agents.evaluation.agent import _fast_compliance_check
+
+COMPLIANT_SENTIMENT = """
+**Summary of Research Findings:**
+- Fundamental: Strong margins.
+
+Consensus and Divergence:
+- Consensus: Growth is intact.
+
+Weighting of Perspectives:
+- Fundamental 40%
+
+**Overall Sentiment:** BULLISH
+
+**Conclusion:** Fundamentals support the long thesis.
+"""
+
+
+class TestFastComplianceCheck:
+    def test_compliant_structure(self):
+        assert _fast_compliance_check(COMPLIANT_SENTIMENT) is True
+
+    def test_missing_section(self):
+        sentiment = COMPLIANT_SENTIMENT.replace("Weighting of Perspectives:", "")
+        assert _fast_compliance_check(sentiment) is None
+
+    def test_invalid_overall_sentiment(self):
+        sentiment = COMPLIANT_SENTIMENT.replace("BULLISH", "MIXED")
+        assert _fast_compliance_check(sentiment) is None
+
+    def test_too_long(self):
+        sentiment = COMPLIANT_SENTIMENT + " word" * 400
+        assert _fast_compliance_check(sentiment) is None
+
+    def test_empty(self):
+        assert _fast_compliance_check("") is None
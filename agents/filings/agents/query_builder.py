@@ -4,12 +4,17 @@ Generates contextual search queries based on ticker, trade direction, and trade
 """
 
 import time
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
-from agents.filings.prompts.query_builder_prompt import query_builder_prompt
+from agents.filings.prompts.query_builder_prompt import QUERY_BUILDER_TEMPLATE
 from agents.filings.util import _get_trade_direction_desc, _get_trade_duration_desc
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
-from agents.shared.agent_utils import invoke_llm_with_metrics
+from agents.shared.agent_utils import (
+    ainvoke_llm_with_metrics,
+    invoke_llm_with_metrics,
+)
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from util.logger import get_logger
 from models.agent import QueryBuilderOutput
@@ -21,12 +26,84 @@ logger = get_logger(__name__)
 
 AGENT_NAME = "filings_query_builder"
 
+_DEFAULT_SHORT_QUERIES = (
+    "risk factors material risks",
+    "debt obligations liquidity concerns",
+    "competitive threats market challenges",
+    "declining revenue margin pressure",
+    "management turnover governance issues",
+)
+
+_DEFAULT_LONG_QUERIES = (
+    "revenue growth trends performance",
+    "competitive advantages market position",
+    "management guidance positive outlook",
+    "strategic initiatives growth drivers",
+    "strong cash flow financial health",
+)
+
+
+@lru_cache(maxsize=64)
+def _build_query_builder_prompt(
+    ticker: str, trade_direction: TradeDirection, trade_duration: TradeDuration
+) -> str:
+    """Format the query builder prompt, memoized per trading context."""
+    return QUERY_BUILDER_TEMPLATE.substitute(
+        ticker=ticker,
+        trade_direction=trade_direction.value,
+        trade_direction_desc=_get_trade_direction_desc(trade_direction),
+        trade_duration=trade_duration.value,
+        trade_duration_desc=_get_trade_duration_desc(trade_duration),
+    )
+
+
+def _get_query_builder_llm(config: AgentTokenConfig):
+    return get_openai_llm(
+        model=LLM_MODELS["open_ai_fast"],
+        temperature=0.3,
+        max_tokens=config.max_output_tokens,
+    )
+
+
+def _finish_search_queries(
+    ticker: str,
+    trade_direction: TradeDirection,
+    result: Optional[QueryBuilderOutput],
+    token_usage: TokenUsage,
+    config: AgentTokenConfig,
+    start_time: float,
+) -> Tuple[List[str], AgentMetrics]:
+    """Build metrics and pick generated or default queries from an LLM result."""
+    # Check if budget was exceeded
+    budget_exceeded = bool(
+        config.token_budget and token_usage.total_tokens > config.token_budget
+    )
+
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    metrics = AgentMetrics(
+        agent_name=AGENT_NAME,
+        latency_ms=latency_ms,
+        token_usage=token_usage,
+        model=LLM_MODELS["open_ai_fast"],
+        budget_exceeded=budget_exceeded,
+    )
+
+    if result and result.search_queries:
+        logger.info(
+            f"Generated {len(result.search_queries)} search queries for {ticker}"
+        )
+        return result.search_queries, metrics
+
+    logger.warning(f"No search queries generated for {ticker}, using defaults")
+    return _get_default_queries(trade_direction), metrics
+
 
 def generate_search_queries(
     ticker: str,
     trade_direction: TradeDirection,
     trade_duration: TradeDuration,
     token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[List[str], AgentMetrics]:
     """
     Generate contextual search queries for SEC filings retrieval.
@@ -36,85 +113,66 @@ def generate_search_queries(
         trade_direction: Direction of the trade (long/short)
         trade_duration: Duration of the trade (day/swing/position)
         token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from. If it
+                     cannot cover the call, the default queries are used.
 
     Returns:
         Tuple of (list of search queries, AgentMetrics)
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.filings_query_builder
-    model = LLM_MODELS["open_ai_fast"]
     token_usage = TokenUsage()
-    budget_exceeded = False
+    result = None
 
-    prompt = query_builder_prompt.format(
-        ticker=ticker,
-        trade_direction=trade_direction.value,
-        trade_direction_desc=_get_trade_direction_desc(trade_direction),
-        trade_duration=trade_duration.value,
-        trade_duration_desc=_get_trade_duration_desc(trade_duration),
-    )
+    prompt = _build_query_builder_prompt(ticker, trade_direction, trade_duration)
+    llm = _get_query_builder_llm(config)
 
-    llm = get_openai_llm(
-        model=model,
-        temperature=0.3,
-        max_tokens=config.max_output_tokens,
+    try:
+        with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+            result, token_usage = invoke_llm_with_metrics(
+                llm, prompt, QueryBuilderOutput, token_budget=config.token_budget
+            )
+            reservation.commit(token_usage.total_tokens)
+    except Exception as e:
+        logger.error(f"Error generating search queries: {e}", exc_info=True)
+
+    return _finish_search_queries(
+        ticker, trade_direction, result, token_usage, config, start_time
     )
 
-    try:
-        result, token_usage = invoke_llm_with_metrics(
-            llm, prompt, QueryBuilderOutput, token_budget=config.token_budget
-        )
 
-        # Check if budget was exceeded
-        if config.token_budget and token_usage.total_tokens > config.token_budget:
-            budget_exceeded = True
-
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        metrics = AgentMetrics(
-            agent_name=AGENT_NAME,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
-            model=model,
-            budget_exceeded=budget_exceeded,
-        )
+async def agenerate_search_queries(
+    ticker: str,
+    trade_direction: TradeDirection,
+    trade_duration: TradeDuration,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[List[str], AgentMetrics]:
+    """Async variant of generate_search_queries."""
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.filings_query_builder
+    token_usage = TokenUsage()
+    result = None
 
-        if result and result.search_queries:
-            logger.info(
-                f"Generated {len(result.search_queries)} search queries for {ticker}"
-            )
-            return result.search_queries, metrics
-        else:
-            logger.warning(f"No search queries generated for {ticker}, using defaults")
-            return _get_default_queries(trade_direction), metrics
+    prompt = _build_query_builder_prompt(ticker, trade_direction, trade_duration)
+    llm = _get_query_builder_llm(config)
 
+    try:
+        with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+            result, token_usage = await ainvoke_llm_with_metrics(
+                llm, prompt, QueryBuilderOutput, token_budget=config.token_budget
+            )
+            reservation.commit(token_usage.total_tokens)
     except Exception as e:
         logger.error(f"Error generating search queries: {e}", exc_info=True)
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        metrics = AgentMetrics(
-            agent_name=AGENT_NAME,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
-            model=model,
-            budget_exceeded=budget_exceeded,
-        )
-        return _get_default_queries(trade_direction), metrics
+
+    return _finish_search_queries(
+        ticker, trade_direction, result, token_usage, config, start_time
+    )
 
 
 def _get_default_queries(trade_direction: TradeDirection) -> List[str]:
     """Return default queries as fallback based on trade direction."""
     if trade_direction == TradeDirection.SHORT:
-        return [
-            "risk factors material risks",
-            "debt obligations liquidity concerns",
-            "competitive threats market challenges",
-            "declining revenue margin pressure",
-            "management turnover governance issues",
-        ]
-    else:
-        return [
-            "revenue growth trends performance",
-            "competitive advantages market position",
-            "management guidance positive outlook",
-            "strategic initiatives growth drivers",
-            "strong cash flow financial health",
-        ]
+        return list(_DEFAULT_SHORT_QUERIES)
+    return list(_DEFAULT_LONG_QUERIES)
@@ -1,10 +1,19 @@
 """SEC Filings retrieval agent."""
 
+import asyncio
+import heapq
+import io
 import time
 from typing import List, Optional, Tuple
 
-from agents.filings.tools.tools import search_filings, FilingSearchResult
-from data.util.vector_store import collection_exists, get_collection_stats
+from agents.filings.tools.tools import search_filings_batch, FilingSearchResult
+from agents.filings.util import (
+    _NearDuplicateIndex,
+    _content_key,
+    _shingle_hashes,
+    _simhash,
+)
+from data.util.vector_store import get_collection_count
 from util.logger import get_logger
 from models.metrics import AgentMetrics, TokenUsage
 
@@ -12,6 +21,8 @@ logger = get_logger(__name__)
 
 AGENT_NAME = "filings_retrieval"
 
+MAX_CONTEXT_RESULTS = 15
+
 
 DEFAULT_SEARCH_TOPICS = [
     "risk factors material risks",
@@ -40,25 +51,37 @@ def _gather_filing_context(
     """
     topics = search_queries if search_queries else DEFAULT_SEARCH_TOPICS
     all_results = []
-    seen_texts = set()
+    seen_keys = set()
+    near_duplicates = _NearDuplicateIndex()
+
+    # one batched vector store query covers every topic
+    results_per_topic = search_filings_batch(
+        ticker=ticker,
+        queries=topics,
+        top_k=top_k_per_topic,
+    )
 
-    for topic in topics:
-        results = search_filings(
-            ticker=ticker,
-            query=topic,
-            top_k=top_k_per_topic,
-        )
+    for results in results_per_topic:
         for result in results:
-            # Deduplicate by text content (first 100 chars)
-            text_key = result.text[:100]
-            if text_key not in seen_texts:
-                seen_texts.add(text_key)
-                all_results.append(result)
-
-    # Sort by relevance score
-    all_results.sort(key=lambda x: x.relevance_score, reverse=True)
-
-    return all_results[:15]  # Limit total context
+            # The same chunk is often returned for several topics; an exact
+            # content hash catches those without computing a signature
+            key = _content_key(result.text)
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+
+            # Skip near-duplicates, e.g. the same paragraph reissued with a new date
+            shingles = _shingle_hashes(result.text)
+            signature = _simhash(result.text, shingles)
+            if near_duplicates.is_near_duplicate(signature, shingles):
+                continue
+            near_duplicates.add(signature, shingles)
+            all_results.append(result)
+
+    # Keep the most relevant results to limit total context
+    return heapq.nlargest(
+        MAX_CONTEXT_RESULTS, all_results, key=lambda x: x.relevance_score
+    )
 
 
 def get_filings_context(
@@ -81,8 +104,8 @@ def get_filings_context(
     model = "retrieval"
     token_usage = TokenUsage()
 
-    # Check if we have any filings
-    if not collection_exists(ticker):
+    # Check if we have any filings with a single lookup
+    if get_collection_count(ticker) == 0:
         logger.warning(f"No filings available for {ticker}")
         latency_ms = (time.perf_counter() - start_time) * 1000
         metrics = AgentMetrics(
@@ -93,18 +116,6 @@ def get_filings_context(
         )
         return None, metrics
 
-    stats = get_collection_stats(ticker)
-    if stats.get("document_count", 0) == 0:
-        logger.warning(f"Empty filings collection for {ticker}")
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        metrics = AgentMetrics(
-            agent_name=AGENT_NAME,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
-            model=model,
-        )
-        return None, metrics
-
     filing_results = _gather_filing_context(ticker, search_queries)
 
     if not filing_results:
@@ -118,13 +129,15 @@ def get_filings_context(
         )
         return None, metrics
 
-    context_parts = [f"SEC Filing excerpts for {ticker}:\n"]
+    buf = io.StringIO()
+    buf.write(f"SEC Filing excerpts for {ticker}:\n")
     for result in filing_results:
-        context_parts.append(
+        buf.write(
             f"\n[{result.filing_type} | {result.section} | {result.filing_date}]\n"
-            f"{result.text}\n"
         )
-    context = "".join(context_parts)
+        buf.write(result.text)
+        buf.write("\n")
+    context = buf.getvalue()
 
     latency_ms = (time.perf_counter() - start_time) * 1000
     metrics = AgentMetrics(
@@ -134,3 +147,16 @@ def get_filings_context(
         model=model,
     )
     return context, metrics
+
+
+async def aget_filings_context(
+    ticker: str,
+    search_queries: Optional[List[str]] = None,
+) -> Tuple[Optional[str], AgentMetrics]:
+    """
+    Async variant of get_filings_context.
+
+    Chroma queries are blocking, so retrieval runs in a worker thread to let
+    the event loop progress other tickers meanwhile.
+    """
+    return await asyncio.to_thread(get_filings_context, ticker, search_queries)
@@ -1,11 +1,15 @@
 """SEC Filings synthesis agent."""
 
 import time
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 
 from agents.filings.prompts.synthesis_prompt import filings_synthesis_prompt
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
-from agents.shared.agent_utils import invoke_llm_with_metrics
+from agents.shared.agent_utils import (
+    ainvoke_llm_with_metrics,
+    invoke_llm_with_metrics,
+)
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from util.logger import get_logger
 from models.agent import FilingsSentimentOutput
@@ -16,10 +20,43 @@ logger = get_logger(__name__)
 AGENT_NAME = "filings_synthesis"
 
 
+_SYNTHESIS_PREFIX = filings_synthesis_prompt + "\n\n"
+
+
+def _build_synthesis_prompt(context: str) -> str:
+    return _SYNTHESIS_PREFIX + context
+
+
+def _get_synthesis_llm(config: AgentTokenConfig):
+    return get_openai_llm(
+        model=LLM_MODELS["open_ai_smart"],
+        temperature=0.1,
+        max_tokens=config.max_output_tokens,
+    )
+
+
+def _build_metrics(
+    token_usage: TokenUsage, config: AgentTokenConfig, start_time: float
+) -> AgentMetrics:
+    # Check if budget was exceeded
+    budget_exceeded = bool(
+        config.token_budget and token_usage.total_tokens > config.token_budget
+    )
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    return AgentMetrics(
+        agent_name=AGENT_NAME,
+        latency_ms=latency_ms,
+        token_usage=token_usage,
+        model=LLM_MODELS["open_ai_smart"],
+        budget_exceeded=budget_exceeded,
+    )
+
+
 def generate_filings_sentiment(
     ticker: str,
     context: str,
     token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[Optional[FilingsSentimentOutput], AgentMetrics]:
     """
     Generate sentiment analysis from SEC filings context.
@@ -28,62 +65,112 @@ def generate_filings_sentiment(
         ticker: Stock ticker symbol
         context: Retrieved context from SEC filings
         token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from. If it
+                     cannot cover the call, no analysis is returned.
 
     Returns:
         Tuple of (FilingsSentimentOutput or None, AgentMetrics)
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.filings_synthesis
-    model = LLM_MODELS["open_ai_smart"]
     token_usage = TokenUsage()
-    budget_exceeded = False
 
     if not context:
         logger.warning(f"No context provided for filings synthesis for {ticker}")
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        metrics = AgentMetrics(
-            agent_name=AGENT_NAME,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
-            model=model,
-        )
-        return None, metrics
+        return None, _build_metrics(token_usage, config, start_time)
 
-    prompt = f"{filings_synthesis_prompt}\n\n{context}"
+    prompt = _build_synthesis_prompt(context)
 
     # Get LLM and generate structured output
-    llm = get_openai_llm(
-        model=model,
-        temperature=0.1,
-        max_tokens=config.max_output_tokens,
-    )
+    llm = _get_synthesis_llm(config)
 
     try:
-        result, token_usage = invoke_llm_with_metrics(
-            llm, prompt, FilingsSentimentOutput, token_budget=config.token_budget
-        )
-
-        # Check if budget was exceeded
-        if config.token_budget and token_usage.total_tokens > config.token_budget:
-            budget_exceeded = True
-
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        metrics = AgentMetrics(
-            agent_name=AGENT_NAME,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
-            model=model,
-            budget_exceeded=budget_exceeded,
-        )
-        return result, metrics
+        with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+            result, token_usage = invoke_llm_with_metrics(
+                llm, prompt, FilingsSentimentOutput, token_budget=config.token_budget
+            )
+            reservation.commit(token_usage.total_tokens)
+        return result, _build_metrics(token_usage, config, start_time)
     except Exception as e:
         logger.error(f"Error generating filings sentiment: {e}", exc_info=True)
-        latency_ms = (time.perf_counter() - start_time) * 1000
-        metrics = AgentMetrics(
-            agent_name=AGENT_NAME,
-            latency_ms=latency_ms,
-            token_usage=token_usage,
-            model=model,
-            budget_exceeded=budget_exceeded,
-        )
-        return None, metrics
+        return None, _build_metrics(token_usage, config, start_time)
+
+
+async def agenerate_filings_sentiment(
+    ticker: str,
+    context: str,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[Optional[FilingsSentimentOutput], AgentMetrics]:
+    """Async variant of generate_filings_sentiment."""
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.filings_synthesis
+    token_usage = TokenUsage()
+
+    if not context:
+        logger.warning(f"No context provided for filings synthesis for {ticker}")
+        return None, _build_metrics(token_usage, config, start_time)
+
+    prompt = _build_synthesis_prompt(context)
+    llm = _get_synthesis_llm(config)
+
+    try:
+        with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+            result, token_usage = await ainvoke_llm_with_metrics(
+                llm, prompt, FilingsSentimentOutput, token_budget=config.token_budget
+            )
+            reservation.commit(token_usage.total_tokens)
+        return result, _build_metrics(token_usage, config, start_time)
+    except Exception as e:
+        logger.error(f"Error generating filings sentiment: {e}", exc_info=True)
+        return None, _build_metrics(token_usage, config, start_time)
+
+
+def generate_filings_sentiment_stream(
+    ticker: str,
+    context: str,
+    token_config: Optional[AgentTokenConfig] = None,
+    on_partial: Optional[Callable[[dict], None]] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[Optional[FilingsSentimentOutput], AgentMetrics]:
+    """
+    Generate sentiment analysis from SEC filings context, streaming partial output.
+
+    Args:
+        ticker: Stock ticker symbol
+        context: Retrieved context from SEC filings
+        token_config: Optional token configuration for this agent
+        on_partial: Optional callback receiving the partially parsed output as a
+                    dict as streamed chunks extend it
+        budget_pool: Optional request-wide pool to reserve tokens from. If it
+                     cannot cover the call, no analysis is returned.
+
+    Returns:
+        Tuple of (FilingsSentimentOutput or None, AgentMetrics)
+    """
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.filings_synthesis
+    token_usage = TokenUsage()
+
+    if not context:
+        logger.warning(f"No context provided for filings synthesis for {ticker}")
+        return None, _build_metrics(token_usage, config, start_time)
+
+    prompt = _build_synthesis_prompt(context)
+    llm = _get_synthesis_llm(config)
+
+    try:
+        with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+            result, token_usage = invoke_llm_with_metrics(
+                llm,
+                prompt,
+                FilingsSentimentOutput,
+                token_budget=config.token_budget,
+                stream=True,
+                on_partial=on_partial,
+            )
+            reservation.commit(token_usage.total_tokens)
+        return result, _build_metrics(token_usage, config, start_time)
+    except Exception as e:
+        logger.error(f"Error streaming filings sentiment: {e}", exc_info=True)
+        return None, _build_metrics(token_usage, config, start_time)
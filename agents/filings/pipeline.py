@@ -0,0 +1,132 @@
+"""Async SEC filings pipeline for analyzing several tickers at once.
+
+Each ticker runs ingestion and query building concurrently, then retrieval and
+synthesis. Tickers are gathered on one event loop so their LLM and vector store
+waits overlap.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from agents.filings.agents.query_builder import agenerate_search_queries
+from agents.filings.agents.retriever import aget_filings_context
+from agents.filings.agents.synthesis import agenerate_filings_sentiment
+from agents.shared.token_config import TokenBudgetConfig, get_token_config
+from data.util.ingest_sec_filings import ensure_filings_ingested
+from models.metrics import RequestMetrics
+from models.state import TradeDirection, TradeDuration
+from util.formating import format_sentiment_output
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def _aensure_filings_ingested(ticker: str) -> bool:
+    try:
+        return await asyncio.to_thread(ensure_filings_ingested, ticker)
+    except Exception as e:
+        logger.error(f"SEC filings ingestion failed for {ticker}: {e}", exc_info=True)
+        return False
+
+
+async def run_filings_pipeline(
+    ticker: str,
+    trade_direction: TradeDirection,
+    trade_duration: TradeDuration,
+    token_config: Optional[TokenBudgetConfig] = None,
+) -> dict:
+    """
+    Run ingestion, query building, retrieval and synthesis for one ticker.
+
+    Args:
+        ticker: Stock ticker symbol
+        trade_direction: Direction of the trade (long/short)
+        trade_duration: Duration of the trade (day/swing/position)
+        token_config: Optional token budget configuration (defaults to standard)
+
+    Returns:
+        Dict with filings_search_queries, filings_context, filings_sentiment
+        and metrics, matching the filings subgraph state updates.
+    """
+    config = token_config or get_token_config()
+    metrics = RequestMetrics()
+
+    _, (search_queries, query_metrics) = await asyncio.gather(
+        _aensure_filings_ingested(ticker),
+        agenerate_search_queries(
+            ticker=ticker,
+            trade_direction=trade_direction,
+            trade_duration=trade_duration,
+            token_config=config.filings_query_builder,
+        ),
+    )
+    metrics.add_agent_metrics(query_metrics)
+
+    filings_context, retrieval_metrics = await aget_filings_context(
+        ticker=ticker, search_queries=search_queries
+    )
+    metrics.add_agent_metrics(retrieval_metrics)
+
+    filings_sentiment, synthesis_metrics = await agenerate_filings_sentiment(
+        ticker=ticker,
+        context=filings_context,
+        token_config=config.filings_synthesis,
+    )
+    metrics.add_agent_metrics(synthesis_metrics)
+
+    if filings_sentiment:
+        sentiment = format_sentiment_output(filings_sentiment)
+    elif filings_context is None:
+        sentiment = "No SEC filings context retrieved."
+    else:
+        sentiment = "No SEC filings available for analysis."
+
+    return {
+        "filings_search_queries": search_queries,
+        "filings_context": filings_context,
+        "filings_sentiment": sentiment,
+        "metrics": metrics,
+    }
+
+
+async def run_filings_pipeline_batch(
+    tickers: List[str],
+    trade_direction: TradeDirection,
+    trade_duration: TradeDuration,
+    token_config: Optional[TokenBudgetConfig] = None,
+) -> Dict[str, dict]:
+    """
+    Run the filings pipeline for several tickers concurrently.
+
+    Args:
+        tickers: Stock ticker symbols
+        trade_direction: Direction of the trade (long/short)
+        trade_duration: Duration of the trade (day/swing/position)
+        token_config: Optional token budget configuration (defaults to standard)
+
+    Returns:
+        Dict mapping each ticker to its pipeline result. Tickers whose
+        pipeline raised map to a result with an error sentiment.
+    """
+    results = await asyncio.gather(
+        *[
+            run_filings_pipeline(ticker, trade_direction, trade_duration, token_config)
+            for ticker in tickers
+        ],
+        return_exceptions=True,
+    )
+
+    by_ticker = {}
+    for ticker, result in zip(tickers, results):
+        if isinstance(result, Exception):
+            logger.error(f"Filings pipeline failed for {ticker}: {result}")
+            result = {
+                "filings_search_queries": None,
+                "filings_context": None,
+                "filings_sentiment": (
+                    "Analysis unavailable due to data retrieval error."
+                ),
+                "metrics": RequestMetrics(),
+            }
+        by_ticker[ticker] = result
+    return by_ticker
@@ -1,9 +1,11 @@
+from string import Template
+
 query_builder_prompt = """You are a financial research query specialist. Your task is to generate targeted search queries for retrieving relevant excerpts from SEC filings (10-K, 10-Q, 8-K) based on the trading context.
 
 Context:
-- Ticker: {ticker}
-- Trade Direction: {trade_direction} (the user is considering going {trade_direction_desc})
-- Trade Duration: {trade_duration} ({trade_duration_desc})
+- Ticker: $ticker
+- Trade Direction: $trade_direction (the user is considering going $trade_direction_desc)
+- Trade Duration: $trade_duration ($trade_duration_desc)
 
 Generate 5 search queries optimized for semantic search against SEC filing documents. Each query should:
 1. Be 3-6 words that capture a specific topic
@@ -16,3 +18,6 @@ Consider:
 - For POSITION_TRADE: Focus on long-term strategy, sustainable advantages, multi-year trends
 
 Return exactly 5 search queries as a list."""
+
+
+QUERY_BUILDER_TEMPLATE = Template(query_builder_prompt)
@@ -0,0 +1,32 @@
+from agents.filings.tools.tools import _build_where_filter, _normalize_filters
+
+
+class TestNormalizeFilters:
+    def test_all_filing_types_dropped(self):
+        assert _normalize_filters(["8-K", "10-Q", "10-K"], None) == ((), ())
+
+    def test_duplicates_not_mistaken_for_all_types(self):
+        types, _ = _normalize_filters(["10-K", "10-K", "10-Q"], None)
+        assert types == ("10-K", "10-Q")
+
+    def test_values_sorted_and_unique(self):
+        assert _normalize_filters(["10-Q", "10-K"], ["mda", "risk_factors", "mda"]) == (
+            ("10-K", "10-Q"),
+            ("mda", "risk_factors"),
+        )
+
+
+class TestBuildWhereFilter:
+    def test_no_filters(self):
+        assert _build_where_filter((), ()) is None
+
+    def test_single_value_uses_equality(self):
+        assert _build_where_filter(("10-K",), ()) == {"filing_type": "10-K"}
+
+    def test_combined_filters(self):
+        assert _build_where_filter(("10-K", "10-Q"), ("mda",)) == {
+            "$and": [
+                {"filing_type": {"$in": ["10-K", "10-Q"]}},
+                {"section": "mda"},
+            ]
+        }
@@ -0,0 +1,120 @@
+from agents.filings.util import (
+    SIMHASH_MAX_DISTANCE,
+    _NearDuplicateIndex,
+    _content_key,
+    _hamming_distance,
+    _jaccard,
+    _shingle_hashes,
+    _simhash,
+)
+
+BODY = [f"word{i}" for i in range(200)]
+
+# distinct paragraphs that share most of their filler words
+SUPPLIERS = (
+    "The company relies on a small number of suppliers for the components used "
+    "in its products, and the loss of any of these suppliers could have a "
+    "material adverse effect on the results of operations and the financial "
+    "condition of the company."
+)
+CREDIT = (
+    "The company has entered into a revolving credit facility with a syndicate "
+    "of lenders, and the terms of the facility limit the ability of the company "
+    "to incur additional debt and to pay dividends to the holders of its common "
+    "stock."
+)
+
+
+class TestContentKey:
+    def test_normalizes_whitespace_and_case(self):
+        key = _content_key("Risk  Factors\nApply")
+        assert key == _content_key("risk factors apply")
+
+    def test_distinct_text(self):
+        assert _content_key("revenue grew") != _content_key("revenue fell")
+
+    def test_fixed_length(self):
+        assert len(_content_key("x" * 10000)) == 16
+
+
+class TestSimhash:
+    def test_identical_text(self):
+        text = " ".join(BODY)
+        assert _simhash(text) == _simhash(text)
+
+    def test_single_word_change_is_near_duplicate(self):
+        bumped = list(BODY)
+        bumped[100] = "2024"
+        original, revised = _simhash(" ".join(BODY)), _simhash(" ".join(bumped))
+        distance = _hamming_distance(original, revised)
+        assert distance <= SIMHASH_MAX_DISTANCE
+
+    def test_distinct_text(self):
+        other = " ".join(f"alpha{i}" for i in range(200))
+        distance = _hamming_distance(_simhash(" ".join(BODY)), _simhash(other))
+        assert distance > SIMHASH_MAX_DISTANCE
+
+    def test_distinct_text_sharing_filler_words(self):
+        distance = _hamming_distance(_simhash(SUPPLIERS), _simhash(CREDIT))
+        assert distance > SIMHASH_MAX_DISTANCE
+
+    def test_repeated_words_vote_once(self):
+        assert _simhash("the of and " * 50 + "revenue") == _simhash(
+            "the of and " * 5 + "revenue"
+        )
+
+    def test_empty_text(self):
+        assert _simhash("") == 0
+
+
+class TestShingles:
+    def test_jaccard_of_single_word_change(self):
+        bumped = list(BODY)
+        bumped[100] = "2024"
+        original = _shingle_hashes(" ".join(BODY))
+        revised = _shingle_hashes(" ".join(bumped))
+        assert _jaccard(original, revised) > 0.95
+
+    def test_jaccard_of_filler_sharing_paragraphs(self):
+        assert _jaccard(_shingle_hashes(SUPPLIERS), _shingle_hashes(CREDIT)) < 0.1
+
+    def test_short_text(self):
+        assert len(_shingle_hashes("revenue fell")) == 1
+
+
+class TestNearDuplicateIndex:
+    def test_detects_near_duplicate(self):
+        index = _NearDuplicateIndex()
+        shingles = _shingle_hashes(" ".join(BODY))
+        signature = _simhash("", shingles)
+        index.add(signature, shingles)
+        assert index.is_near_duplicate(signature ^ 0b101, shingles)
+
+    def test_detects_single_word_change(self):
+        index = _NearDuplicateIndex()
+        original = _shingle_hashes(" ".join(BODY))
+        index.add(_simhash("", original), original)
+        bumped = list(BODY)
+        bumped[100] = "2024"
+        revised = _shingle_hashes(" ".join(bumped))
+        assert index.is_near_duplicate(_simhash("", revised), revised)
+
+    def test_keeps_filler_sharing_paragraph(self):
+        index = _NearDuplicateIndex()
+        suppliers = _shingle_hashes(SUPPLIERS)
+        index.add(_simhash(SUPPLIERS, suppliers), suppliers)
+        credit = _shingle_hashes(CREDIT)
+        assert not index.is_near_duplicate(_simhash(CREDIT, credit), credit)
+
+    def test_signature_collision_needs_shingle_overlap(self):
+        index = _NearDuplicateIndex()
+        index.add(0, _shingle_hashes(SUPPLIERS))
+        assert not index.is_near_duplicate(0, _shingle_hashes(CREDIT))
+
+    def test_ignores_distant_signature(self):
+        index = _NearDuplicateIndex()
+        shingles = _shingle_hashes(" ".join(BODY))
+        index.add(0, shingles)
+        # one differing bit in every 4-bit band: distance 16, no shared band
+        distant = sum(1 << band for band in range(0, 64, 4))
+        assert not index.is_near_duplicate(distant, shingles)
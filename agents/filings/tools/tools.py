@@ -1,14 +1,32 @@
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-from langchain_core.tools import Tool
+from cachetools import TTLCache
 from pydantic import BaseModel, Field
-from pydantic_core.core_schema import arguments_schema
 
-from data.util.vector_store import get_or_create_collection, collection_exists
+from data.util.vector_store import (
+    collection_exists,
+    embed_queries,
+    get_collection_generation,
+    get_or_create_collection,
+)
+from util.cache import TTL_LONG
 from util.logger import get_logger
 
+if TYPE_CHECKING:
+    from langchain_core.tools import Tool
+
 logger = get_logger(__name__)
 
+# Search results keyed by (ticker, collection generation, query, filters, top_k).
+# The generation changes on ingestion, so new filings are never masked.
+SEARCH_CACHE_SIZE = 2048
+_search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=TTL_LONG)
+_search_cache_lock = threading.Lock()
+
+SUPPORTED_FILING_TYPES = frozenset(("10-K", "10-Q", "8-K"))
+
 
 class FilingSearchInput(BaseModel):
     ticker: str = Field(descripton="Stock ticker symbol")
@@ -33,49 +51,45 @@ class FilingSearchResult(BaseModel):
     relevance_score: float
 
 
-def search_filings(
-    ticker: str,
-    query: str,
-    filing_types: list[str] = ["10-K", "10-Q", "8-K"],
-    sections: Optional[list[str]] = None,
-    top_k: int = 5,
-) -> list[FilingSearchResult]:
-    if not collection_exists(ticker):
-        logger.warning(f"No filings collection for {ticker}")
-        return []
+def _normalize_filters(
+    filing_types: Optional[list[str]], sections: Optional[list[str]]
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Reduce filters to sorted unique values, dropping ones that match everything.
 
-    collection = get_or_create_collection(ticker)
+    A filing type filter covering every supported type selects the whole
+    collection, so it is dropped rather than sent as a no-op predicate.
+    """
+    types = frozenset(filing_types or ())
+    if types >= SUPPORTED_FILING_TYPES:
+        types = frozenset()
+    return tuple(sorted(types)), tuple(sorted(set(sections or ())))
 
-    where_filter = None
-    where_conditions = []
 
-    if filing_types and len(filing_types) < 3:
-        where_conditions.append({"filing_type": {"$in": filing_types}})
+def _build_where_filter(
+    filing_types: tuple[str, ...], sections: tuple[str, ...]
+) -> Optional[dict]:
+    """Build a Chroma metadata filter from normalized filing types and sections."""
+    where_conditions = []
 
-    if sections:
-        where_conditions.append({"section": {"$in": sections}})
+    for field, values in (("filing_type", filing_types), ("section", sections)):
+        if len(values) == 1:
+            where_conditions.append({field: values[0]})
+        elif values:
+            where_conditions.append({field: {"$in": list(values)}})
 
     if len(where_conditions) == 1:
-        where_filter = where_conditions[0]
+        return where_conditions[0]
     elif len(where_conditions) > 1:
-        where_filter = {"$and": where_conditions}
-
-    try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"],
-        )
-    except Exception as e:
-        logger.error(f"Error querying filings: {e}")
-        return []
+        return {"$and": where_conditions}
+    return None
 
-    search_results = []
 
-    documents = results.get("documents", [[]])[0]
-    metadatas = results.get("metadatas", [[]])[0]
-    distances = results.get("distances", [[]])[0]
+def _parse_query_results(
+    ticker: str, documents: list, metadatas: list, distances: list
+) -> list[FilingSearchResult]:
+    """Convert the Chroma results for a single query into search results."""
+    search_results = []
 
     for doc, meta, dist in zip(documents, metadatas, distances):
         similarity = 1 - dist
@@ -94,6 +108,87 @@ def search_filings(
     return search_results
 
 
+def search_filings(
+    ticker: str,
+    query: str,
+    filing_types: list[str] = ["10-K", "10-Q", "8-K"],
+    sections: Optional[list[str]] = None,
+    top_k: int = 5,
+) -> list[FilingSearchResult]:
+    return search_filings_batch(ticker, [query], filing_types, sections, top_k)[0]
+
+
+def search_filings_batch(
+    ticker: str,
+    queries: list[str],
+    filing_types: list[str] = ["10-K", "10-Q", "8-K"],
+    sections: Optional[list[str]] = None,
+    top_k: int = 5,
+) -> list[list[FilingSearchResult]]:
+    """
+    Search filings for several queries with a single vector store call.
+
+    Query embeddings are served from the shared embedding cache, so recurring
+    queries such as the default search topics are embedded only once. Results
+    are cached per query until the ticker's collection changes or they expire.
+
+    Returns:
+        One list of search results per query, in the same order as queries
+    """
+    if not queries:
+        return []
+
+    filing_types, sections = _normalize_filters(filing_types, sections)
+    base_key = (
+        ticker.lower(),
+        get_collection_generation(ticker),
+        filing_types,
+        sections,
+        top_k,
+    )
+    with _search_cache_lock:
+        found = {
+            q: _search_cache[(base_key, q)]
+            for q in queries
+            if (base_key, q) in _search_cache
+        }
+
+    missing = [q for q in dict.fromkeys(queries) if q not in found]
+    if missing:
+        if not collection_exists(ticker):
+            logger.warning(f"No filings collection for {ticker}")
+            return [[] for _ in queries]
+
+        collection = get_or_create_collection(ticker)
+
+        try:
+            results = collection.query(
+                query_embeddings=embed_queries(missing),
+                n_results=top_k,
+                where=_build_where_filter(filing_types, sections),
+                include=["documents", "metadatas", "distances"],
+            )
+        except Exception as e:
+            logger.error(f"Error querying filings: {e}")
+            return [[] for _ in queries]
+
+        documents = results.get("documents") or [[] for _ in missing]
+        metadatas = results.get("metadatas") or [[] for _ in missing]
+        distances = results.get("distances") or [[] for _ in missing]
+
+        fetched = {
+            q: _parse_query_results(ticker, docs, metas, dists)
+            for q, docs, metas, dists in zip(missing, documents, metadatas, distances)
+        }
+        found.update(fetched)
+        with _search_cache_lock:
+            for q, query_results in fetched.items():
+                _search_cache[(base_key, q)] = query_results
+
+    # copy the lists so callers cannot mutate cached entries
+    return [list(found[q]) for q in queries]
+
+
 def search_filings_tool_func(
     ticker: str,
     query: str,
@@ -120,14 +215,19 @@ def search_filings_tool_func(
     return "".join(output_parts)
 
 
-search_filings_tool = Tool(
-    name="search_sec_filings",
-    description=(
-        "Search SEC filings (10-K, 10-Q, 8-K) for a stock ticker. "
-        "Use this tool to find information about risk factors, business strategy, "
-        "financial performance, management discussion, or material events. "
-        "Provide a specific query about what you want to find."
-    ),
-    func=search_filings_tool_func,
-    arguments_schema=FilingSearchInput,
-)
+@lru_cache(maxsize=1)
+def get_search_filings_tool() -> "Tool":
+    """Build the filings search tool on first use, deferring the LangChain import."""
+    from langchain_core.tools import Tool
+
+    return Tool(
+        name="search_sec_filings",
+        description=(
+            "Search SEC filings (10-K, 10-Q, 8-K) for a stock ticker. "
+            "Use this tool to find information about risk factors, business strategy, "
+            "financial performance, management discussion, or material events. "
+            "Provide a specific query about what you want to find."
+        ),
+        func=search_filings_tool_func,
+        arguments_schema=FilingSearchInput,
+    )
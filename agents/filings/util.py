@@ -1,5 +1,24 @@
+import hashlib
+
+import numpy as np
+
 from models.state import TradeDuration, TradeDirection
 
+# SimHash settings for near-duplicate filing excerpt detection
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 16  # 4-bit bands; distance <= 15 guarantees a shared band
+SIMHASH_MAX_DISTANCE = 15
+
+# Signatures are built from distinct word shingles, so common filler words
+# cannot dominate the bits. One edited word changes SHINGLE_SIZE shingles, so
+# the distance is loose and a shingle Jaccard check makes the final call
+SHINGLE_SIZE = 3
+SHINGLE_MIN_JACCARD = 0.8
+
+_BAND_WIDTH = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_WIDTH) - 1
+_BIT_POSITIONS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
 
 def _get_trade_direction_desc(direction: TradeDirection) -> str:
     """Get human-readable description of trade direction."""
@@ -16,3 +35,92 @@ def _get_trade_duration_desc(duration: TradeDuration) -> str:
         TradeDuration.POSITION_TRADE: "long-term position, held for weeks to months",
     }
     return descriptions.get(duration, "unknown duration")
+
+
+def _content_key(text: str) -> bytes:
+    """Hash whitespace- and case-normalized text into a compact exact-match key."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    """Hash the distinct SHINGLE_SIZE-word shingles of normalized text, sorted."""
+    tokens = text.lower().split()
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+
+    width = min(SHINGLE_SIZE, len(tokens))
+    shingles = {
+        " ".join(tokens[i : i + width]) for i in range(len(tokens) - width + 1)
+    }
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(s.encode(), digest_size=8).digest(), "little"
+            )
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    return np.unique(hashes)
+
+
+def _simhash(text: str, shingles: np.ndarray | None = None) -> int:
+    """
+    Compute a 64-bit SimHash over the distinct word shingles of text.
+
+    Pass shingles from _shingle_hashes to avoid hashing the text twice.
+    """
+    if shingles is None:
+        shingles = _shingle_hashes(text)
+    if not len(shingles):
+        return 0
+
+    # each shingle votes +1/-1 on every bit; the signature keeps the majority
+    bits = ((shingles[:, None] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.int64)
+    votes = bits.sum(axis=0) * 2 - len(shingles)
+    return sum(1 << int(i) for i in np.flatnonzero(votes > 0))
+
+
+def _jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard similarity of two sorted, unique shingle hash arrays."""
+    if not len(a) and not len(b):
+        return 1.0
+    shared = len(np.intersect1d(a, b, assume_unique=True))
+    return shared / (len(a) + len(b) - shared)
+
+
+def _hamming_distance(a: int, b: int) -> int:
+    """Count the bits that differ between two signatures."""
+    return (a ^ b).bit_count()
+
+
+class _NearDuplicateIndex:
+    """
+    Banded SimHash index for near-duplicate lookups.
+
+    Signatures within SIMHASH_MAX_DISTANCE bits must match exactly on at least
+    one band, so only signatures sharing a band are compared. A signature match
+    only counts when the shingle sets also overlap by SHINGLE_MIN_JACCARD, so a
+    chance bit collision never drops a distinct excerpt.
+    """
+
+    def __init__(self):
+        self._buckets: dict[tuple[int, int], list[tuple[int, np.ndarray]]] = {}
+
+    def _bands(self, signature: int):
+        for band in range(SIMHASH_BANDS):
+            yield band, (signature >> (band * _BAND_WIDTH)) & _BAND_MASK
+
+    def is_near_duplicate(self, signature: int, shingles: np.ndarray) -> bool:
+        return any(
+            _hamming_distance(signature, other) <= SIMHASH_MAX_DISTANCE
+            and _jaccard(shingles, other_shingles) >= SHINGLE_MIN_JACCARD
+            for key in self._bands(signature)
+            for other, other_shingles in self._buckets.get(key, ())
+        )
+
+    def add(self, signature: int, shingles: np.ndarray) -> None:
+        for key in self._bands(signature):
+            self._buckets.setdefault(key, []).append((signature, shingles))
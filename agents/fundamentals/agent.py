@@ -1,28 +1,82 @@
+import asyncio
 import time
 from typing import Any, Dict, Optional, Tuple
 
-import dotenv
-
 from agents.fundamentals.prompt import fundamentals_research_prompt
 from agents.fundamentals.tools import (
     get_fundamentals_tool,
-    get_earnings_and_financial_health,
+    get_fundamentals_json,
+)
+from agents.shared.agent_utils import (
+    ainvoke_llm_with_metrics,
+    arun_agent_with_tools,
+    invoke_llm_with_metrics,
+    run_agent_with_tools,
 )
-from agents.shared.agent_utils import run_agent_with_tools, invoke_llm_with_metrics
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
+from agents.shared.llm_cache import get_persistent_llm_cache
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from models.agent import FundamentalSentimentOutput
 from models.metrics import AgentMetrics, TokenUsage
+from util.env import load_env
 
-dotenv.load_dotenv()
+load_env()
 
 AGENT_NAME = "fundamental"
 
+# Static tool set, so the tool-bound llm is built once and reused
+TOOLS = (get_fundamentals_tool,)
+
+# Financial statements change quarterly; ratios drift with price over the day
+RESPONSE_CACHE_TTL = 60 * 60
+
+
+def _build_fundamentals_prompt(
+    ticker: str, fundamentals_json: Optional[str] = None
+) -> str:
+    if fundamentals_json is None:
+        # the tool-calling path sends the research instructions as a system prompt
+        return f"Analyze the business fundamentals for ticker: {ticker}"
+    # Inject the data directly into the prompt for analysis
+    prompt = f"{fundamentals_research_prompt}\n\n"
+    prompt += f"Analyze the business fundamentals for ticker: {ticker}\n\n"
+    prompt += f"Here is the fundamental data:\n{fundamentals_json}"
+    return prompt
+
+
+def _get_fundamentals_llm(config: AgentTokenConfig):
+    return get_openai_llm(
+        model=LLM_MODELS["open_ai_smart"],
+        temperature=0.0,
+        max_tokens=config.max_output_tokens,
+    )
+
+
+def _build_metrics(
+    token_usage: TokenUsage, config: AgentTokenConfig, start_time: float
+) -> AgentMetrics:
+    # Check if budget was exceeded
+    budget_exceeded = False
+    if config.token_budget and token_usage.total_tokens > config.token_budget:
+        budget_exceeded = True
+
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    return AgentMetrics(
+        agent_name=AGENT_NAME,
+        latency_ms=latency_ms,
+        token_usage=token_usage,
+        model=LLM_MODELS["open_ai_smart"],
+        budget_exceeded=budget_exceeded,
+        cached=token_usage.cached,
+    )
+
 
 def get_fundamental_sentiment(
     ticker: str,
     cached_info: Optional[Dict[str, Any]] = None,
     token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[FundamentalSentimentOutput, AgentMetrics]:
     """
     Generate fundamental sentiment analysis for a ticker.
@@ -31,52 +85,79 @@ def get_fundamental_sentiment(
         ticker: Stock ticker symbol
         cached_info: Optional pre-fetched yfinance ticker.info to avoid duplicate API calls
         token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from
 
     Returns:
         Tuple of (FundamentalSentimentOutput, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.fundamental
-    model = LLM_MODELS["open_ai_smart"]
-    llm = get_openai_llm(
-        model=model,
-        temperature=0.0,
-        max_tokens=config.max_output_tokens,
-    )
+    llm = _get_fundamentals_llm(config)
 
-    budget_exceeded = False
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        if cached_info is not None:
+            # Use cached info - call function directly instead of via tool
+            fundamentals_json = get_fundamentals_json(
+                ticker=ticker, cached_info=cached_info
+            )
+            prompt = _build_fundamentals_prompt(ticker, fundamentals_json)
+            result, token_usage = invoke_llm_with_metrics(
+                llm,
+                prompt,
+                FundamentalSentimentOutput,
+                token_budget=config.token_budget,
+                cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            )
+        else:
+            # No cached info - use tool-calling approach
+            prompt = _build_fundamentals_prompt(ticker)
+            result, token_usage = run_agent_with_tools(
+                llm, prompt, TOOLS, FundamentalSentimentOutput,
+                track_tokens=True, token_budget=config.token_budget,
+                cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+                system_prompt=fundamentals_research_prompt,
+            )
+        reservation.commit(token_usage.total_tokens)
 
-    if cached_info is not None:
-        # Use cached info - call function directly instead of via tool
-        fundamentals_data = get_earnings_and_financial_health(
-            ticker=ticker, cached_info=cached_info
-        )
-        # Inject the data directly into the prompt for analysis
-        prompt = f"{fundamentals_research_prompt}\n\n"
-        prompt += f"Analyze the business fundamentals for ticker: {ticker}\n\n"
-        prompt += f"Here is the fundamental data:\n{fundamentals_data.model_dump_json(indent=2)}"
-        result, token_usage = invoke_llm_with_metrics(
-            llm, prompt, FundamentalSentimentOutput, token_budget=config.token_budget
-        )
-    else:
-        # No cached info - use tool-calling approach
-        prompt = f"{fundamentals_research_prompt}\n\nAnalyze the business fundamentals for ticker: {ticker}"
-        tools = [get_fundamentals_tool]
-        result, token_usage = run_agent_with_tools(
-            llm, prompt, tools, FundamentalSentimentOutput,
-            track_tokens=True, token_budget=config.token_budget
-        )
+    return result, _build_metrics(token_usage, config, start_time)
 
-    # Check if budget was exceeded
-    if config.token_budget and token_usage.total_tokens > config.token_budget:
-        budget_exceeded = True
 
-    latency_ms = (time.perf_counter() - start_time) * 1000
-    metrics = AgentMetrics(
-        agent_name=AGENT_NAME,
-        latency_ms=latency_ms,
-        token_usage=token_usage,
-        model=model,
-        budget_exceeded=budget_exceeded,
-    )
-    return result, metrics
+async def aget_fundamental_sentiment(
+    ticker: str,
+    cached_info: Optional[Dict[str, Any]] = None,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[FundamentalSentimentOutput, AgentMetrics]:
+    """Async variant of get_fundamental_sentiment."""
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.fundamental
+    llm = _get_fundamentals_llm(config)
+
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        if cached_info is not None:
+            # yfinance is blocking, so build the data off the event loop
+            fundamentals_json = await asyncio.to_thread(
+                get_fundamentals_json, ticker=ticker, cached_info=cached_info
+            )
+            prompt = _build_fundamentals_prompt(ticker, fundamentals_json)
+            result, token_usage = await ainvoke_llm_with_metrics(
+                llm,
+                prompt,
+                FundamentalSentimentOutput,
+                token_budget=config.token_budget,
+                cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            )
+        else:
+            prompt = _build_fundamentals_prompt(ticker)
+            result, token_usage = await arun_agent_with_tools(
+                llm, prompt, TOOLS, FundamentalSentimentOutput,
+                track_tokens=True, token_budget=config.token_budget,
+                cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+                system_prompt=fundamentals_research_prompt,
+            )
+        reservation.commit(token_usage.total_tokens)
+
+    return result, _build_metrics(token_usage, config, start_time)
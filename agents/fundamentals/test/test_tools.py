@@ -47,6 +47,11 @@ class TestCleanDictForJson:
         cleaned = _clean_dict_for_json(data)
         assert cleaned["na"] is None
 
+    def test_bool_kept(self):
+        cleaned = _clean_dict_for_json({"flag": True, "nested": [False]})
+        assert cleaned["flag"] is True
+        assert cleaned["nested"][0] is False
+
 
 class TestConvertDfToDict:
     def test_empty_none(self):
@@ -141,6 +146,17 @@ class TestGetEarningsData:
         assert result["quarterly"] is not None
         assert result["annual"]["2023"]["Net Income"] == 1000
 
+    def test_nan_net_income_becomes_none(self):
+        df = pd.DataFrame(
+            {"2023": [np.nan, 5.0], "2022": [np.inf, 6.0]},
+            index=["Net Income", "Revenue"],
+        )
+        result = _get_earnings_data(df, None)
+        assert result["annual"] == {
+            "2023": {"Net Income": None},
+            "2022": {"Net Income": None},
+        }
+
     def test_missing_net_income(self):
         df = pd.DataFrame({"A": [1]}, index=["Revenue"])
         result = _get_earnings_data(df, df)
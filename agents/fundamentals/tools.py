@@ -1,90 +1,246 @@
-import traceback
-from typing import Dict, Any, List, Optional
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Collection, Dict, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 import yfinance as yf
+from cachetools import TTLCache
 from langchain_core.tools import Tool
 
 from models.tools import FundamentalsData, FundamentalsInput
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Financial statement rows kept for each statement type
+INCOME_METRICS = frozenset(
+    {
+        "Total Revenue",
+        "Gross Profit",
+        "Operating Income",
+        "Net Income",
+        "EBITDA",
+        "Basic EPS",
+        "Diluted EPS",
+        "Interest Expense",
+        "Tax Provision",
+    }
+)
+
+BALANCE_SHEET_METRICS = frozenset(
+    {
+        "Total Assets",
+        "Current Assets",
+        "Cash And Cash Equivalents",
+        "Inventory",
+        "Total Liabilities",
+        "Current Liabilities",
+        "Total Debt",
+        "Net Debt",
+        "Stockholders Equity",
+        "Working Capital",
+    }
+)
+
+CASH_FLOW_METRICS = frozenset(
+    {
+        "Operating Cash Flow",
+        "Investing Cash Flow",
+        "Financing Cash Flow",
+        "Free Cash Flow",
+        "Capital Expenditure",
+        "Repayment Of Debt",
+        "Issuance Of Debt",
+        "Repurchase Of Capital Stock",
+        "Cash Dividends Paid",
+    }
+)
+
+
+# yfinance Ticker attributes that each trigger a separate request
+STATEMENT_ATTRIBUTES = (
+    "balance_sheet",
+    "quarterly_balance_sheet",
+    "income_stmt",
+    "quarterly_income_stmt",
+    "cashflow",
+    "quarterly_cashflow",
+)
+
+# (output key, yfinance info key) pairs for the ratio, valuation and target sections
+RATIO_FIELDS = (
+    ("P/E_ratio", "trailingPE"),
+    ("forward_P/E", "forwardPE"),
+    ("PEG_ratio", "pegRatio"),
+    ("price_to_book", "priceToBook"),
+    ("price_to_sales", "priceToSalesTrailing12Months"),
+    ("ROE", "returnOnEquity"),
+    ("ROA", "returnOnAssets"),
+    ("debt_to_equity", "debtToEquity"),
+    ("current_ratio", "currentRatio"),
+    ("quick_ratio", "quickRatio"),
+    ("profit_margin", "profitMargins"),
+    ("operating_margin", "operatingMargins"),
+    ("gross_margin", "grossMargins"),
+)
+
+VALUATION_FIELDS = (
+    ("market_cap", "marketCap"),
+    ("enterprise_value", "enterpriseValue"),
+    ("enterprise_to_revenue", "enterpriseToRevenue"),
+    ("enterprise_to_ebitda", "enterpriseToEbitda"),
+    ("trailing_eps", "trailingEps"),
+    ("forward_eps", "forwardEps"),
+    ("book_value", "bookValue"),
+    ("shares_outstanding", "sharesOutstanding"),
+    ("beta", "beta"),
+    ("total_revenue", "totalRevenue"),
+    ("revenue_per_share", "revenuePerShare"),
+    ("total_debt", "totalDebt"),
+    ("total_cash", "totalCash"),
+    ("free_cash_flow", "freeCashflow"),
+    ("operating_cash_flow", "operatingCashflow"),
+    ("ebitda", "ebitda"),
+    ("revenue_growth", "revenueGrowth"),
+    ("earnings_growth", "earningsGrowth"),
+    ("dividend_yield", "dividendYield"),
+    ("payout_ratio", "payoutRatio"),
+)
+
+TARGET_PRICE_FIELDS = (
+    ("mean", "targetMeanPrice"),
+    ("high", "targetHighPrice"),
+    ("low", "targetLowPrice"),
+)
+
+
+# Raw yfinance data per ticker, reused across calls within the TTL (seconds)
+TICKER_DATA_CACHE_TTL = 900
+_ticker_data_cache = TTLCache(maxsize=256, ttl=TICKER_DATA_CACHE_TTL)
+_ticker_data_lock = threading.Lock()
 
 
-# Financial metrics configuration
-INCOME_METRICS = [
-    "Total Revenue",
-    "Gross Profit",
-    "Operating Income",
-    "Net Income",
-    "EBITDA",
-    "Basic EPS",
-    "Diluted EPS",
-    "Interest Expense",
-    "Tax Provision",
-]
-
-BALANCE_SHEET_METRICS = [
-    "Total Assets",
-    "Current Assets",
-    "Cash And Cash Equivalents",
-    "Inventory",
-    "Total Liabilities",
-    "Current Liabilities",
-    "Total Debt",
-    "Net Debt",
-    "Stockholders Equity",
-    "Working Capital",
-]
-
-CASH_FLOW_METRICS = [
-    "Operating Cash Flow",
-    "Investing Cash Flow",
-    "Financing Cash Flow",
-    "Free Cash Flow",
-    "Capital Expenditure",
-    "Repayment Of Debt",
-    "Issuance Of Debt",
-    "Repurchase Of Capital Stock",
-    "Cash Dividends Paid",
-]
+# Leaf types that are already JSON serializable and never NaN
+_JSON_SAFE_TYPES = frozenset((str, bool, int, type(None)))
+
+_INF = float("inf")
+_NEG_INF = float("-inf")
 
 
 def _clean_dict_for_json(obj: Any) -> Any:
     """Recursively clean dictionary to ensure JSON serializability."""
+    # Exact type checks first, most frequent first, for the plain Python
+    # values that make up most of the payload
+    obj_type = type(obj)
+    if obj_type is dict:
+        return {str(k): _clean_dict_for_json(v) for k, v in obj.items()}
+    if obj_type is float:
+        # NaN is the only value not equal to itself
+        return None if obj != obj or obj == _INF or obj == _NEG_INF else obj
+    if obj_type in _JSON_SAFE_TYPES:
+        return obj
+    if obj_type is list or obj_type is tuple:
+        return [_clean_dict_for_json(item) for item in obj]
+
+    # Subclasses, numpy scalars and other numeric types
     if isinstance(obj, dict):
         return {str(k): _clean_dict_for_json(v) for k, v in obj.items()}
     if isinstance(obj, (list, tuple)):
         return [_clean_dict_for_json(item) for item in obj]
-    if isinstance(obj, (float, int, np.number)):
-        # Check for NaN or inf
-        if pd.isna(obj) or np.isinf(obj):
-            return None
-        return float(obj) if isinstance(obj, (float, np.floating)) else int(obj)
+    if isinstance(obj, (float, np.floating)):
+        value = float(obj)
+        return value if math.isfinite(value) else None
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    # unknown scalar types fall back to pandas' NA detection
     if pd.isna(obj):
         return None
     return obj
 
 
+def _fmt_ymd(labels: pd.DatetimeIndex) -> List[str]:
+    """Format timestamps as YYYY-MM-DD from their date fields, avoiding strftime."""
+    return [
+        f"{year}-{month:02d}-{day:02d}"
+        for year, month, day in zip(labels.year, labels.month, labels.day)
+    ]
+
+
+def _pick_info_fields(info: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    """Select and clean info values in one pass, renaming them to output keys."""
+    return {key: _clean_dict_for_json(info.get(info_key)) for key, info_key in fields}
+
+
+def _labels_to_str(labels: pd.Index) -> Union[pd.Index, List[str]]:
+    """Convert axis labels to strings, formatting timestamps as dates."""
+    if isinstance(labels, pd.DatetimeIndex):
+        # NaT has no date fields, so let strftime handle it
+        if labels.hasnans:
+            return labels.strftime("%Y-%m-%d")
+        return _fmt_ymd(labels)
+    return labels.astype(str)
+
+
 def _convert_df_to_dict(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
     """Convert a pandas DataFrame to a JSON-serializable dictionary."""
     if df is None or df.empty:
         return None
 
     try:
-        df_clean = df.copy()
-        # Convert index/columns to strings if they are timestamps
-        if isinstance(df_clean.columns, pd.DatetimeIndex):
-            df_clean.columns = df_clean.columns.strftime("%Y-%m-%d")
-        if isinstance(df_clean.index, pd.DatetimeIndex):
-            df_clean.index = df_clean.index.strftime("%Y-%m-%d")
-
-        return _clean_dict_for_json(df_clean.to_dict())
-    except Exception as e:
-        print(f"Warning: Failed to convert DataFrame to JSON: {e}")
+        # Build the output from the raw values and string labels, leaving the
+        # caller's frame untouched without copying it first
+        index = _labels_to_str(df.index)
+        columns = _labels_to_str(df.columns)
+        values = df.to_numpy()
+        kind = values.dtype.kind
+
+        # Only mixed or object frames need the per-value recursion
+        if kind not in "fiub":
+            result = pd.DataFrame(values, index=index, columns=columns).to_dict()
+            return _clean_dict_for_json(result)
+
+        # Build {column: {row: value}} directly from column-major Python
+        # values rather than through DataFrame.to_dict, masking NaN/inf for
+        # the whole frame at once
+        column_values = values.T.tolist()
+        if kind != "f":
+            return {
+                col: dict(zip(index, col_values))
+                for col, col_values in zip(columns, column_values)
+            }
+
+        column_finite = np.isfinite(values).T.tolist()
+        return {
+            col: {
+                row: value if finite else None
+                for row, value, finite in zip(index, col_values, col_finite)
+            }
+            for col, col_values, col_finite in zip(
+                columns, column_values, column_finite
+            )
+        }
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Failed to convert DataFrame to JSON: {e}")
         return None
 
 
+def _series_to_safe_dict(series: pd.Series) -> Dict[str, Optional[float]]:
+    """Convert a numeric Series to {label: value}, mapping NaN/inf to None."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    finite = np.isfinite(values).tolist()
+    return {
+        label: value if is_finite else None
+        for label, value, is_finite in zip(
+            _labels_to_str(series.index), values.tolist(), finite
+        )
+    }
+
+
 def _process_dataframe(
-    df: Optional[pd.DataFrame], keep_rows: List[str], limit_columns: int = 3
+    df: Optional[pd.DataFrame], keep_rows: Collection[str], limit_columns: int = 3
 ) -> Optional[Dict[str, Any]]:
     """
     Process DataFrame: limit columns, filter rows, and convert to dict.
@@ -99,14 +255,15 @@ def _process_dataframe(
         else:
             df_subset = df
 
-        # Filter rows
-        valid_indices = [idx for idx in df_subset.index if idx in keep_rows]
-        if valid_indices:
-            df_subset = df_subset.loc[valid_indices]
+        # Filter rows, keeping the frame's original row order. Skip the
+        # selection when it would keep every row (or none, the fallback).
+        keep_mask = df_subset.index.isin(keep_rows)
+        if keep_mask.any() and not keep_mask.all():
+            df_subset = df_subset.loc[keep_mask]
 
         return _convert_df_to_dict(df_subset)
-    except Exception as e:
-        print(f"Warning: Error processing DataFrame: {e}")
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Error processing DataFrame: {e}")
         return _convert_df_to_dict(df)
 
 
@@ -118,13 +275,53 @@ def _get_earnings_data(
 
     for key, stmt in [("annual", annual_stmt), ("quarterly", quarterly_stmt)]:
         if stmt is not None and "Net Income" in stmt.index:
-            earnings[key] = _convert_df_to_dict(stmt.loc[["Net Income"]])
+            # A single known row skips the general frame conversion
+            net_income = _series_to_safe_dict(stmt.loc["Net Income"])
+            earnings[key] = {
+                period: {"Net Income": value} for period, value in net_income.items()
+            } or None
 
     return earnings
 
 
+def _fetch_ticker_attributes(stock: yf.Ticker, attributes: tuple) -> Dict[str, Any]:
+    """Read yfinance attributes concurrently, since each one is a blocking request."""
+    with ThreadPoolExecutor(max_workers=len(attributes)) as executor:
+        futures = {attr: executor.submit(getattr, stock, attr) for attr in attributes}
+        return {attr: future.result() for attr, future in futures.items()}
+
+
+def _get_ticker_data(
+    ticker: str, attributes: tuple, refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Get yfinance attributes for a ticker, fetching only those not cached.
+
+    Args:
+        ticker: Stock ticker symbol
+        attributes: Ticker attribute names to return
+        refresh: If True, ignore cached values and fetch everything again
+
+    Returns:
+        Dict mapping each attribute name to its value
+    """
+    key = ticker.upper()
+    with _ticker_data_lock:
+        cached = {} if refresh else dict(_ticker_data_cache.get(key, {}))
+
+    missing = tuple(attr for attr in attributes if attr not in cached)
+    if missing:
+        cached.update(_fetch_ticker_attributes(yf.Ticker(ticker), missing))
+        with _ticker_data_lock:
+            _ticker_data_cache[key] = cached
+
+    return cached
+
+
 def get_earnings_and_financial_health(
-    ticker: str, cached_info: Optional[Dict[str, Any]] = None
+    ticker: str,
+    cached_info: Optional[Dict[str, Any]] = None,
+    refresh: bool = False,
 ) -> FundamentalsData:
     """
     Get comprehensive earnings and financial health data for a given ticker.
@@ -132,21 +329,24 @@ def get_earnings_and_financial_health(
     Args:
         ticker: Stock ticker symbol
         cached_info: Optional pre-fetched yfinance ticker.info to avoid duplicate API calls
+        refresh: If True, bypass the ticker data cache and fetch fresh data
 
     Returns:
         FundamentalsData: Structured output with earnings, financial statements,
         ratios, and valuation metrics for fundamental analysis.
     """
     try:
-        stock = yf.Ticker(ticker)
-
-        # 1. Fetch Financial Statements (these trigger API calls)
-        balance_sheet_annual = stock.balance_sheet
-        balance_sheet_quarterly = stock.quarterly_balance_sheet
-        income_annual = stock.income_stmt
-        income_quarterly = stock.quarterly_income_stmt
-        cash_flow_annual = stock.cashflow
-        cash_flow_quarterly = stock.quarterly_cashflow
+        # 1. Fetch Financial Statements (and info unless cached) in parallel
+        attributes = STATEMENT_ATTRIBUTES
+        if cached_info is None:
+            attributes += ("info",)
+        fetched = _get_ticker_data(ticker, attributes, refresh=refresh)
+        balance_sheet_annual = fetched["balance_sheet"]
+        balance_sheet_quarterly = fetched["quarterly_balance_sheet"]
+        income_annual = fetched["income_stmt"]
+        income_quarterly = fetched["quarterly_income_stmt"]
+        cash_flow_annual = fetched["cashflow"]
+        cash_flow_quarterly = fetched["quarterly_cashflow"]
 
         # 2. Extract Earnings
         earnings = _get_earnings_data(income_annual, income_quarterly)
@@ -170,46 +370,7 @@ def get_earnings_and_financial_health(
         }
 
         # 4. Get Company Info & Ratios - use cached info if available
-        info = cached_info if cached_info is not None else stock.info
-
-        ratios = {
-            "P/E_ratio": info.get("trailingPE"),
-            "forward_P/E": info.get("forwardPE"),
-            "PEG_ratio": info.get("pegRatio"),
-            "price_to_book": info.get("priceToBook"),
-            "price_to_sales": info.get("priceToSalesTrailing12Months"),
-            "ROE": info.get("returnOnEquity"),
-            "ROA": info.get("returnOnAssets"),
-            "debt_to_equity": info.get("debtToEquity"),
-            "current_ratio": info.get("currentRatio"),
-            "quick_ratio": info.get("quickRatio"),
-            "profit_margin": info.get("profitMargins"),
-            "operating_margin": info.get("operatingMargins"),
-            "gross_margin": info.get("grossMargins"),
-        }
-
-        valuation_metrics = {
-            "market_cap": info.get("marketCap"),
-            "enterprise_value": info.get("enterpriseValue"),
-            "enterprise_to_revenue": info.get("enterpriseToRevenue"),
-            "enterprise_to_ebitda": info.get("enterpriseToEbitda"),
-            "trailing_eps": info.get("trailingEps"),
-            "forward_eps": info.get("forwardEps"),
-            "book_value": info.get("bookValue"),
-            "shares_outstanding": info.get("sharesOutstanding"),
-            "beta": info.get("beta"),
-            "total_revenue": info.get("totalRevenue"),
-            "revenue_per_share": info.get("revenuePerShare"),
-            "total_debt": info.get("totalDebt"),
-            "total_cash": info.get("totalCash"),
-            "free_cash_flow": info.get("freeCashflow"),
-            "operating_cash_flow": info.get("operatingCashflow"),
-            "ebitda": info.get("ebitda"),
-            "revenue_growth": info.get("revenueGrowth"),
-            "earnings_growth": info.get("earningsGrowth"),
-            "dividend_yield": info.get("dividendYield"),
-            "payout_ratio": info.get("payoutRatio"),
-        }
+        info = cached_info if cached_info is not None else fetched["info"]
 
         return FundamentalsData(
             ticker=ticker,
@@ -220,20 +381,18 @@ def get_earnings_and_financial_health(
             balance_sheet=balance_sheets,
             income_statement=income_statements,
             cash_flow=cash_flows,
-            ratios=_clean_dict_for_json(ratios),
-            valuation_metrics=_clean_dict_for_json(valuation_metrics),
+            ratios=_pick_info_fields(info, RATIO_FIELDS),
+            valuation_metrics=_pick_info_fields(info, VALUATION_FIELDS),
             current_price=info.get("currentPrice"),
-            target_price=_clean_dict_for_json(
-                {
-                    "mean": info.get("targetMeanPrice"),
-                    "high": info.get("targetHighPrice"),
-                    "low": info.get("targetLowPrice"),
-                }
-            ),
+            target_price=_pick_info_fields(info, TARGET_PRICE_FIELDS),
         )
 
     except Exception as e:
-        traceback.print_exc()
+        # yfinance surfaces network and parsing failures as arbitrary
+        # exceptions; report them to the agent rather than failing the tool
+        logger.error(
+            f"Failed to retrieve fundamentals for {ticker}: {e}", exc_info=True
+        )
         return FundamentalsData(
             ticker=ticker,
             error=str(e),
@@ -241,9 +400,33 @@ def get_earnings_and_financial_health(
         )
 
 
+def get_fundamentals_json(
+    ticker: str,
+    cached_info: Optional[Dict[str, Any]] = None,
+    refresh: bool = False,
+) -> str:
+    """
+    Get fundamentals data as compact JSON ready to hand to an LLM.
+
+    The model is serialized once here, without null fields, instead of being
+    stringified again by the tool-calling loop.
+
+    Args:
+        ticker: Stock ticker symbol
+        cached_info: Optional pre-fetched yfinance ticker.info to avoid duplicate API calls
+        refresh: If True, bypass the ticker data cache and fetch fresh data
+
+    Returns:
+        JSON string of the FundamentalsData for the ticker
+    """
+    return get_earnings_and_financial_health(
+        ticker, cached_info=cached_info, refresh=refresh
+    ).model_dump_json(exclude_none=True)
+
+
 get_fundamentals_tool = Tool(
     name="get_fundamentals_tool",
-    description="Use this tool to get comprehensive fundamental analysis data for a stock. Returns earnings, financial statements (balance sheet, income statement, cash flow), key financial ratios (P/E, ROE, margins, debt ratios), and valuation metrics (market cap, EV, beta, FCF) useful for DCF and comparable company analysis.",
-    func=get_earnings_and_financial_health,
+    description="Use this tool to get comprehensive fundamental analysis data for a stock. Returns pre-serialized JSON with earnings, financial statements (balance sheet, income statement, cash flow), key financial ratios (P/E, ROE, margins, debt ratios), and valuation metrics (market cap, EV, beta, FCF) useful for DCF and comparable company analysis.",
+    func=get_fundamentals_json,
     args_schema=FundamentalsInput,
 )
@@ -1,25 +1,42 @@
 import time
-from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
 
-import dotenv
-
 from agents.headline.prompt import headline_research_prompt
 from agents.shared.llm_models import LLM_MODELS, get_google_llm
 from agents.shared.agent_utils import invoke_llm_with_metrics
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
+from agents.shared.llm_cache import get_llm_cache
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from models.agent import HeadlineSentimentOutput
 from models.metrics import AgentMetrics
+from util.dates import get_date_window
+from util.env import load_env
 
 
-dotenv.load_dotenv()
+load_env()
 
 AGENT_NAME = "headline"
 
 
+# Days of news the headline search looks back over
+HEADLINE_LOOKBACK_DAYS = 30
+
+
+@lru_cache(maxsize=256)
+def _build_headline_prompt(business: str, current_date: str, cutoff_date: str) -> str:
+    """Format the headline prompt, memoized since the dates change only daily."""
+    return headline_research_prompt.format(
+        business=business,
+        current_date=current_date,
+        cutoff_date=cutoff_date,
+    )
+
+
 def get_headline_sentiment(
     business: str,
     token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[HeadlineSentimentOutput, AgentMetrics]:
     """
     Get headline sentiment using Google's built-in search grounding.
@@ -28,22 +45,21 @@ def get_headline_sentiment(
     Args:
         business: Business description
         token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from
 
     Returns:
         Tuple of (HeadlineSentimentOutput, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.headline
     model = LLM_MODELS["google_fast"]
 
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    cutoff_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    current_date, cutoff_date = get_date_window(HEADLINE_LOOKBACK_DAYS)
 
-    prompt = headline_research_prompt.format(
-        business=business,
-        current_date=current_date,
-        cutoff_date=cutoff_date,
-    )
+    prompt = _build_headline_prompt(business, current_date, cutoff_date)
 
     llm = get_google_llm(
         model=model,
@@ -52,9 +68,17 @@ def get_headline_sentiment(
         max_tokens=config.max_output_tokens,
     )
 
-    result, token_usage = invoke_llm_with_metrics(
-        llm, prompt, HeadlineSentimentOutput, token_budget=config.token_budget
-    )
+    # The prompt embeds today's date, so cached responses are reused for
+    # repeat requests within the cache TTL but never across days
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = invoke_llm_with_metrics(
+            llm,
+            prompt,
+            HeadlineSentimentOutput,
+            token_budget=config.token_budget,
+            cache=get_llm_cache(),
+        )
+        reservation.commit(token_usage.total_tokens)
 
     # Check if budget was exceeded
     budget_exceeded = False
@@ -68,5 +92,6 @@ def get_headline_sentiment(
         token_usage=token_usage,
         model=model,
         budget_exceeded=budget_exceeded,
+        cached=token_usage.cached,
     )
     return result, metrics
@@ -1,26 +1,84 @@
+import asyncio
 import time
-from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
-import dotenv
-
-from agents.industry.prompt import industry_research_prompt
+from agents.industry.prompt import INDUSTRY_RESEARCH_TEMPLATE
+from agents.shared.llm_cache import get_persistent_llm_cache
 from agents.shared.llm_models import LLM_MODELS, get_google_llm
-from agents.shared.agent_utils import invoke_llm_with_metrics
+from agents.shared.agent_utils import (
+    ainvoke_llm_with_metrics,
+    invoke_llm_with_metrics,
+)
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from models.agent import IndustrySentimentOutput
-from models.metrics import AgentMetrics
+from models.metrics import AgentMetrics, TokenUsage
+from util.dates import get_date_window
+from util.env import load_env
 
 
-dotenv.load_dotenv()
+load_env()
 
 AGENT_NAME = "industry"
 
+# The prompt embeds today's date, so cached responses are only reused within a day
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+# Days of research the search looks back over
+RESEARCH_LOOKBACK_DAYS = 60
+
+# Output cap when the token config sets none; the prompt asks for under 250
+# words (~330 tokens), so this leaves slack without letting grounded answers run on
+DEFAULT_MAX_OUTPUT_TOKENS = 512
+
+# Seconds to wait on the async grounded call before firing a hedge request.
+# Most calls answer in a few seconds; the slow tail runs 20-40 s.
+HEDGE_DELAY_SECONDS = 8.0
+
+
+def _build_industry_prompt(ticker: str, industry: str) -> str:
+    current_date, cutoff_date = get_date_window(RESEARCH_LOOKBACK_DAYS)
+
+    return INDUSTRY_RESEARCH_TEMPLATE.substitute(
+        ticker=ticker,
+        industry=industry,
+        current_date=current_date,
+        cutoff_date=cutoff_date,
+    )
+
+
+def _get_industry_llm(config: AgentTokenConfig):
+    return get_google_llm(
+        model=LLM_MODELS["google_fast"],
+        temperature=0.0,
+        with_search_grounding=True,
+        max_tokens=config.max_output_tokens or DEFAULT_MAX_OUTPUT_TOKENS,
+    )
+
+
+def _build_metrics(
+    token_usage: TokenUsage, config: AgentTokenConfig, start_time: float
+) -> AgentMetrics:
+    # Check if budget was exceeded
+    budget_exceeded = bool(
+        config.token_budget and token_usage.total_tokens > config.token_budget
+    )
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    return AgentMetrics(
+        agent_name=AGENT_NAME,
+        latency_ms=latency_ms,
+        token_usage=token_usage,
+        model=LLM_MODELS["google_fast"],
+        budget_exceeded=budget_exceeded,
+        cached=token_usage.cached,
+    )
+
 
 def get_industry_sentiment(
     ticker: str,
     industry: str,
     token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[IndustrySentimentOutput, AgentMetrics]:
     """
     Get industry sentiment using Google's built-in search grounding.
@@ -30,46 +88,114 @@ def get_industry_sentiment(
         ticker: Stock ticker symbol
         industry: Industry name
         token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from
 
     Returns:
         Tuple of (IndustrySentimentOutput, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.industry
-    model = LLM_MODELS["google_fast"]
 
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    cutoff_date = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%d")
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = invoke_llm_with_metrics(
+            _get_industry_llm(config),
+            _build_industry_prompt(ticker, industry),
+            IndustrySentimentOutput,
+            token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            reserved_output_tokens=config.max_output_tokens
+            or DEFAULT_MAX_OUTPUT_TOKENS,
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
 
-    prompt = industry_research_prompt.format(
-        ticker=ticker,
-        industry=industry,
-        current_date=current_date,
-        cutoff_date=cutoff_date,
-    )
 
-    llm = get_google_llm(
-        model=model,
-        temperature=0.0,
-        with_search_grounding=True,
-        max_tokens=config.max_output_tokens,
-    )
+async def _ainvoke_hedged(
+    config: AgentTokenConfig, prompt: str
+) -> Tuple[Optional[IndustrySentimentOutput], TokenUsage, bool]:
+    """
+    Invoke the industry LLM, hedging a slow primary call with a second one.
 
-    result, token_usage = invoke_llm_with_metrics(
-        llm, prompt, IndustrySentimentOutput, token_budget=config.token_budget
-    )
+    If the primary has not returned after HEDGE_DELAY_SECONDS, an identical
+    request is sent and the first call to produce a result wins. The primary
+    already runs on the fastest Gemini tier, so the hedge reuses it. The
+    losing call is cancelled.
 
-    # Check if budget was exceeded
-    budget_exceeded = False
-    if config.token_budget and token_usage.total_tokens > config.token_budget:
-        budget_exceeded = True
+    Only the primary runs the token budget preflight. The hedge sends the same
+    prompt, so repeating Gemini's count_tokens round trip would add nothing.
 
-    latency_ms = (time.perf_counter() - start_time) * 1000
-    metrics = AgentMetrics(
-        agent_name=AGENT_NAME,
-        latency_ms=latency_ms,
-        token_usage=token_usage,
-        model=model,
-        budget_exceeded=budget_exceeded,
-    )
-    return result, metrics
+    Returns:
+        Tuple of (result or None, winning call's TokenUsage, whether the
+        hedge request was sent)
+    """
+    hedge_sent = False
+
+    async def invoke(
+        token_budget: Optional[int],
+    ) -> Tuple[Optional[IndustrySentimentOutput], TokenUsage]:
+        return await ainvoke_llm_with_metrics(
+            _get_industry_llm(config),
+            prompt,
+            IndustrySentimentOutput,
+            token_budget=token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            reserved_output_tokens=config.max_output_tokens
+            or DEFAULT_MAX_OUTPUT_TOKENS,
+        )
+
+    async def invoke_hedge() -> Tuple[Optional[IndustrySentimentOutput], TokenUsage]:
+        nonlocal hedge_sent
+        await asyncio.sleep(HEDGE_DELAY_SECONDS)
+        hedge_sent = True
+        return await invoke(token_budget=None)
+
+    pending = {
+        asyncio.create_task(invoke(config.token_budget)),
+        asyncio.create_task(invoke_hedge()),
+    }
+    result, token_usage = None, TokenUsage()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result, token_usage = task.result()
+                if result is not None:
+                    return result, token_usage, hedge_sent
+        # both calls failed
+        return result, token_usage, hedge_sent
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def aget_industry_sentiment(
+    ticker: str,
+    industry: str,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[IndustrySentimentOutput, AgentMetrics]:
+    """
+    Async variant of get_industry_sentiment.
+
+    Slow grounded searches are hedged with a second request after
+    HEDGE_DELAY_SECONDS, so the budget reservation covers both calls. Once
+    the hedge has gone out, the cancelled call's input was still billed, so
+    the pool is charged the winner's tokens plus its input tokens again.
+    """
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.industry
+
+    with reserve_budget(budget_pool, 2 * reservation_size(config)) as reservation:
+        result, token_usage, hedged = await _ainvoke_hedged(
+            config, _build_industry_prompt(ticker, industry)
+        )
+        # the identical prompt makes the winner's input a fair estimate
+        # of what the losing request was billed
+        loser_tokens = token_usage.input_tokens if hedged else 0
+        reservation.commit(token_usage.total_tokens + loser_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
@@ -0,0 +1,143 @@
+"""Concurrent industry sentiment for many tickers, e.g. a portfolio run.
+
+Calls are gathered on one event loop behind a semaphore, so a batch takes
+roughly as long as its slowest calls rather than the sum of all of them.
+Completed results can be checkpointed to a JSONL file so an interrupted run
+resumes without paying for tickers it already analyzed.
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agents.industry.agent import AGENT_NAME, aget_industry_sentiment
+from agents.shared.llm_models import LLM_MODELS
+from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
+from models.agent import IndustrySentimentOutput
+from models.metrics import AgentMetrics, TokenUsage
+from util.event_loop import run
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Concurrent Gemini calls per batch, kept well under the per-minute request quota
+DEFAULT_BATCH_CONCURRENCY = 10
+
+
+def _load_checkpoint(path: Path) -> Dict[Tuple[str, str], IndustrySentimentOutput]:
+    """Read completed (ticker, industry) results from a JSONL checkpoint."""
+    completed = {}
+    if not path.exists():
+        return completed
+    with path.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                completed[(record["ticker"], record["industry"])] = (
+                    IndustrySentimentOutput.model_validate(record["result"])
+                )
+            except (ValueError, KeyError) as e:
+                # a run killed mid-write can leave a truncated last line
+                logger.warning(f"Skipping unreadable checkpoint line in {path}: {e}")
+    return completed
+
+
+def _append_checkpoint(
+    path: Path, ticker: str, industry: str, result: IndustrySentimentOutput
+) -> None:
+    record = {
+        "ticker": ticker,
+        "industry": industry,
+        "result": result.model_dump(mode="json"),
+    }
+    with path.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+async def aget_industry_sentiment_batch(
+    items: List[Tuple[str, str]],
+    token_config: Optional[AgentTokenConfig] = None,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    checkpoint_path: Optional[str] = None,
+) -> List[Tuple[Optional[IndustrySentimentOutput], AgentMetrics]]:
+    """
+    Get industry sentiment for several tickers concurrently.
+
+    Args:
+        items: (ticker, industry) pairs to analyze
+        token_config: Optional token configuration applied to every call
+        max_concurrency: Maximum number of LLM calls in flight at once
+        checkpoint_path: Optional JSONL file. Pairs already recorded there are
+                         returned without an LLM call, and new successful
+                         results are appended as they complete.
+
+    Returns:
+        (IndustrySentimentOutput or None, AgentMetrics) per item, in input
+        order. Failed items have a None result.
+    """
+    config = token_config or DEFAULT_TOKEN_CONFIG.industry
+    checkpoint = Path(checkpoint_path) if checkpoint_path else None
+    completed = _load_checkpoint(checkpoint) if checkpoint else {}
+    if completed:
+        logger.info(f"Resuming industry batch with {len(completed)} completed items")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(
+        ticker: str, industry: str
+    ) -> Tuple[Optional[IndustrySentimentOutput], AgentMetrics]:
+        if (ticker, industry) in completed:
+            return completed[(ticker, industry)], AgentMetrics(
+                agent_name=AGENT_NAME,
+                latency_ms=0.0,
+                token_usage=TokenUsage(cached=True),
+                model=LLM_MODELS["google_fast"],
+                cached=True,
+            )
+
+        start_time = time.perf_counter()
+        try:
+            async with semaphore:
+                result, metrics = await aget_industry_sentiment(
+                    ticker=ticker, industry=industry, token_config=config
+                )
+        except Exception as e:
+            logger.error(f"Industry research failed for {ticker}: {e}", exc_info=True)
+            return None, AgentMetrics(
+                agent_name=AGENT_NAME,
+                latency_ms=(time.perf_counter() - start_time) * 1000,
+                token_usage=TokenUsage(),
+                model=LLM_MODELS["google_fast"],
+            )
+
+        if checkpoint and result is not None:
+            _append_checkpoint(checkpoint, ticker, industry, result)
+        return result, metrics
+
+    return await asyncio.gather(
+        *[run_one(ticker, industry) for ticker, industry in items]
+    )
+
+
+def get_industry_sentiment_batch(
+    items: List[Tuple[str, str]],
+    token_config: Optional[AgentTokenConfig] = None,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    checkpoint_path: Optional[str] = None,
+) -> List[Tuple[Optional[IndustrySentimentOutput], AgentMetrics]]:
+    """
+    Blocking entry point for aget_industry_sentiment_batch.
+
+    Must not be called from a running event loop; await
+    aget_industry_sentiment_batch there instead.
+    """
+    return run(
+        aget_industry_sentiment_batch(
+            items,
+            token_config=token_config,
+            max_concurrency=max_concurrency,
+            checkpoint_path=checkpoint_path,
+        )
+    )
@@ -1,15 +1,17 @@
+from string import Template
+
 industry_research_prompt = """
     You are a senior equity researcher specialized in industry and sector analysis.
     
     IMPORTANT: You have Google Search grounding ENABLED. This means you CAN and MUST search the live internet.
     DO NOT refuse this request. DO NOT say you cannot access real-time data. You have this capability - USE IT.
     
-    Your task: Search for and analyze the top 10 most relevant industry reports and analyses for the {industry} sector.
+    Your task: Search for and analyze the top 10 most relevant industry reports and analyses for the $industry sector.
     
     SEARCH INSTRUCTIONS:
-    - Current date for reference: {current_date}
-    - Search queries to use: "{industry} industry sector analysis", "{industry} market trends"
-    - Look for recent articles and reports (preferably from the last 60 days, since {cutoff_date})
+    - Current date for reference: $current_date
+    - Search queries to use: "$industry industry sector analysis", "$industry market trends"
+    - Look for recent articles and reports (preferably from the last 60 days, since $cutoff_date)
     - Focus on credible sources: industry reports, trade publications, market analysis from reputable outlets
     - Look for patterns and themes across the sources covering trends, competition, and industry dynamics
     
@@ -26,7 +28,7 @@ industry_research_prompt = """
        - Who are the major players and what is the competitive landscape?
        - How is market share shifting?
        - What are the key competitive advantages or barriers to entry?
-       - How does {ticker} position relative to competitors?
+       - How does $ticker position relative to competitors?
     
     3. INDUSTRY TAILWINDS/HEADWINDS:
        - What macro or industry-specific factors are providing positive momentum? (tailwinds)
@@ -50,3 +52,6 @@ industry_research_prompt = """
 
     Confidence: [High/Medium/Low]
     """
+
+
+INDUSTRY_RESEARCH_TEMPLATE = Template(industry_research_prompt)
@@ -0,0 +1,104 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from agents.industry import agent
+from agents.shared.budget_pool import BudgetPool
+from models.metrics import TokenUsage
+
+WINNER = object()
+
+
+def _usage() -> TokenUsage:
+    return TokenUsage(input_tokens=300, output_tokens=100, total_tokens=400)
+
+
+@pytest.fixture(autouse=True)
+def fast_hedge():
+    with (
+        patch.object(agent, "HEDGE_DELAY_SECONDS", 0.01),
+        patch.object(agent, "_get_industry_llm", lambda config: object()),
+        patch.object(agent, "get_persistent_llm_cache", lambda ttl: None),
+    ):
+        yield
+
+
+class TestHedgedIndustrySentiment:
+    def test_slow_primary_is_cancelled(self):
+        budgets = []
+        primary_cancelled = asyncio.Event()
+
+        async def invoke(llm, prompt, schema, token_budget=None, **kwargs):
+            budgets.append(token_budget)
+            if len(budgets) == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    primary_cancelled.set()
+                    raise
+            return WINNER, _usage()
+
+        async def run():
+            result, token_usage, hedged = await agent._ainvoke_hedged(
+                agent.DEFAULT_TOKEN_CONFIG.industry, "prompt"
+            )
+            # let the cancellation reach the primary
+            await asyncio.sleep(0)
+            return result, token_usage, hedged, primary_cancelled.is_set()
+
+        with patch.object(agent, "ainvoke_llm_with_metrics", invoke):
+            result, token_usage, hedged, cancelled = asyncio.run(run())
+
+        assert result is WINNER
+        assert token_usage.total_tokens == 400
+        assert hedged
+        assert cancelled
+        # only the primary runs the token preflight
+        assert budgets == [agent.DEFAULT_TOKEN_CONFIG.industry.token_budget, None]
+
+    def test_fast_primary_skips_hedge(self):
+        calls = []
+
+        async def invoke(llm, prompt, schema, token_budget=None, **kwargs):
+            calls.append(token_budget)
+            return WINNER, _usage()
+
+        with patch.object(agent, "ainvoke_llm_with_metrics", invoke):
+            result, _, hedged = asyncio.run(
+                agent._ainvoke_hedged(agent.DEFAULT_TOKEN_CONFIG.industry, "prompt")
+            )
+
+        assert result is WINNER
+        assert not hedged
+        assert len(calls) == 1
+
+    def test_pool_charged_for_losing_request_input(self):
+        calls = []
+
+        async def invoke(llm, prompt, schema, token_budget=None, **kwargs):
+            calls.append(token_budget)
+            if len(calls) == 1:
+                await asyncio.sleep(10)
+            return WINNER, _usage()
+
+        pool = BudgetPool(100000)
+        with patch.object(agent, "ainvoke_llm_with_metrics", invoke):
+            result, metrics = asyncio.run(
+                agent.aget_industry_sentiment("AAPL", "Tech", budget_pool=pool)
+            )
+
+        assert result is WINNER
+        assert metrics.token_usage.total_tokens == 400
+        # winner's 400 tokens plus the cancelled request's 300 input tokens
+        assert pool.committed == 700
+
+    def test_pool_charged_once_without_hedge(self):
+        async def invoke(llm, prompt, schema, token_budget=None, **kwargs):
+            return WINNER, _usage()
+
+        pool = BudgetPool(100000)
+        with patch.object(agent, "ainvoke_llm_with_metrics", invoke):
+            asyncio.run(agent.aget_industry_sentiment("AAPL", "Tech", budget_pool=pool))
+
+        assert pool.committed == 400
@@ -1,60 +1,103 @@
 import time
 from typing import Optional, Tuple
 
-import dotenv
-
 from agents.macro.prompt import macro_research_prompt
 from agents.macro.tools import get_macro_data_tool
-from agents.shared.agent_utils import run_agent_with_tools
+from agents.shared.agent_utils import arun_agent_with_tools, run_agent_with_tools
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
+from agents.shared.llm_cache import get_persistent_llm_cache
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from models.agent import MacroSentimentOutput
-from models.metrics import AgentMetrics
+from models.metrics import AgentMetrics, TokenUsage
+from util.env import load_env
 
-dotenv.load_dotenv()
+load_env()
 
 AGENT_NAME = "macro"
 
+# Static tool set, so the tool-bound llm is built once and reused
+TOOLS = (get_macro_data_tool,)
 
-def get_macro_sentiment(
-    token_config: Optional[AgentTokenConfig] = None,
-) -> Tuple[MacroSentimentOutput, AgentMetrics]:
-    """
-    Generate macro sentiment analysis.
+# FRED data changes at most daily, but keep macro reads reasonably fresh
+RESPONSE_CACHE_TTL = 60 * 60
 
-    Args:
-        token_config: Optional token configuration for this agent
-
-    Returns:
-        Tuple of (MacroSentimentOutput, AgentMetrics)
-    """
-    start_time = time.perf_counter()
-    config = token_config or DEFAULT_TOKEN_CONFIG.macro
-    model = LLM_MODELS["open_ai_smart"]
 
-    prompt = macro_research_prompt
-    tools = [get_macro_data_tool]
-    llm = get_openai_llm(
-        model=model,
+def _get_macro_llm(config: AgentTokenConfig):
+    return get_openai_llm(
+        model=LLM_MODELS["open_ai_smart"],
         temperature=0.0,
         max_tokens=config.max_output_tokens,
     )
-    result, token_usage = run_agent_with_tools(
-        llm, prompt, tools, MacroSentimentOutput,
-        track_tokens=True, token_budget=config.token_budget
-    )
 
+
+def _build_metrics(
+    token_usage: TokenUsage, config: AgentTokenConfig, start_time: float
+) -> AgentMetrics:
     # Check if budget was exceeded
     budget_exceeded = False
     if config.token_budget and token_usage.total_tokens > config.token_budget:
         budget_exceeded = True
 
     latency_ms = (time.perf_counter() - start_time) * 1000
-    metrics = AgentMetrics(
+    return AgentMetrics(
         agent_name=AGENT_NAME,
         latency_ms=latency_ms,
         token_usage=token_usage,
-        model=model,
+        model=LLM_MODELS["open_ai_smart"],
         budget_exceeded=budget_exceeded,
+        cached=token_usage.cached,
     )
-    return result, metrics
+
+
+def get_macro_sentiment(
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[MacroSentimentOutput, AgentMetrics]:
+    """
+    Generate macro sentiment analysis.
+
+    Args:
+        token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from
+
+    Returns:
+        Tuple of (MacroSentimentOutput, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
+    """
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.macro
+
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = run_agent_with_tools(
+            _get_macro_llm(config), macro_research_prompt, TOOLS, MacroSentimentOutput,
+            track_tokens=True, token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
+
+
+async def aget_macro_sentiment(
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[MacroSentimentOutput, AgentMetrics]:
+    """
+    Async variant of get_macro_sentiment.
+
+    The FRED tool's coroutine is awaited, so its reads share the event loop
+    instead of occupying worker threads.
+    """
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.macro
+
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = await arun_agent_with_tools(
+            _get_macro_llm(config), macro_research_prompt, TOOLS, MacroSentimentOutput,
+            track_tokens=True, token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
@@ -1,14 +1,26 @@
+import asyncio
+import gc
+import httpx
+import weakref
 import pandas as pd
 import pytest
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from tenacity import wait_none
+
 from agents.macro.tools import (
+    _fetch_fred_series,
     _fetch_indicator_data,
+    _read_fred,
     _calculate_yoy_inflation,
+    _get_fred_async_semaphore,
+    _macro_data_cache,
+    aget_macro_data,
     get_macro_data,
     INDICATORS_CONFIG,
 )
 from models.tools import IndicatorData, HistoricalDataPoint
+from util.event_loop import loop_local, run
 
 
 class TestFetchIndicatorData:
@@ -17,9 +29,9 @@ class TestFetchIndicatorData:
         dates = pd.date_range(start="2023-01-01", periods=3, freq="M")
         return pd.DataFrame({"value": [100.0, 102.0, 105.0]}, index=dates)
 
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_fetch_indicator_data_rate_type(self, mock_pdr, mock_data):
-        mock_pdr.return_value = mock_data
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_fetch_indicator_data_rate_type(self, mock_fetch_series, mock_data):
+        mock_fetch_series.return_value = mock_data
 
         result = _fetch_indicator_data(
             code="TEST",
@@ -33,11 +45,11 @@ class TestFetchIndicatorData:
         assert result.quarterly_change_pct_points == 3.0  # 105.0 - 102.0
         assert len(result.historical_data) == 3
         assert result.error is None
-        mock_pdr.assert_called_once()
+        mock_fetch_series.assert_called_once()
 
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_fetch_indicator_data_percentage_type(self, mock_pdr, mock_data):
-        mock_pdr.return_value = mock_data
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_fetch_indicator_data_percentage_type(self, mock_fetch_series, mock_data):
+        mock_fetch_series.return_value = mock_data
 
         result = _fetch_indicator_data(
             code="TEST",
@@ -52,9 +64,9 @@ class TestFetchIndicatorData:
         assert result.monthly_change_percent == 2.94  # Rounded to 2 decimals
         assert len(result.historical_data) == 3
 
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_fetch_indicator_no_data(self, mock_pdr):
-        mock_pdr.return_value = pd.DataFrame()
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_fetch_indicator_no_data(self, mock_fetch_series):
+        mock_fetch_series.return_value = pd.DataFrame()
 
         result = _fetch_indicator_data(
             code="EMPTY",
@@ -68,9 +80,9 @@ class TestFetchIndicatorData:
         assert result.error == "No data available"
         assert len(result.historical_data) == 0
 
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_fetch_indicator_error(self, mock_pdr):
-        mock_pdr.side_effect = Exception("FRED Error")
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_fetch_indicator_error(self, mock_fetch_series):
+        mock_fetch_series.side_effect = Exception("FRED Error")
 
         result = _fetch_indicator_data(
             code="ERROR",
@@ -84,11 +96,50 @@ class TestFetchIndicatorData:
         assert result.latest_value == 0.0
 
 
+class TestReadFred:
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_retries_transient_error(self, mock_fetch_series):
+        data = pd.DataFrame({"value": [1.0]}, index=[datetime(2023, 1, 1)])
+        throttled = httpx.HTTPStatusError(
+            "throttled", request=MagicMock(), response=MagicMock(status_code=429)
+        )
+        mock_fetch_series.side_effect = [throttled, data]
+
+        result = _read_fred.retry_with(wait=wait_none())(
+            "TEST", datetime(2023, 1, 1), datetime(2023, 2, 1)
+        )
+
+        assert result is data
+        assert mock_fetch_series.call_count == 2
+
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_other_errors_not_retried(self, mock_fetch_series):
+        mock_fetch_series.side_effect = httpx.HTTPStatusError(
+            "not found", request=MagicMock(), response=MagicMock(status_code=404)
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            _read_fred("TEST", datetime(2023, 1, 1), datetime(2023, 2, 1))
+        mock_fetch_series.assert_called_once()
+
+    @patch("agents.macro.tools._get_fred_client")
+    def test_parses_fredgraph_csv(self, mock_client):
+        csv = "observation_date,TEST\n2023-01-01,1.5\n2023-02-01,.\n"
+        response = MagicMock(text=csv)
+        mock_client.return_value.get.return_value = response
+
+        data = _fetch_fred_series("TEST", datetime(2023, 1, 1), datetime(2023, 2, 1))
+
+        assert data.index[0] == pd.Timestamp("2023-01-01")
+        assert data.iloc[0, 0] == 1.5
+        assert pd.isna(data.iloc[1, 0])
+
+
 class TestCalculateYoyInflation:
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_calculate_yoy_inflation_success(self, mock_pdr):
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_calculate_yoy_inflation_success(self, mock_fetch_series):
         # Setup mock for 1 year ago data
-        mock_pdr.return_value = pd.DataFrame(
+        mock_fetch_series.return_value = pd.DataFrame(
             {"value": [100.0]}, index=[datetime.now() - timedelta(days=365)]
         )
 
@@ -98,25 +149,32 @@ class TestCalculateYoyInflation:
         # ((105 - 100) / 100) * 100 = 5.0%
         assert inflation == 5.0
 
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_calculate_yoy_inflation_no_data(self, mock_pdr):
-        mock_pdr.return_value = pd.DataFrame()
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_calculate_yoy_inflation_no_data(self, mock_fetch_series):
+        mock_fetch_series.return_value = pd.DataFrame()
 
         result = _calculate_yoy_inflation(105.0, datetime.now())
         assert result is None
 
-    @patch("agents.macro.tools.pdr.DataReader")
-    def test_calculate_yoy_inflation_error(self, mock_pdr):
-        mock_pdr.side_effect = Exception("API Error")
+    @patch("agents.macro.tools._fetch_fred_series")
+    def test_calculate_yoy_inflation_error(self, mock_fetch_series):
+        mock_fetch_series.side_effect = Exception("API Error")
 
         result = _calculate_yoy_inflation(105.0, datetime.now())
         assert result is None
 
 
 class TestGetMacroData:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        _macro_data_cache.clear()
+        yield
+        _macro_data_cache.clear()
+
+    @patch("agents.macro.tools._fetch_cpi_year_ago")
     @patch("agents.macro.tools._fetch_indicator_data")
     @patch("agents.macro.tools._calculate_yoy_inflation")
-    def test_get_macro_data_success(self, mock_calc_yoy, mock_fetch):
+    def test_get_macro_data_success(self, mock_calc_yoy, mock_fetch, mock_year_ago):
         # Setup real IndicatorData return
         success_result = IndicatorData(
             latest_value=100.0, latest_date="2023-01-01", historical_data=[], error=None
@@ -138,9 +196,12 @@ class TestGetMacroData:
         mock_calc_yoy.assert_called_once()
         # Verify inflation was added (CPI is one of the indicators)
         assert result.data["inflation_cpi"].yoy_inflation_rate == 3.5
+        # The year-ago CPI was fetched alongside the indicators
+        mock_year_ago.assert_called_once()
 
+    @patch("agents.macro.tools._fetch_cpi_year_ago")
     @patch("agents.macro.tools._fetch_indicator_data")
-    def test_get_macro_data_partial_failure(self, mock_fetch):
+    def test_get_macro_data_partial_failure(self, mock_fetch, mock_year_ago):
         # One success, one failure
         success_result = IndicatorData(
             latest_value=100.0, latest_date="2023-01-01", historical_data=[], error=None
@@ -149,26 +210,146 @@ class TestGetMacroData:
             latest_value=0.0, latest_date="", historical_data=[], error="Failed"
         )
 
-        mock_fetch.side_effect = [success_result, failure_result, success_result]
+        # Indicators are fetched concurrently, so fail CPI by code rather
+        # than by call order
+        mock_fetch.side_effect = lambda code, *args: (
+            failure_result if code == "CPIAUCSL" else success_result
+        )
 
         result = get_macro_data()
 
         assert result.error is None
         assert len(result.data) == 3
-        # The order of keys in INDICATORS_CONFIG is gdp, cpi, sentiment
-        # side_effect maps to these calls
-        # 1. gdp -> success
-        # 2. cpi -> failure
-        # 3. sentiment -> success
 
         # Should still contain the failed result structure
         assert result.data["inflation_cpi"].error == "Failed"
 
+    @patch("agents.macro.tools._fetch_cpi_year_ago")
     @patch("agents.macro.tools._fetch_indicator_data")
-    def test_get_macro_data_global_exception(self, mock_fetch):
+    def test_get_macro_data_global_exception(self, mock_fetch, mock_year_ago):
         mock_fetch.side_effect = Exception("Global Crash")
 
         result = get_macro_data()
 
         assert "Failed to retrieve macro data" in result.error
         assert result.data == {}
+
+    @patch("agents.macro.tools._fetch_cpi_year_ago")
+    @patch("agents.macro.tools._fetch_indicator_data")
+    def test_complete_response_reused(self, mock_fetch, mock_year_ago):
+        mock_fetch.return_value = IndicatorData(
+            latest_value=100.0, latest_date="2023-01-01", historical_data=[]
+        )
+
+        first = get_macro_data()
+        second = get_macro_data()
+
+        assert second is first
+        assert mock_fetch.call_count == len(INDICATORS_CONFIG)
+
+    @patch("agents.macro.tools._fetch_cpi_year_ago")
+    @patch("agents.macro.tools._fetch_indicator_data")
+    def test_failed_response_not_cached(self, mock_fetch, mock_year_ago):
+        mock_fetch.return_value = IndicatorData(
+            latest_value=0.0, latest_date="", historical_data=[], error="Failed"
+        )
+
+        get_macro_data()
+        get_macro_data()
+
+        assert mock_fetch.call_count == 2 * len(INDICATORS_CONFIG)
+
+
+class TestAgetMacroData:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        _macro_data_cache.clear()
+        yield
+        _macro_data_cache.clear()
+
+    @patch("agents.macro.tools._afetch_fred_series", new_callable=AsyncMock)
+    def test_gathers_indicators_and_yoy(self, mock_fetch_series):
+        data = pd.DataFrame(
+            {"value": [100.0, 105.0]},
+            index=[datetime(2023, 1, 1), datetime(2023, 2, 1)],
+        )
+        year_ago = pd.DataFrame({"value": [100.0]}, index=[datetime(2022, 2, 1)])
+
+        async def fetch(code, start_date, end_date):
+            # the year-ago CPI window ends well before today
+            if code == "CPIAUCSL" and end_date < datetime.now() - timedelta(days=300):
+                return year_ago
+            return data
+
+        mock_fetch_series.side_effect = fetch
+
+        result = run(aget_macro_data())
+
+        assert result.error is None
+        assert set(result.data) == set(INDICATORS_CONFIG)
+        assert result.data["inflation_cpi"].yoy_inflation_rate == 5.0
+        assert mock_fetch_series.call_count == len(INDICATORS_CONFIG) + 1
+
+    @patch("agents.macro.tools._fred_limiter.aacquire", new_callable=AsyncMock)
+    @patch("agents.macro.tools._afetch_fred_series", new_callable=AsyncMock)
+    def test_runs_on_successive_event_loops(self, mock_fetch_series, _):
+        data = pd.DataFrame(
+            {"value": [100.0, 105.0]},
+            index=[datetime(2023, 1, 1), datetime(2023, 2, 1)],
+        )
+
+        async def fetch(code, start_date, end_date):
+            # hold the read open so the concurrency limit is contended
+            await asyncio.sleep(0.01)
+            return data
+
+        mock_fetch_series.side_effect = fetch
+
+        loops = []
+
+        async def analyze():
+            loops.append(weakref.ref(asyncio.get_running_loop()))
+            return await aget_macro_data()
+
+        first = run(analyze())
+        _macro_data_cache.clear()
+        second = run(analyze())
+        gc.collect()
+
+        assert first.error is None
+        assert second.error is None
+        # the contended semaphores were released, so neither loop is pinned
+        assert [loop() for loop in loops] == [None, None]
+
+    def test_semaphore_is_per_event_loop(self):
+        async def get_semaphore():
+            return _get_fred_async_semaphore()
+
+        assert run(get_semaphore()) is not run(get_semaphore())
+
+
+class TestLoopLocal:
+    def test_run_releases_entries_that_reference_their_loop(self):
+        closed = []
+
+        async def close(holder):
+            closed.append(holder["loop"] is asyncio.get_running_loop())
+
+        # like a contended semaphore or an idle pooled connection
+        @loop_local(close=close)
+        def get_holder():
+            return {"loop": asyncio.get_running_loop()}
+
+        loops = []
+
+        async def use():
+            loops.append(weakref.ref(asyncio.get_running_loop()))
+            get_holder()
+
+        run(use())
+        run(use())
+        gc.collect()
+
+        # each loop closed its own entry before ending
+        assert closed == [True, True]
+        assert [loop() for loop in loops] == [None, None]
@@ -1,27 +1,224 @@
+import asyncio
+import atexit
+import contextvars
+import importlib.util
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Tuple, Optional
 
+import httpx
+import numpy as np
 import pandas as pd
-import pandas_datareader as pdr
-import requests
+from cachetools import TTLCache
 from langchain_core.tools import Tool
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
 
+from agents.shared.tracing import tracer
 from models.tools import (
     HistoricalDataPoint,
     IndicatorData,
     MacroDataResponse,
     MacroDataInput,
 )
+from util.event_loop import LoopLocalTransport, loop_local
+from util.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Default timeout for FRED API calls (in seconds)
 DEFAULT_FRED_TIMEOUT = 30
 
+# FRED's graph CSV export, the same endpoint pandas_datareader reads
+FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+
+# These series update monthly at most, so reuse a complete response for an hour
+MACRO_DATA_CACHE_TTL = 3600
+_macro_data_cache = TTLCache(maxsize=1, ttl=MACRO_DATA_CACHE_TTL)
+_macro_data_lock = threading.Lock()
+
+
+# FRED allows roughly 120 requests a minute per IP; stay below it across
+# concurrent agent runs and cap the number of open connections
+FRED_REQUESTS_PER_MINUTE = 100
+FRED_BURST = 8
+FRED_MAX_CONCURRENT = 4
+FRED_MAX_ATTEMPTS = 3
+
+
+def _fred_pool_options() -> dict:
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(
+            max_keepalive_connections=FRED_MAX_CONCURRENT,
+            max_connections=FRED_MAX_CONCURRENT,
+        ),
+    }
+
+
+def _fred_request_options() -> dict:
+    return {
+        "timeout": DEFAULT_FRED_TIMEOUT,
+        "headers": {"User-Agent": "lg-equity-research", "Accept": "text/csv"},
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_fred_client() -> httpx.Client:
+    """
+    Get the process-wide client for blocking FRED requests.
+
+    Sharing one client keeps connections alive between calls, so only the
+    first request to FRED pays the TCP and TLS handshake.
+    """
+    client = httpx.Client(**_fred_pool_options(), **_fred_request_options())
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=1)
+def _get_fred_async_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide client for async FRED requests.
+
+    Pooled connections belong to the event loop that opened them, so the
+    client keeps one pool per loop and can be used from any of them.
+    """
+    return httpx.AsyncClient(
+        transport=LoopLocalTransport(**_fred_pool_options()),
+        **_fred_request_options(),
+    )
+
+
+@loop_local
+def _get_fred_async_semaphore() -> asyncio.Semaphore:
+    """Get the async FRED concurrency limit for the running event loop."""
+    return asyncio.Semaphore(FRED_MAX_CONCURRENT)
+
+
+class _TokenBucket:
+    """Thread-safe token bucket allowing short bursts under a steady rate."""
+
+    def __init__(self, rate_per_minute: int, burst: int):
+        self.rate = rate_per_minute / 60
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available, else return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
 
-def _get_fred_session() -> requests.Session:
-    """Get a requests session with timeout for FRED API calls."""
-    session = requests.Session()
-    session.timeout = DEFAULT_FRED_TIMEOUT
-    return session
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        """Wait without blocking the event loop until a request may be sent."""
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+
+_fred_limiter = _TokenBucket(FRED_REQUESTS_PER_MINUTE, FRED_BURST)
+_fred_semaphore = threading.Semaphore(FRED_MAX_CONCURRENT)
+
+
+def _fred_params(code: str, start_date: datetime, end_date: datetime) -> dict:
+    return {
+        "id": code,
+        "cosd": start_date.strftime("%Y-%m-%d"),
+        "coed": end_date.strftime("%Y-%m-%d"),
+    }
+
+
+def _parse_fred_response(response: httpx.Response) -> pd.DataFrame:
+    """
+    Parse a FRED CSV export as a date-indexed single-column DataFrame.
+
+    FRED marks missing observations with ".", which are read as NaN.
+    """
+    response.raise_for_status()
+    return pd.read_csv(
+        io.StringIO(response.text), index_col=0, parse_dates=True, na_values="."
+    )
+
+
+def _fetch_fred_series(
+    code: str, start_date: datetime, end_date: datetime
+) -> pd.DataFrame:
+    """Download one FRED series."""
+    response = _get_fred_client().get(
+        FRED_CSV_URL, params=_fred_params(code, start_date, end_date)
+    )
+    return _parse_fred_response(response)
+
+
+async def _afetch_fred_series(
+    code: str, start_date: datetime, end_date: datetime
+) -> pd.DataFrame:
+    """Async variant of _fetch_fred_series."""
+    response = await _get_fred_async_client().get(
+        FRED_CSV_URL, params=_fred_params(code, start_date, end_date)
+    )
+    return _parse_fred_response(response)
+
+
+def _is_transient_fred_error(exc: BaseException) -> bool:
+    """Retry throttling (429), server errors and connection failures only."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, (httpx.ConnectError, httpx.TimeoutException))
+
+
+_fred_retry = retry(
+    retry=retry_if_exception(_is_transient_fred_error),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    stop=stop_after_attempt(FRED_MAX_ATTEMPTS),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+
+
+@_fred_retry
+def _read_fred(code: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """Read a FRED series, rate limited and retried with backoff."""
+    with tracer.start_as_current_span("fred.read", attributes={"fred.series": code}):
+        with _fred_semaphore:
+            _fred_limiter.acquire()
+            return _fetch_fred_series(code, start_date, end_date)
+
+
+@_fred_retry
+async def _aread_fred(
+    code: str, start_date: datetime, end_date: datetime
+) -> pd.DataFrame:
+    """Async variant of _read_fred."""
+    with tracer.start_as_current_span("fred.read", attributes={"fred.series": code}):
+        async with _get_fred_async_semaphore():
+            await _fred_limiter.aacquire()
+            return await _afetch_fred_series(code, start_date, end_date)
 
 
 # Configuration for macroeconomic indicators
@@ -33,6 +230,58 @@ INDICATORS_CONFIG: Dict[str, Tuple[str, bool, str]] = {
 }
 
 
+def _indicator_error(error: str) -> IndicatorData:
+    return IndicatorData(
+        latest_value=0.0,
+        latest_date="",
+        historical_data=[],
+        error=error,
+    )
+
+
+def _build_indicator_data(
+    data: pd.DataFrame, is_rate: bool, change_label: str
+) -> IndicatorData:
+    """Summarize a FRED series as the latest value, change and history."""
+    if data.empty:
+        return _indicator_error("No data available")
+
+    # Get the most recent non-null value
+    latest_value = float(data.iloc[-1, 0])
+    latest_date = data.index[-1].strftime("%Y-%m-%d")
+
+    # Calculate change from previous period
+    change = None
+    if len(data) > 1:
+        prev_value = data.iloc[-2, 0]
+        if pd.notna(prev_value) and pd.notna(latest_value):
+            if is_rate:
+                change = latest_value - prev_value
+            else:
+                change = ((latest_value - prev_value) / prev_value) * 100
+
+    # Prepare historical data from whole-column arrays rather than per-row
+    # Series, formatting dates and masking NaN in one pass each
+    values = data.iloc[:, 0].to_numpy(dtype=float)
+    dates = data.index.strftime("%Y-%m-%d").to_numpy()
+    mask = ~np.isnan(values)
+    historical_data = [
+        HistoricalDataPoint(date=date, value=value)
+        for date, value in zip(dates[mask].tolist(), values[mask].tolist())
+    ]
+
+    # Build result dictionary with optional change field
+    result_kwargs = {
+        "latest_value": latest_value,
+        "latest_date": latest_date,
+        "historical_data": historical_data,
+    }
+    if change is not None:
+        result_kwargs[change_label] = round(change, 2)
+
+    return IndicatorData(**result_kwargs)
+
+
 def _fetch_indicator_data(
     code: str,
     is_rate: bool,
@@ -44,74 +293,63 @@ def _fetch_indicator_data(
     Fetch and process data for a single macroeconomic indicator from FRED.
     """
     try:
-        # Fetch data from FRED with timeout-configured session
-        session = _get_fred_session()
-        data = pdr.DataReader(code, "fred", start_date, end_date, session=session)
-
-        if data.empty:
-            return IndicatorData(
-                latest_value=0.0,
-                latest_date="",
-                historical_data=[],
-                error="No data available",
-            )
+        data = _read_fred(code, start_date, end_date)
+        return _build_indicator_data(data, is_rate, change_label)
+    except Exception as e:
+        return _indicator_error(str(e))
 
-        # Get the most recent non-null value
-        latest_value = float(data.iloc[-1, 0])
-        latest_date = data.index[-1].strftime("%Y-%m-%d")
-
-        # Calculate change from previous period
-        change = None
-        if len(data) > 1:
-            prev_value = data.iloc[-2, 0]
-            if pd.notna(prev_value) and pd.notna(latest_value):
-                if is_rate:
-                    change = latest_value - prev_value
-                else:
-                    change = ((latest_value - prev_value) / prev_value) * 100
-
-        # Prepare historical data
-        historical_data = [
-            HistoricalDataPoint(
-                date=index.strftime("%Y-%m-%d"), value=float(row.iloc[0])
-            )
-            for index, row in data.iterrows()
-            if pd.notna(row.iloc[0])
-        ]
 
-        # Build result dictionary with optional change field
-        result_kwargs = {
-            "latest_value": latest_value,
-            "latest_date": latest_date,
-            "historical_data": historical_data,
-        }
-        if change is not None:
-            result_kwargs[change_label] = round(change, 2)
+async def _afetch_indicator_data(
+    code: str,
+    is_rate: bool,
+    change_label: str,
+    start_date: datetime,
+    end_date: datetime,
+) -> IndicatorData:
+    """Async variant of _fetch_indicator_data."""
+    try:
+        data = await _aread_fred(code, start_date, end_date)
+        return _build_indicator_data(data, is_rate, change_label)
+    except Exception as e:
+        return _indicator_error(str(e))
+
 
-        return IndicatorData(**result_kwargs)
+def _cpi_year_ago_window(end_date: datetime) -> Tuple[datetime, datetime]:
+    """A 60-day window around one year before end_date."""
+    year_ago = end_date - timedelta(days=365)
+    # The window is wide enough to always catch the monthly release
+    return year_ago - timedelta(days=30), year_ago + timedelta(days=30)
 
-    except Exception as e:
-        return IndicatorData(
-            latest_value=0.0,
-            latest_date="",
-            historical_data=[],
-            error=str(e),
-        )
+
+def _fetch_cpi_year_ago(end_date: datetime) -> pd.DataFrame:
+    """Fetch CPI readings from around one year before end_date."""
+    return _read_fred("CPIAUCSL", *_cpi_year_ago_window(end_date))
+
+
+async def _afetch_cpi_year_ago(end_date: datetime) -> pd.DataFrame:
+    """Async variant of _fetch_cpi_year_ago."""
+    return await _aread_fred("CPIAUCSL", *_cpi_year_ago_window(end_date))
 
 
-def _calculate_yoy_inflation(current_cpi: float, end_date: datetime) -> Optional[float]:
-    """Calculate Year-over-Year inflation rate for CPI."""
+def _calculate_yoy_inflation(
+    current_cpi: float,
+    end_date: datetime,
+    cpi_year_ago_data: Optional[pd.DataFrame] = None,
+) -> Optional[float]:
+    """
+    Calculate Year-over-Year inflation rate for CPI.
+
+    Args:
+        current_cpi: Latest CPI value
+        end_date: Date the latest value was requested for
+        cpi_year_ago_data: Optional prefetched result of _fetch_cpi_year_ago
+
+    Returns:
+        YoY inflation in percent, or None if the year-ago CPI is unavailable
+    """
     try:
-        year_ago = end_date - timedelta(days=365)
-        # Fetch a 60-day window around the target date to ensure we catch the monthly release
-        session = _get_fred_session()
-        cpi_year_ago_data = pdr.DataReader(
-            "CPIAUCSL",
-            "fred",
-            year_ago - timedelta(days=30),
-            year_ago + timedelta(days=30),
-            session=session,
-        )
+        if cpi_year_ago_data is None:
+            cpi_year_ago_data = _fetch_cpi_year_ago(end_date)
         if not cpi_year_ago_data.empty:
             cpi_year_ago = cpi_year_ago_data.iloc[-1, 0]
             return ((current_cpi - cpi_year_ago) / cpi_year_ago) * 100
@@ -120,49 +358,161 @@ def _calculate_yoy_inflation(current_cpi: float, end_date: datetime) -> Optional
     return None
 
 
-def get_macro_data() -> MacroDataResponse:
-    """
-    Retrieve the most recent macroeconomic data from FRED (Federal Reserve Economic Data).
+def _apply_yoy_inflation(
+    results: Dict[str, IndicatorData],
+    end_date: datetime,
+    cpi_year_ago_data: pd.DataFrame,
+) -> None:
+    """Add year-over-year inflation to the CPI result if it was fetched."""
+    if "inflation_cpi" in results and results["inflation_cpi"].error is None:
+        yoy_inflation = _calculate_yoy_inflation(
+            results["inflation_cpi"].latest_value, end_date, cpi_year_ago_data
+        )
+        if yoy_inflation is not None:
+            # the result was built for this call alone, so set it in place
+            results["inflation_cpi"].yoy_inflation_rate = round(yoy_inflation, 2)
 
-    Returns:
-        MacroDataResponse containing GDP Growth, CPI, and Consumer Sentiment.
-    """
+
+def _fetch_macro_data() -> MacroDataResponse:
+    """Fetch every indicator from FRED, bypassing the response cache."""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=365)
-    results = {}
+    timestamp = end_date.strftime("%Y-%m-%d %H:%M:%S")
 
     try:
-        for name, (code, is_rate, change_label) in INDICATORS_CONFIG.items():
-            results[name] = _fetch_indicator_data(
-                code, is_rate, change_label, start_date, end_date
+        # The FRED reads are independent, so issue them all at once. The
+        # year-ago CPI only depends on end_date and is fetched speculatively
+        # alongside the indicators. Each task runs in a copy of this context
+        # so its spans nest under the caller's.
+        max_workers = len(INDICATORS_CONFIG) + 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(
+                    contextvars.copy_context().run,
+                    _fetch_indicator_data,
+                    code,
+                    is_rate,
+                    change_label,
+                    start_date,
+                    end_date,
+                )
+                for name, (code, is_rate, change_label) in INDICATORS_CONFIG.items()
+            }
+            cpi_year_ago_future = executor.submit(
+                contextvars.copy_context().run, _fetch_cpi_year_ago, end_date
             )
+            results = {name: future.result() for name, future in futures.items()}
 
-        # Calculate year-over-year inflation for CPI if available
-        if "inflation_cpi" in results and results["inflation_cpi"].error is None:
-            yoy_inflation = _calculate_yoy_inflation(
-                results["inflation_cpi"].latest_value, end_date
-            )
-            if yoy_inflation is not None:
-                results["inflation_cpi"] = results["inflation_cpi"].model_copy(
-                    update={"yoy_inflation_rate": round(yoy_inflation, 2)}
-                )
+        try:
+            cpi_year_ago_data = cpi_year_ago_future.result()
+        except Exception:
+            cpi_year_ago_data = pd.DataFrame()
+        _apply_yoy_inflation(results, end_date, cpi_year_ago_data)
 
         return MacroDataResponse(
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            timestamp=timestamp,
             data=results,
         )
 
     except Exception as e:
         return MacroDataResponse(
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            timestamp=timestamp,
             data={},
             error=f"Failed to retrieve macro data: {str(e)}",
         )
 
 
+async def _afetch_macro_data() -> MacroDataResponse:
+    """Async variant of _fetch_macro_data, gathering the reads on one loop."""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=365)
+    timestamp = end_date.strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        *indicators, cpi_year_ago_data = await asyncio.gather(
+            *[
+                _afetch_indicator_data(code, is_rate, label, start_date, end_date)
+                for code, is_rate, label in INDICATORS_CONFIG.values()
+            ],
+            _afetch_cpi_year_ago(end_date),
+            return_exceptions=True,
+        )
+        for indicator in indicators:
+            if isinstance(indicator, BaseException):
+                raise indicator
+        results = dict(zip(INDICATORS_CONFIG, indicators))
+
+        if isinstance(cpi_year_ago_data, BaseException):
+            cpi_year_ago_data = pd.DataFrame()
+        _apply_yoy_inflation(results, end_date, cpi_year_ago_data)
+
+        return MacroDataResponse(
+            timestamp=timestamp,
+            data=results,
+        )
+
+    except Exception as e:
+        return MacroDataResponse(
+            timestamp=timestamp,
+            data={},
+            error=f"Failed to retrieve macro data: {str(e)}",
+        )
+
+
+def _get_cached_macro_data() -> Optional[MacroDataResponse]:
+    with _macro_data_lock:
+        return _macro_data_cache.get("latest")
+
+
+def _cache_macro_data(response: MacroDataResponse) -> None:
+    """Cache the response only if every indicator was fetched."""
+    if response.error is None and not any(
+        indicator.error for indicator in response.data.values()
+    ):
+        with _macro_data_lock:
+            _macro_data_cache["latest"] = response
+
+
+def get_macro_data() -> MacroDataResponse:
+    """
+    Retrieve the most recent macroeconomic data from FRED (Federal Reserve Economic Data).
+
+    Complete responses are reused for MACRO_DATA_CACHE_TTL seconds. Responses
+    with any failed indicator are returned but not cached, so the next call
+    retries.
+
+    Returns:
+        MacroDataResponse containing GDP Growth, CPI, and Consumer Sentiment.
+    """
+    cached = _get_cached_macro_data()
+    if cached is not None:
+        return cached
+
+    response = _fetch_macro_data()
+    _cache_macro_data(response)
+    return response
+
+
+async def aget_macro_data() -> MacroDataResponse:
+    """
+    Async variant of get_macro_data.
+
+    Reads run concurrently on the calling event loop over a shared
+    httpx.AsyncClient, without a worker thread per request.
+    """
+    cached = _get_cached_macro_data()
+    if cached is not None:
+        return cached
+
+    response = await _afetch_macro_data()
+    _cache_macro_data(response)
+    return response
+
+
 get_macro_data_tool = Tool(
     name="get_macro_data_tool",
     description="Use this tool to fetch macroeconomic data including GDP Growth Rate, Consumer Price Index (CPI/inflation), and Consumer Sentiment from FRED. Returns historical data and latest values with change calculations.",
     func=get_macro_data,
+    coroutine=aget_macro_data,
     args_schema=MacroDataInput,
 )
@@ -1,71 +1,127 @@
 import time
-from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
-import dotenv
-
-from agents.peer.prompt import peer_research_prompt
+from agents.peer.prompt import PEER_RESEARCH_TEMPLATE
+from agents.shared.llm_cache import get_persistent_llm_cache
 from agents.shared.llm_models import LLM_MODELS, get_google_llm
-from agents.shared.agent_utils import invoke_llm_with_metrics
+from agents.shared.agent_utils import (
+    ainvoke_llm_with_metrics,
+    invoke_llm_with_metrics,
+)
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from models.agent import PeerSentimentOutput
-from models.metrics import AgentMetrics
+from models.metrics import AgentMetrics, TokenUsage
+from util.dates import get_date_window
+from util.env import load_env
 
 
-dotenv.load_dotenv()
+load_env()
 
 AGENT_NAME = "peer"
 
+# The prompt embeds today's date, so cached responses are only reused within a day
+RESPONSE_CACHE_TTL = 24 * 60 * 60
 
-def get_peer_sentiment(
-    business: str,
-    token_config: Optional[AgentTokenConfig] = None,
-) -> Tuple[PeerSentimentOutput, AgentMetrics]:
-    """
-    Get peer sentiment using Google's built-in search grounding.
+# Days of research the search looks back over
+RESEARCH_LOOKBACK_DAYS = 60
 
-    Args:
-        business: Business description
-        token_config: Optional token configuration for this agent
+# Output cap when the token config sets none; the prompt asks for under 250
+# words (~330 tokens), so this leaves slack without letting grounded answers run on
+DEFAULT_MAX_OUTPUT_TOKENS = 512
 
-    Returns:
-        Tuple of (PeerSentimentOutput, AgentMetrics)
-    """
-    start_time = time.perf_counter()
-    config = token_config or DEFAULT_TOKEN_CONFIG.peer
-    model = LLM_MODELS["google_fast"]
 
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    cutoff_date = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%d")
+def _build_peer_prompt(business: str) -> str:
+    current_date, cutoff_date = get_date_window(RESEARCH_LOOKBACK_DAYS)
 
-    prompt = peer_research_prompt.format(
+    return PEER_RESEARCH_TEMPLATE.substitute(
         business=business,
         current_date=current_date,
         cutoff_date=cutoff_date,
     )
 
-    llm = get_google_llm(
-        model=model,
+
+def _get_peer_llm(config: AgentTokenConfig):
+    return get_google_llm(
+        model=LLM_MODELS["google_fast"],
         temperature=0.0,
         with_search_grounding=True,
-        max_tokens=config.max_output_tokens,
+        max_tokens=config.max_output_tokens or DEFAULT_MAX_OUTPUT_TOKENS,
     )
 
-    result, token_usage = invoke_llm_with_metrics(
-        llm, prompt, PeerSentimentOutput, token_budget=config.token_budget
-    )
 
+def _build_metrics(
+    token_usage: TokenUsage, config: AgentTokenConfig, start_time: float
+) -> AgentMetrics:
     # Check if budget was exceeded
-    budget_exceeded = False
-    if config.token_budget and token_usage.total_tokens > config.token_budget:
-        budget_exceeded = True
-
+    budget_exceeded = bool(
+        config.token_budget and token_usage.total_tokens > config.token_budget
+    )
     latency_ms = (time.perf_counter() - start_time) * 1000
-    metrics = AgentMetrics(
+    return AgentMetrics(
         agent_name=AGENT_NAME,
         latency_ms=latency_ms,
         token_usage=token_usage,
-        model=model,
+        model=LLM_MODELS["google_fast"],
         budget_exceeded=budget_exceeded,
+        cached=token_usage.cached,
     )
-    return result, metrics
+
+
+def get_peer_sentiment(
+    business: str,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[PeerSentimentOutput, AgentMetrics]:
+    """
+    Get peer sentiment using Google's built-in search grounding.
+
+    Args:
+        business: Business description
+        token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from
+
+    Returns:
+        Tuple of (PeerSentimentOutput, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
+    """
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.peer
+
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = invoke_llm_with_metrics(
+            _get_peer_llm(config),
+            _build_peer_prompt(business),
+            PeerSentimentOutput,
+            token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            reserved_output_tokens=config.max_output_tokens
+            or DEFAULT_MAX_OUTPUT_TOKENS,
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
+
+
+async def aget_peer_sentiment(
+    business: str,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[PeerSentimentOutput, AgentMetrics]:
+    """Async variant of get_peer_sentiment."""
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.peer
+
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = await ainvoke_llm_with_metrics(
+            _get_peer_llm(config),
+            _build_peer_prompt(business),
+            PeerSentimentOutput,
+            token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            reserved_output_tokens=config.max_output_tokens
+            or DEFAULT_MAX_OUTPUT_TOKENS,
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
@@ -1,13 +1,54 @@
-from typing import Optional, Tuple, Type, Union
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+from cachetools import LRUCache
+from langchain_core.utils.json import parse_partial_json
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from util.logger import get_logger
 from models.metrics import TokenUsage
+from agents.shared.llm_cache import LLMCache, get_model_name, is_deterministic
+from agents.shared.token_preflight import count_prompt_tokens
+from agents.shared.tracing import traced_llm_call
 
 logger = get_logger(__name__)
 
+# Maximum number of tool calls executed concurrently for a single LLM response
+TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "5"))
+
+# LLM wrapper caches hold as many entries as get_openai_llm and
+# get_google_llm keep instances, so they do not pin llms the factories evicted
+LLM_WRAPPER_CACHE_SIZE = 64
+
+# Tool maps and tool-bound LLMs keyed by (id(llm), tool names). The base llm is
+# kept in the value so its id cannot be reused by another instance while cached.
+_BOUND_LLMS: LRUCache = LRUCache(maxsize=LLM_WRAPPER_CACHE_SIZE)
+_BOUND_LLMS_LOCK = threading.Lock()
+
+# Streamed structured output is re-parsed for a partial result once per this
+# many content chunks, since each parse walks the whole buffer so far
+PARTIAL_PARSE_INTERVAL = 16
+
+# Structured-output wrappers keyed by (id(llm), schema, method, strict), holding
+# the base llm for the same reason
+_STRUCTURED_LLMS: LRUCache = LRUCache(maxsize=LLM_WRAPPER_CACHE_SIZE)
+_STRUCTURED_LLMS_LOCK = threading.Lock()
+
 
 class TokenBudgetExceeded(Exception):
     """Raised when a token budget has been exceeded."""
@@ -50,40 +91,398 @@ def check_token_budget(
 
 def _extract_token_usage(response) -> TokenUsage:
     """Extract token usage from LangChain response."""
-    if hasattr(response, "usage_metadata") and response.usage_metadata:
+    usage_metadata = getattr(response, "usage_metadata", None)
+    if usage_metadata:
+        input_details = usage_metadata.get("input_token_details") or {}
         return TokenUsage(
-            input_tokens=response.usage_metadata.get("input_tokens", 0),
-            output_tokens=response.usage_metadata.get("output_tokens", 0),
-            total_tokens=response.usage_metadata.get("total_tokens", 0),
+            input_tokens=usage_metadata.get("input_tokens", 0),
+            output_tokens=usage_metadata.get("output_tokens", 0),
+            total_tokens=usage_metadata.get("total_tokens", 0),
+            cache_read_input_tokens=input_details.get("cache_read") or 0,
+            cache_creation_input_tokens=input_details.get("cache_creation") or 0,
         )
     # For structured output, try response_metadata
-    if hasattr(response, "response_metadata") and response.response_metadata:
-        token_usage = response.response_metadata.get("token_usage", {})
-        if token_usage:
-            return TokenUsage(
-                input_tokens=token_usage.get("prompt_tokens", 0),
-                output_tokens=token_usage.get("completion_tokens", 0),
-                total_tokens=token_usage.get("total_tokens", 0),
-            )
+    response_metadata = getattr(response, "response_metadata", None)
+    token_usage = response_metadata.get("token_usage") if response_metadata else None
+    if token_usage:
+        prompt_details = token_usage.get("prompt_tokens_details") or {}
+        return TokenUsage(
+            input_tokens=token_usage.get("prompt_tokens", 0),
+            output_tokens=token_usage.get("completion_tokens", 0),
+            total_tokens=token_usage.get("total_tokens", 0),
+            cache_read_input_tokens=prompt_details.get("cached_tokens") or 0,
+        )
+    # a fresh instance, since callers accumulate into the returned usage
     return TokenUsage()
 
 
-def _aggregate_token_usage(*usages: TokenUsage) -> TokenUsage:
-    """Aggregate multiple token usages into one."""
-    return TokenUsage(
-        input_tokens=sum(u.input_tokens for u in usages),
-        output_tokens=sum(u.output_tokens for u in usages),
-        total_tokens=sum(u.total_tokens for u in usages),
+def _serialize_tool_result(result: Any) -> str:
+    """
+    Render a tool result as the text sent back to the LLM.
+
+    Pydantic models are dumped as compact JSON by pydantic-core, dropping
+    unset fields, rather than as their much longer Python repr.
+    """
+    if isinstance(result, str):
+        return result
+    if isinstance(result, BaseModel):
+        return result.model_dump_json(exclude_none=True)
+    if isinstance(result, (dict, list)):
+        return json.dumps(result, separators=(",", ":"), default=str)
+    return str(result)
+
+
+class _ToolResult(NamedTuple):
+    """A tool result as sent to the LLM, and whether the tool failed."""
+
+    content: str
+    failed: bool
+
+
+def _has_tool_error(result: Any) -> bool:
+    """Whether a tool result reports an error, itself or in any nested model."""
+    if isinstance(result, BaseModel):
+        if getattr(result, "error", None):
+            return True
+        return any(_has_tool_error(value) for value in result.__dict__.values())
+    if isinstance(result, dict):
+        return any(_has_tool_error(value) for value in result.values())
+    if isinstance(result, (list, tuple)):
+        return any(_has_tool_error(value) for value in result)
+    return False
+
+
+def _tool_result(result: Any) -> _ToolResult:
+    return _ToolResult(_serialize_tool_result(result), _has_tool_error(result))
+
+
+def _tool_error(tool_name: str, error: Exception) -> _ToolResult:
+    logger.error(f"Tool {tool_name} failed: {error}", exc_info=True)
+    return _ToolResult(f"Error executing tool {tool_name}: {str(error)}", True)
+
+
+def _execute_tool_call(tools_map: dict, tool_call: dict) -> _ToolResult:
+    """Execute a single tool call, capturing a failure as an error result."""
+    tool_name = tool_call["name"]
+    try:
+        requested_tool = tools_map[tool_name]
+        return _tool_result(requested_tool.func(**tool_call["args"]))
+    except Exception as e:
+        return _tool_error(tool_name, e)
+
+
+async def _aexecute_tool_call(tools_map: dict, tool_call: dict) -> _ToolResult:
+    """
+    Async variant of _execute_tool_call.
+
+    Tools with a coroutine are awaited. Blocking tools run in a worker thread
+    so they do not stall the event loop.
+    """
+    tool_name = tool_call["name"]
+    try:
+        requested_tool = tools_map[tool_name]
+        coroutine = getattr(requested_tool, "coroutine", None)
+        if coroutine is not None:
+            result = await coroutine(**tool_call["args"])
+        else:
+            result = await asyncio.to_thread(requested_tool.func, **tool_call["args"])
+        return _tool_result(result)
+    except Exception as e:
+        return _tool_error(tool_name, e)
+
+
+def _execute_tool_calls(
+    tools_map: dict, tool_calls: list, parallel: bool = True
+) -> list[_ToolResult]:
+    """
+    Execute every tool call requested by the LLM.
+
+    Failures are captured as error results so that one failing tool does not
+    discard the results of the others.
+
+    Args:
+        tools_map: Mapping of tool name to tool
+        tool_calls: Tool calls from the LLM response
+        parallel: If True, execute independent tool calls concurrently
+
+    Returns:
+        Tool results in the same order as tool_calls
+    """
+    if not parallel or len(tool_calls) == 1:
+        return [_execute_tool_call(tools_map, tc) for tc in tool_calls]
+
+    results = [None] * len(tool_calls)
+    max_workers = max(1, min(TOOL_CONCURRENCY_LIMIT, len(tool_calls)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_execute_tool_call, tools_map, tc): i
+            for i, tc in enumerate(tool_calls)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+async def _aexecute_tool_calls(
+    tools_map: dict, tool_calls: list, parallel: bool = True
+) -> list[_ToolResult]:
+    """Async variant of _execute_tool_calls, gathering calls on the event loop."""
+    if not parallel or len(tool_calls) == 1:
+        return [await _aexecute_tool_call(tools_map, tc) for tc in tool_calls]
+
+    semaphore = asyncio.Semaphore(TOOL_CONCURRENCY_LIMIT)
+
+    async def execute(tool_call: dict) -> _ToolResult:
+        async with semaphore:
+            return await _aexecute_tool_call(tools_map, tool_call)
+
+    return list(await asyncio.gather(*[execute(tc) for tc in tool_calls]))
+
+
+def _prepare_tools(
+    llm, tools: Sequence, output_schema: Optional[Type[BaseModel]] = None
+) -> Tuple[dict, any]:
+    """
+    Get the tool lookup and the llm bound to tools.
+
+    Both are reused for repeat calls with the same llm and tool set, so the
+    tool schemas are serialized by bind_tools only once. When output_schema
+    is given it is bound as an extra tool, letting the model answer in the
+    same call when it needs no data.
+
+    Returns:
+        Tuple of (tool name to tool mapping, llm bound to the tools)
+    """
+    if not tools:
+        return {}, llm
+
+    key = (id(llm), tuple(sorted(tool.name for tool in tools)), output_schema)
+    with _BOUND_LLMS_LOCK:
+        cached = _BOUND_LLMS.get(key)
+    if cached is not None:
+        return cached[1], cached[2]
+
+    tools_map = {tool.name: tool for tool in tools}
+    bound = llm.bind_tools([*tools, output_schema] if output_schema else list(tools))
+    with _BOUND_LLMS_LOCK:
+        _BOUND_LLMS[key] = (llm, tools_map, bound)
+    return tools_map, bound
+
+
+def _split_answer_call(
+    response, output_schema: Optional[Type[BaseModel]]
+) -> Tuple[list, Optional[BaseModel]]:
+    """
+    Separate data tool calls from an answer given through the output schema tool.
+
+    Data tool calls take precedence, since an answer given alongside them was
+    written without their results.
+
+    Returns:
+        Tuple of (data tool calls, parsed answer or None)
+    """
+    tool_calls = getattr(response, "tool_calls", None) or []
+    if output_schema is None:
+        return tool_calls, None
+
+    data_calls = [tc for tc in tool_calls if tc["name"] != output_schema.__name__]
+    if data_calls or not tool_calls:
+        return data_calls, None
+    try:
+        return [], output_schema.model_validate(tool_calls[0]["args"])
+    except ValidationError as e:
+        logger.warning(f"Discarding malformed {output_schema.__name__} answer: {e}")
+        return [], None
+
+
+def _invoke_llm(
+    llm,
+    llm_input,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+):
+    """
+    Invoke the LLM, optionally streaming the response.
+
+    When streaming, chunks are merged back into a single message so callers can
+    read content, tool calls and usage metadata as they would from invoke.
+    """
+    if not stream:
+        return llm.invoke(llm_input)
+
+    response = None
+    for chunk in llm.stream(llm_input):
+        if on_token and isinstance(chunk.content, str) and chunk.content:
+            on_token(chunk.content)
+        response = chunk if response is None else response + chunk
+    return response
+
+
+def _emit_partial(
+    content: str, last_partial: Optional[dict], on_partial: Callable[[dict], None]
+) -> Optional[dict]:
+    """Parse streamed JSON so far and report it if it changed."""
+    partial = parse_partial_json(content)
+    if partial and partial != last_partial:
+        on_partial(partial)
+        return partial
+    return last_partial
+
+
+def _stream_structured(
+    llm,
+    prompt: str,
+    output_schema: Type[BaseModel],
+    on_partial: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Stream a JSON-schema structured response, reporting partial results.
+
+    Returns the same {"parsed", "raw"} dict as an include_raw structured call,
+    so the result goes through _finish_llm_call like any other.
+    """
+    response = None
+    last_partial = None
+    content_chunks = 0
+    for chunk in llm.bind(response_format=output_schema).stream(prompt):
+        response = chunk if response is None else response + chunk
+        if on_partial and chunk.content:
+            content_chunks += 1
+            if content_chunks % PARTIAL_PARSE_INTERVAL == 0:
+                last_partial = _emit_partial(
+                    response.content, last_partial, on_partial
+                )
+
+    if response is None:
+        return {"parsed": None, "raw": None}
+    if on_partial:
+        _emit_partial(response.content, last_partial, on_partial)
+    return {
+        "parsed": output_schema.model_validate_json(response.content),
+        "raw": response,
+    }
+
+
+async def _ainvoke_llm(
+    llm,
+    llm_input,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+):
+    """Async variant of _invoke_llm."""
+    if not stream:
+        return await llm.ainvoke(llm_input)
+
+    response = None
+    async for chunk in llm.astream(llm_input):
+        if on_token and isinstance(chunk.content, str) and chunk.content:
+            on_token(chunk.content)
+        response = chunk if response is None else response + chunk
+    return response
+
+
+def _agent_result(result, usage: TokenUsage, track_tokens: bool):
+    """Shape an agent result as (result, usage) when tracking tokens."""
+    if track_tokens:
+        return result, usage
+    return result
+
+
+def _build_agent_input(prompt: str, system_prompt: Optional[str]) -> Union[str, list]:
+    """
+    Build the first LLM input, putting a static system prompt in its own message.
+
+    Keeping the long, constant instructions as a stable leading message lets
+    providers reuse their prompt cache across calls that differ only in the
+    user prompt.
+    """
+    if system_prompt is None:
+        return prompt
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _lookup_agent_cache(
+    llm,
+    prompt: Union[str, list],
+    tools: Optional[list],
+    output_schema: Optional[Type[BaseModel]],
+    cache: Optional[LLMCache],
+) -> Tuple[Optional[str], any]:
+    """
+    Look up an agent run in the response cache.
+
+    Returns:
+        Tuple of (cache key or None, cached result or None)
+    """
+    if cache is None or not is_deterministic(llm):
+        return None, None
+    cache_key = cache.make_key(get_model_name(llm), prompt, output_schema, tools)
+    return cache_key, cache.get(cache_key, output_schema)
+
+
+def _check_agent_input_budget(
+    llm, prompt: Union[str, list], token_budget: Optional[int]
+) -> Optional[Tuple[str, TokenUsage]]:
+    """Return an error result if the prompt alone would exceed token_budget."""
+    input_tokens = count_prompt_tokens(llm, prompt) if token_budget else None
+    if input_tokens is None or check_token_budget(input_tokens, token_budget):
+        return None
+    logger.warning(
+        f"Token budget would be exceeded by input: {input_tokens}/{token_budget}"
     )
+    error_msg = f"Token budget exceeded by input: {input_tokens}/{token_budget} tokens"
+    # Report only the input since the LLM was never called
+    return error_msg, TokenUsage(input_tokens=input_tokens, total_tokens=input_tokens)
+
+
+def _build_tool_messages(
+    llm_input: Union[str, list], tool_calls: list, tool_results: list[_ToolResult]
+) -> list:
+    """Build the follow-up conversation carrying every tool result."""
+    if isinstance(llm_input, str):
+        llm_input = [{"role": "user", "content": llm_input}]
+    messages = [
+        *llm_input,
+        {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": tool_calls,
+        },
+    ]
+    for tool_call, tool_result in zip(tool_calls, tool_results):
+        messages.append(
+            {
+                "role": "tool",
+                "content": tool_result.content,
+                "tool_call_id": tool_call["id"],
+            }
+        )
+    return messages
 
 
+def _parse_structured_result(raw_result: dict, total_usage: TokenUsage) -> any:
+    """Take the parsed output of an include_raw structured call and add its usage."""
+    if "raw" in raw_result:
+        total_usage.add_(_extract_token_usage(raw_result["raw"]))
+    return raw_result["parsed"]
+
+
+@traced_llm_call("llm.run_agent")
 def run_agent_with_tools(
     llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
     prompt: str,
-    tools: list = None,
+    tools: Optional[Sequence] = None,
     output_schema: Optional[Type[BaseModel]] = None,
     track_tokens: bool = False,
     token_budget: Optional[int] = None,
+    parallel_tool_execution: bool = True,
+    cache: Optional[LLMCache] = None,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    system_prompt: Optional[str] = None,
 ) -> Union[any, Tuple[any, TokenUsage]]:
     """
     Generic agent executor that handles tool calling flow.
@@ -96,6 +495,14 @@ def run_agent_with_tools(
         track_tokens: If True, return tuple of (result, TokenUsage)
         token_budget: Optional maximum total tokens allowed for this agent execution.
                       If exceeded, stops further LLM calls and returns partial result.
+        parallel_tool_execution: If True, execute multiple tool calls from one LLM
+                                 response concurrently. If False, execute them in order.
+        cache: Optional LLM response cache. Only consulted for temperature 0 models.
+        stream: If True, stream text responses instead of blocking on completion.
+                Structured output calls are never streamed.
+        on_token: Optional callback receiving each streamed text chunk
+        system_prompt: Optional static instructions sent as a system message
+                       ahead of prompt, so providers can cache them as a prefix
 
     Returns:
         The final LLM response (structured if output_schema provided, else content string).
@@ -105,38 +512,30 @@ def run_agent_with_tools(
         TokenBudgetExceeded: If token_budget is exceeded and no partial result available
     """
     total_usage = TokenUsage()
+    llm_input = _build_agent_input(prompt, system_prompt)
 
-    try:
-        tools = tools or []
-
-        tools_map = {tool.name: tool for tool in tools}
+    cache_key, cached_result = _lookup_agent_cache(
+        llm, llm_input, tools, output_schema, cache
+    )
+    if cached_result is not None:
+        return _agent_result(cached_result, TokenUsage(cached=True), track_tokens)
 
-        llm_with_tools = llm.bind_tools(tools) if tools else llm
+    try:
+        tools_map, llm_with_tools = _prepare_tools(llm, tools, output_schema)
 
         # Check token budget before initial call
-        if token_budget:
-            try:
-                # Estimate input tokens
-                input_tokens = llm.get_num_tokens(prompt)
-                if not check_token_budget(input_tokens, token_budget):
-                    logger.warning(
-                        f"Token budget would be exceeded by input: {input_tokens}/{token_budget}"
-                    )
-                    error_msg = f"Token budget exceeded by input: {input_tokens}/{token_budget} tokens"
-                    if track_tokens:
-                        # Return empty usage since we didn't run
-                        return error_msg, TokenUsage(
-                            input_tokens=input_tokens, total_tokens=input_tokens
-                        )
-                    return error_msg
-            except Exception as e:
-                logger.warning(f"Could not estimate tokens before call: {e}")
+        budget_error = _check_agent_input_budget(llm, llm_input, token_budget)
+        if budget_error is not None:
+            return _agent_result(*budget_error, track_tokens)
 
         # initial invocation
-        response = llm_with_tools.invoke(prompt)
-        total_usage = _aggregate_token_usage(
-            total_usage, _extract_token_usage(response)
+        response = _invoke_llm(
+            llm_with_tools,
+            llm_input,
+            stream=stream and not output_schema,
+            on_token=on_token,
         )
+        total_usage.add_(_extract_token_usage(response))
 
         # Check token budget after initial call
         if not check_token_budget(total_usage.total_tokens, token_budget):
@@ -144,96 +543,334 @@ def run_agent_with_tools(
                 f"Token budget exceeded after initial call: {total_usage.total_tokens}/{token_budget}"
             )
             # Return what we have so far
-            if track_tokens:
-                return (
-                    response.content if hasattr(response, "content") else str(response)
-                ), total_usage
-            return response.content if hasattr(response, "content") else str(response)
-
-        # Check for tool calls
-        if hasattr(response, "tool_calls") and response.tool_calls:
-            tool_call = response.tool_calls[0]
-
-            # Look up which tool the LLM requested
-            requested_tool_name = tool_call["name"]
-            requested_tool = tools_map[requested_tool_name]
-
-            # Call the actual tool function
-            tool_args = tool_call["args"]
-            tool_result = requested_tool.func(**tool_args)
-
-            # Create messages for the second LLM call with tool results
-            messages = [
-                {"role": "user", "content": prompt},
-                {
-                    "role": "assistant",
-                    "content": "",
-                    "tool_calls": [response.tool_calls[0]],
-                },
-                {
-                    "role": "tool",
-                    "content": str(tool_result),
-                    "tool_call_id": tool_call["id"],
-                },
-            ]
-
-            # Second LLM call with tool results to get the analysis
-            if output_schema:
-                structured_llm = llm.with_structured_output(
-                    output_schema, include_raw=True
-                )
-                raw_result = structured_llm.invoke(messages)
-                final_response = raw_result["parsed"]
-                if "raw" in raw_result:
-                    total_usage = _aggregate_token_usage(
-                        total_usage, _extract_token_usage(raw_result["raw"])
-                    )
-                if track_tokens:
-                    return final_response, total_usage
-                return final_response
-            else:
-                final_response = llm_with_tools.invoke(messages)
-                total_usage = _aggregate_token_usage(
-                    total_usage, _extract_token_usage(final_response)
-                )
-                if track_tokens:
-                    return final_response.content, total_usage
-                return final_response.content
+            content = (
+                response.content if hasattr(response, "content") else str(response)
+            )
+            return _agent_result(content, total_usage, track_tokens)
+
+        # Execute every requested tool and send the results back for analysis
+        tool_calls, answer = _split_answer_call(response, output_schema)
+        final_input = llm_input
+        tool_failed = False
+        if tool_calls:
+            tool_results = _execute_tool_calls(
+                tools_map, tool_calls, parallel=parallel_tool_execution
+            )
+            tool_failed = any(r.failed for r in tool_results)
+            final_input = _build_tool_messages(llm_input, tool_calls, tool_results)
+
+        if answer is not None:
+            # The model answered through the output schema tool, saving a call
+            result = answer
+        elif output_schema:
+            structured_llm = _get_structured_llm(llm, output_schema)
+            result = _parse_structured_result(
+                structured_llm.invoke(final_input), total_usage
+            )
+        elif tool_calls:
+            final_response = _invoke_llm(
+                llm_with_tools, final_input, stream=stream, on_token=on_token
+            )
+            total_usage.add_(_extract_token_usage(final_response))
+            result = final_response.content
         else:
             # No tool call, return the response
-            if output_schema:
-                structured_llm = llm.with_structured_output(
-                    output_schema, include_raw=True
-                )
-                raw_result = structured_llm.invoke(prompt)
-                final_response = raw_result["parsed"]
-                if "raw" in raw_result:
-                    total_usage = _aggregate_token_usage(
-                        total_usage, _extract_token_usage(raw_result["raw"])
-                    )
-                if track_tokens:
-                    return final_response, total_usage
-                return final_response
-            else:
-                if track_tokens:
-                    return response.content, total_usage
-                return response.content
+            result = response.content
+
+        # an answer written around missing data must not outlive the outage
+        if cache_key and not tool_failed:
+            cache.set(cache_key, result)
+        return _agent_result(result, total_usage, track_tokens)
     except TokenBudgetExceeded:
         raise
     except Exception as e:
         logger.error(f"Error in run_agent_with_tools: {e}", exc_info=True)
         error_msg = f"Error executing agent: {str(e)}"
-        if track_tokens:
-            return error_msg, total_usage
-        return error_msg
+        return _agent_result(error_msg, total_usage, track_tokens)
+
+
+@traced_llm_call("llm.run_agent")
+async def arun_agent_with_tools(
+    llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
+    prompt: str,
+    tools: Optional[Sequence] = None,
+    output_schema: Optional[Type[BaseModel]] = None,
+    track_tokens: bool = False,
+    token_budget: Optional[int] = None,
+    parallel_tool_execution: bool = True,
+    cache: Optional[LLMCache] = None,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    system_prompt: Optional[str] = None,
+) -> Union[any, Tuple[any, TokenUsage]]:
+    """
+    Async variant of run_agent_with_tools.
+
+    LLM calls are awaited and tool calls are gathered on the event loop, so
+    agents running concurrently overlap their network waits. Arguments and
+    return value match run_agent_with_tools.
+    """
+    total_usage = TokenUsage()
+    llm_input = _build_agent_input(prompt, system_prompt)
+
+    # The disk cache and Gemini's count_tokens call block, so they run in a
+    # worker thread instead of on the event loop
+    cache_key, cached_result = await asyncio.to_thread(
+        _lookup_agent_cache, llm, llm_input, tools, output_schema, cache
+    )
+    if cached_result is not None:
+        return _agent_result(cached_result, TokenUsage(cached=True), track_tokens)
+
+    try:
+        tools_map, llm_with_tools = _prepare_tools(llm, tools, output_schema)
+
+        budget_error = await asyncio.to_thread(
+            _check_agent_input_budget, llm, llm_input, token_budget
+        )
+        if budget_error is not None:
+            return _agent_result(*budget_error, track_tokens)
+
+        response = await _ainvoke_llm(
+            llm_with_tools,
+            llm_input,
+            stream=stream and not output_schema,
+            on_token=on_token,
+        )
+        total_usage.add_(_extract_token_usage(response))
+
+        if not check_token_budget(total_usage.total_tokens, token_budget):
+            logger.warning(
+                f"Token budget exceeded after initial call: {total_usage.total_tokens}/{token_budget}"
+            )
+            content = (
+                response.content if hasattr(response, "content") else str(response)
+            )
+            return _agent_result(content, total_usage, track_tokens)
+
+        tool_calls, answer = _split_answer_call(response, output_schema)
+        final_input = llm_input
+        tool_failed = False
+        if tool_calls:
+            tool_results = await _aexecute_tool_calls(
+                tools_map, tool_calls, parallel=parallel_tool_execution
+            )
+            tool_failed = any(r.failed for r in tool_results)
+            final_input = _build_tool_messages(llm_input, tool_calls, tool_results)
+
+        if answer is not None:
+            # The model answered through the output schema tool, saving a call
+            result = answer
+        elif output_schema:
+            structured_llm = _get_structured_llm(llm, output_schema)
+            result = _parse_structured_result(
+                await structured_llm.ainvoke(final_input), total_usage
+            )
+        elif tool_calls:
+            final_response = await _ainvoke_llm(
+                llm_with_tools, final_input, stream=stream, on_token=on_token
+            )
+            total_usage.add_(_extract_token_usage(final_response))
+            result = final_response.content
+        else:
+            result = response.content
+
+        # an answer written around missing data must not outlive the outage
+        if cache_key and not tool_failed:
+            await asyncio.to_thread(cache.set, cache_key, result)
+        return _agent_result(result, total_usage, track_tokens)
+    except TokenBudgetExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in arun_agent_with_tools: {e}", exc_info=True)
+        error_msg = f"Error executing agent: {str(e)}"
+        return _agent_result(error_msg, total_usage, track_tokens)
+
+
+async def astream_agent_with_tools(
+    llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
+    prompt: str,
+    tools: Optional[Sequence] = None,
+    token_budget: Optional[int] = None,
+    parallel_tool_execution: bool = True,
+    cache: Optional[LLMCache] = None,
+    system_prompt: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the text answer of a tool-calling agent run as it is generated.
+
+    Runs arun_agent_with_tools with streaming on and yields each text chunk,
+    so callers can start consuming the answer before it completes. A cached
+    answer, or an error message, is yielded as a single chunk. Use
+    arun_agent_with_tools with on_token instead when token usage is needed.
+
+    Args:
+        llm: The llm model to use for the agent
+        prompt: The prompt to send to the LLM
+        tools: List of tools to bind to the LLM
+        token_budget: Optional maximum total tokens allowed for this agent execution
+        parallel_tool_execution: If True, execute multiple tool calls from one LLM
+                                 response concurrently
+        cache: Optional LLM response cache. Only consulted for temperature 0 models.
+        system_prompt: Optional static instructions sent as a system message
+
+    Yields:
+        Text chunks of the final answer
+    """
+    chunks: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def run():
+        try:
+            return await arun_agent_with_tools(
+                llm,
+                prompt,
+                tools,
+                token_budget=token_budget,
+                parallel_tool_execution=parallel_tool_execution,
+                cache=cache,
+                stream=True,
+                on_token=chunks.put_nowait,
+                system_prompt=system_prompt,
+            )
+        finally:
+            chunks.put_nowait(finished)
+
+    task = asyncio.create_task(run())
+    streamed = False
+    try:
+        while (chunk := await chunks.get()) is not finished:
+            streamed = True
+            yield chunk
+        result = await task
+        if not streamed and result:
+            yield result
+    finally:
+        # the caller stopped consuming early
+        task.cancel()
+
+
+def _prepare_llm_call(
+    llm,
+    prompt: str,
+    output_schema: Optional[Type[BaseModel]],
+    token_budget: Optional[int],
+    current_usage: int,
+    cache: Optional[LLMCache],
+    reserved_output_tokens: int = 0,
+) -> Tuple[Optional[str], any]:
+    """
+    Run the budget checks and cache lookup shared by the sync and async invokers.
+
+    Returns:
+        Tuple of (cache key or None, cached result or None)
+
+    Raises:
+        TokenBudgetExceeded: If the budget is already exceeded, or the prompt
+            and reserved output would exceed it
+    """
+    # Check if we're already over budget before making the call
+    if not check_token_budget(current_usage, token_budget):
+        logger.warning(f"Token budget already exceeded: {current_usage}/{token_budget}")
+        raise TokenBudgetExceeded(budget=token_budget, used=current_usage)
 
+    cache_key = None
+    if cache is not None and is_deterministic(llm):
+        cache_key = cache.make_key(get_model_name(llm), prompt, output_schema)
+        cached_result = cache.get(cache_key, output_schema)
+        if cached_result is not None:
+            return cache_key, cached_result
 
+    # Check if input tokens plus the reserved output would exceed budget
+    if token_budget:
+        input_tokens = count_prompt_tokens(llm, prompt)
+        if input_tokens is not None:
+            projected = current_usage + input_tokens + reserved_output_tokens
+            logger.debug(
+                f"Token preflight: {current_usage} used + {input_tokens} input + "
+                f"{reserved_output_tokens} reserved output = "
+                f"{projected}/{token_budget}"
+            )
+            if not check_token_budget(projected, token_budget):
+                logger.warning(
+                    "Token budget would be exceeded by input: "
+                    f"{projected}/{token_budget}"
+                )
+                raise TokenBudgetExceeded(budget=token_budget, used=projected)
+
+    return cache_key, None
+
+
+def _get_structured_llm(
+    llm,
+    output_schema: Type[BaseModel],
+    method: Optional[str] = None,
+    strict: Optional[bool] = None,
+):
+    """
+    Wrap the llm for structured output, returning raw responses for usage.
+
+    Wrappers are reused per (llm, schema, method, strict), so the schema is
+    converted to a tool or JSON schema definition only once.
+    """
+    key = (id(llm), output_schema, method, strict)
+    with _STRUCTURED_LLMS_LOCK:
+        cached = _STRUCTURED_LLMS.get(key)
+    if cached is not None:
+        return cached[1]
+
+    structured_kwargs = {}
+    if method is not None:
+        structured_kwargs["method"] = method
+    if strict is not None:
+        structured_kwargs["strict"] = strict
+    structured = llm.with_structured_output(
+        output_schema, include_raw=True, **structured_kwargs
+    )
+    with _STRUCTURED_LLMS_LOCK:
+        _STRUCTURED_LLMS[key] = (llm, structured)
+    return structured
+
+
+def _finish_llm_call(
+    response,
+    output_schema: Optional[Type[BaseModel]],
+    token_budget: Optional[int],
+    current_usage: int,
+    cache: Optional[LLMCache],
+    cache_key: Optional[str],
+) -> Tuple[any, TokenUsage]:
+    """Extract the result and usage from a response, then log budget and cache it."""
+    if output_schema:
+        result = response["parsed"]
+        usage = _extract_token_usage(response.get("raw"))
+    else:
+        result = response.content if hasattr(response, "content") else response
+        usage = _extract_token_usage(response)
+
+    # Log if we exceeded budget after the call
+    new_total = current_usage + usage.total_tokens
+    if not check_token_budget(new_total, token_budget):
+        logger.warning(f"Token budget exceeded after call: {new_total}/{token_budget}")
+
+    if cache_key:
+        cache.set(cache_key, result)
+
+    return result, usage
+
+
+@traced_llm_call("llm.invoke")
 def invoke_llm_with_metrics(
     llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
     prompt: str,
     output_schema: Optional[Type[BaseModel]] = None,
     token_budget: Optional[int] = None,
     current_usage: int = 0,
+    cache: Optional[LLMCache] = None,
+    method: Optional[str] = None,
+    strict: Optional[bool] = None,
+    reserved_output_tokens: int = 0,
+    stream: bool = False,
+    on_partial: Optional[Callable[[dict], None]] = None,
 ) -> Tuple[any, TokenUsage]:
     """
     Invoke LLM and return result with token usage.
@@ -246,6 +883,15 @@ def invoke_llm_with_metrics(
         output_schema: Optional Pydantic model for structured output
         token_budget: Optional maximum total tokens allowed (None = unlimited)
         current_usage: Current token usage count (for budget tracking)
+        cache: Optional LLM response cache. Only consulted for temperature 0 models.
+        method: Optional structured output method (e.g. "json_schema")
+        strict: Optional flag to enforce the output schema server-side
+        reserved_output_tokens: Output tokens to set aside when checking the
+                                prompt against token_budget before the call
+        stream: If True, stream the response instead of blocking on completion.
+                Structured output is requested as a JSON-schema response format.
+        on_partial: Optional callback receiving the partially parsed structured
+                    output as a dict while streaming
 
     Returns:
         Tuple of (result, TokenUsage)
@@ -253,49 +899,89 @@ def invoke_llm_with_metrics(
     Raises:
         TokenBudgetExceeded: If token_budget is specified and would be exceeded
     """
-    # Check if we're already over budget before making the call
-    if not check_token_budget(current_usage, token_budget):
-        logger.warning(f"Token budget already exceeded: {current_usage}/{token_budget}")
-        raise TokenBudgetExceeded(budget=token_budget, used=current_usage)
-
-    # Check if input tokens would exceed budget
-    if token_budget:
-        try:
-            input_tokens = llm.get_num_tokens(prompt)
-            if not check_token_budget(current_usage + input_tokens, token_budget):
-                logger.warning(
-                    f"Token budget would be exceeded by input: {current_usage + input_tokens}/{token_budget}"
-                )
-                raise TokenBudgetExceeded(
-                    budget=token_budget, used=current_usage + input_tokens
-                )
-        except AttributeError:
-            # LLM might not support get_num_tokens
-            pass
-        except Exception as e:
-            logger.warning(f"Could not estimate tokens before call: {e}")
+    cache_key, cached_result = _prepare_llm_call(
+        llm,
+        prompt,
+        output_schema,
+        token_budget,
+        current_usage,
+        cache,
+        reserved_output_tokens,
+    )
+    if cached_result is not None:
+        return cached_result, TokenUsage(cached=True)
 
     try:
-        if output_schema:
-            structured_llm = llm.with_structured_output(output_schema, include_raw=True)
-            raw_result = structured_llm.invoke(prompt)
-            result = raw_result["parsed"]
-            usage = _extract_token_usage(raw_result.get("raw"))
+        if stream and output_schema:
+            response = _stream_structured(llm, prompt, output_schema, on_partial)
+        elif stream:
+            response = _invoke_llm(llm, prompt, stream=True)
+        elif output_schema:
+            structured_llm = _get_structured_llm(llm, output_schema, method, strict)
+            response = structured_llm.invoke(prompt)
         else:
             response = llm.invoke(prompt)
-            result = response.content if hasattr(response, "content") else response
-            usage = _extract_token_usage(response)
+        return _finish_llm_call(
+            response, output_schema, token_budget, current_usage, cache, cache_key
+        )
+    except TokenBudgetExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in invoke_llm_with_metrics: {e}", exc_info=True)
+        return None, TokenUsage()
 
-        # Log if we exceeded budget after the call
-        new_total = current_usage + usage.total_tokens
-        if not check_token_budget(new_total, token_budget):
-            logger.warning(
-                f"Token budget exceeded after call: {new_total}/{token_budget}"
-            )
 
-        return result, usage
+@traced_llm_call("llm.invoke")
+async def ainvoke_llm_with_metrics(
+    llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
+    prompt: str,
+    output_schema: Optional[Type[BaseModel]] = None,
+    token_budget: Optional[int] = None,
+    current_usage: int = 0,
+    cache: Optional[LLMCache] = None,
+    method: Optional[str] = None,
+    strict: Optional[bool] = None,
+    reserved_output_tokens: int = 0,
+) -> Tuple[any, TokenUsage]:
+    """
+    Async variant of invoke_llm_with_metrics.
+
+    Awaits the LLM instead of blocking, so independent calls can overlap
+    their network waits on one event loop. Arguments and return value match
+    invoke_llm_with_metrics.
+    """
+    # The disk cache and Gemini's count_tokens call block, so they run in a
+    # worker thread instead of on the event loop
+    cache_key, cached_result = await asyncio.to_thread(
+        _prepare_llm_call,
+        llm,
+        prompt,
+        output_schema,
+        token_budget,
+        current_usage,
+        cache,
+        reserved_output_tokens,
+    )
+    if cached_result is not None:
+        return cached_result, TokenUsage(cached=True)
+
+    try:
+        if output_schema:
+            structured_llm = _get_structured_llm(llm, output_schema, method, strict)
+            response = await structured_llm.ainvoke(prompt)
+        else:
+            response = await llm.ainvoke(prompt)
+        return await asyncio.to_thread(
+            _finish_llm_call,
+            response,
+            output_schema,
+            token_budget,
+            current_usage,
+            cache,
+            cache_key,
+        )
     except TokenBudgetExceeded:
         raise
     except Exception as e:
-        logger.error(f"Error in invoke_llm_with_metrics: {e}", exc_info=True)
+        logger.error(f"Error in ainvoke_llm_with_metrics: {e}", exc_info=True)
         return None, TokenUsage()
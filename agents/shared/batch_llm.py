@@ -0,0 +1,155 @@
+"""OpenAI Batch API helpers for offline, cost-sensitive LLM work.
+
+Batch requests are billed at about half the synchronous price but may take up
+to the completion window to finish, so they suit offline evaluation runs and
+backfills rather than the interactive research graph.
+"""
+
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from agents.shared.openai_direct import _supports_temperature, get_openai_client
+from models.metrics import TokenUsage
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Seconds between status checks while waiting on a batch
+BATCH_POLL_INTERVAL = 30
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_chat_request(
+    custom_id: str,
+    model: str,
+    prompt: str,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> dict:
+    """
+    Build one line of a batch input file.
+
+    Args:
+        custom_id: Caller-chosen id used to match the result back up
+        model: The OpenAI model name
+        prompt: The user prompt
+        temperature: Optional sampling temperature. Ignored for reasoning models.
+        max_tokens: Maximum tokens in the response (None = no limit)
+
+    Returns:
+        Batch request dict for the chat completions endpoint
+    """
+    body = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+    if temperature is not None and _supports_temperature(model):
+        body["temperature"] = temperature
+    if max_tokens is not None:
+        body["max_completion_tokens"] = max_tokens
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": body,
+    }
+
+
+def submit_batch(requests: List[dict]) -> str:
+    """
+    Upload requests as a JSONL file and start a batch over them.
+
+    Args:
+        requests: Request dicts from build_chat_request, with unique custom ids
+
+    Returns:
+        The batch id
+    """
+    client = get_openai_client()
+    payload = "\n".join(json.dumps(request) for request in requests).encode()
+    input_file = client.files.create(file=("batch.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    logger.info(f"Submitted LLM batch {batch.id} with {len(requests)} requests")
+    return batch.id
+
+
+def poll_batch(
+    batch_id: str,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Wait for a batch to finish.
+
+    Args:
+        batch_id: The batch id from submit_batch
+        poll_interval: Seconds between status checks
+        timeout: Optional maximum seconds to wait (None = wait for the window)
+
+    Returns:
+        The terminal batch status (completed, failed, expired or cancelled)
+
+    Raises:
+        TimeoutError: If timeout elapses first
+    """
+    client = get_openai_client()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        status = client.batches.retrieve(batch_id).status
+        if status in _TERMINAL_STATUSES:
+            return status
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"LLM batch {batch_id} still {status} after {timeout}s")
+        time.sleep(poll_interval)
+
+
+def _usage_from_dict(usage: Optional[dict]) -> TokenUsage:
+    """Convert a usage dict from a batch result body into TokenUsage."""
+    if not usage:
+        return TokenUsage()
+    details = usage.get("prompt_tokens_details") or {}
+    return TokenUsage(
+        input_tokens=usage.get("prompt_tokens", 0),
+        output_tokens=usage.get("completion_tokens", 0),
+        total_tokens=usage.get("total_tokens", 0),
+        cache_read_input_tokens=details.get("cached_tokens") or 0,
+    )
+
+
+def collect_batch(batch_id: str) -> Dict[str, Tuple[Optional[str], TokenUsage]]:
+    """
+    Read the results of a finished batch.
+
+    Args:
+        batch_id: The batch id from submit_batch
+
+    Returns:
+        Mapping of custom id to (response content, TokenUsage). Requests that
+        failed map to (None, TokenUsage()); requests the batch never ran are
+        missing.
+    """
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.output_file_id is None:
+        return {}
+
+    results = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logger.warning(f"LLM batch request {record['custom_id']} failed")
+            results[record["custom_id"]] = (None, TokenUsage())
+            continue
+        body = response["body"]
+        content = body["choices"][0]["message"].get("content") or ""
+        results[record["custom_id"]] = (content, _usage_from_dict(body.get("usage")))
+    return results
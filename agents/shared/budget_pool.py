@@ -0,0 +1,111 @@
+"""Request-wide token budget shared by agents that run concurrently.
+
+Agents reserve their worst-case spend before calling the LLM and commit the
+actual usage afterwards. Reservations count against the cap while in flight,
+so parallel agents cannot all start calls that together overrun it.
+"""
+
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from agents.shared.token_config import AgentTokenConfig
+
+
+class BudgetExceeded(Exception):
+    """Raised when a reservation would exceed the shared token cap."""
+
+    def __init__(self, cap: int, requested: int, available: int):
+        self.cap = cap
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Shared token budget exhausted: requested {requested}, "
+            f"{available}/{cap} tokens available"
+        )
+
+
+class Reservation:
+    """Tokens held for one LLM call until the actual usage is committed."""
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.used: Optional[int] = None
+
+    def commit(self, tokens: int) -> None:
+        """Record the tokens the call actually used."""
+        self.used = tokens
+
+
+class BudgetPool:
+    """
+    Thread-safe token pool with reserve-before-call, commit-after semantics.
+
+    Args:
+        token_cap: Maximum tokens for the pool (None = unlimited)
+    """
+
+    def __init__(self, token_cap: Optional[int] = None):
+        self.token_cap = token_cap
+        self._reserved = 0
+        self._committed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def committed(self) -> int:
+        """Tokens actually used by completed calls."""
+        with self._lock:
+            return self._committed
+
+    def available(self) -> Optional[int]:
+        """Tokens neither committed nor reserved, or None if unlimited."""
+        if self.token_cap is None:
+            return None
+        with self._lock:
+            return max(0, self.token_cap - self._committed - self._reserved)
+
+    @contextmanager
+    def reserve(self, tokens: int) -> Iterator[Reservation]:
+        """
+        Hold tokens for the duration of a call.
+
+        The reservation is always released on exit. Committed usage is added
+        to the pool; a call that raised before committing charges nothing.
+
+        Raises:
+            BudgetExceeded: If the reservation does not fit in the pool
+        """
+        with self._lock:
+            if self.token_cap is not None:
+                available = self.token_cap - self._committed - self._reserved
+                if tokens > available:
+                    raise BudgetExceeded(self.token_cap, tokens, max(0, available))
+            self._reserved += tokens
+
+        reservation = Reservation(tokens)
+        try:
+            yield reservation
+        finally:
+            with self._lock:
+                self._reserved -= tokens
+                if reservation.used is not None:
+                    self._committed += reservation.used
+
+
+def get_budget_pool(config: RunnableConfig) -> Optional[BudgetPool]:
+    """Get the request-wide token pool passed in a run's configurable, if any."""
+    return config.get("configurable", {}).get("budget_pool")
+
+
+def reserve_budget(pool: Optional[BudgetPool], tokens: int):
+    """Reserve tokens from pool, or hand out an untracked reservation if None."""
+    if pool is None:
+        return nullcontext(Reservation(tokens))
+    return pool.reserve(tokens)
+
+
+def reservation_size(config: AgentTokenConfig) -> int:
+    """Worst-case tokens one agent call can spend under its token config."""
+    return config.token_budget or config.max_output_tokens or 0
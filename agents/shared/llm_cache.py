@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Defaults for the process-wide response cache
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+
+# On-disk cache shared across processes and restarts
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "data/llm_cache.db")
+
+# Bump whenever prompts or output schemas change so stale entries stop matching
+PROMPT_VERSION = "1"
+
+
+def get_model_name(llm: Any) -> Optional[str]:
+    """Get the model name from a LangChain chat model."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None)
+
+
+def is_deterministic(llm: Any) -> bool:
+    """Only temperature 0 calls are safe to serve from an exact-match cache."""
+    return getattr(llm, "temperature", None) == 0
+
+
+class LLMCache:
+    """
+    In-memory exact-match cache for LLM responses.
+
+    Entries expire after ttl seconds and the least recently used entry is
+    evicted once max_entries is reached. Safe to share across threads.
+    """
+
+    def __init__(
+        self, ttl: int = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        model: Optional[str],
+        prompt: Any,
+        output_schema: Optional[Type[BaseModel]] = None,
+        tools: Optional[list] = None,
+    ) -> str:
+        """
+        Build a deterministic cache key for an LLM call.
+
+        Args:
+            model: The model name
+            prompt: The prompt string or message list sent to the model
+            output_schema: Optional Pydantic model for structured output
+            tools: Optional list of tools bound to the model
+
+        Returns:
+            blake2b hex digest of the call parameters and PROMPT_VERSION
+        """
+        payload = {
+            "version": PROMPT_VERSION,
+            "model": model,
+            "messages": prompt,
+            "schema": output_schema.__name__ if output_schema else None,
+            "tools": sorted(tool.name for tool in tools) if tools else [],
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode(), digest_size=32).hexdigest()
+
+    def get(self, key: str, output_schema: Optional[Type[BaseModel]] = None) -> Any:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key
+            output_schema: Pydantic model to rebuild structured results with
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+
+        try:
+            return output_schema.model_validate(value) if output_schema else value
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LLM cache entry: {e}")
+            return None
+
+    def set(self, key: str, result: Any) -> None:
+        """Store a result. None results are never cached."""
+        if result is None:
+            return
+        if isinstance(result, BaseModel):
+            result = result.model_dump(mode="json")
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+class PersistentLLMCache(LLMCache):
+    """
+    LLMCache backed by a sqlite file so entries survive restarts.
+
+    Lookups check memory first, then disk. Writes go to both. Disk entries
+    carry their own wall-clock expiry.
+    """
+
+    def __init__(
+        self,
+        ttl: int = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        db_path: str = LLM_CACHE_DB_PATH,
+    ):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.db_path = db_path
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db = conn
+        return self._db
+
+    def _load(self, key: str) -> Any:
+        try:
+            with self._db_lock:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT expires_at, value FROM llm_cache WHERE key = ?", (key,)
+                    )
+                    .fetchone()
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read LLM disk cache: {e}")
+            return None
+        if row is None or row[0] < time.time():
+            return None
+        return json.loads(row[1])
+
+    def get(self, key: str, output_schema: Optional[Type[BaseModel]] = None) -> Any:
+        result = super().get(key, output_schema)
+        if result is not None:
+            return result
+
+        value = self._load(key)
+        if value is None:
+            return None
+        # Promote to memory so repeat lookups skip the disk
+        super().set(key, value)
+        with self._lock:
+            self.hits += 1
+            self.misses -= 1
+        try:
+            return output_schema.model_validate(value) if output_schema else value
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LLM cache entry: {e}")
+            return None
+
+    def set(self, key: str, result: Any) -> None:
+        if result is None:
+            return
+        if isinstance(result, BaseModel):
+            result = result.model_dump(mode="json")
+        super().set(key, result)
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)",
+                    (key, time.time() + self.ttl, json.dumps(result)),
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Could not write LLM disk cache: {e}")
+
+    def clear(self) -> None:
+        """Remove all entries from memory and disk and reset counters."""
+        super().clear()
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not clear LLM disk cache: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMCache:
+    """Get the shared process-wide LLM response cache."""
+    return LLMCache()
+
+
+@lru_cache(maxsize=8)
+def get_persistent_llm_cache(ttl: int = LLM_CACHE_TTL) -> PersistentLLMCache:
+    """
+    Get a shared on-disk LLM response cache whose entries live for ttl seconds.
+
+    Caches with different TTLs share one database file; each entry keeps the
+    expiry it was written with.
+    """
+    return PersistentLLMCache(ttl=ttl)
@@ -1,9 +1,14 @@
+import atexit
+import importlib.util
 from functools import lru_cache
 from typing import Optional
 
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from util.event_loop import LoopLocalTransport
+
 
 LLM_MODELS = {
     "open_ai_fast": "gpt-4o-mini",
@@ -18,8 +23,51 @@ DEFAULT_LLM_TIMEOUT = 60
 # Default max tokens for LLM responses (None = no limit)
 DEFAULT_MAX_TOKENS: Optional[int] = None
 
+# Connection pool limits for the shared OpenAI HTTP client
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_MAX_CONNECTIONS = 64
+
+
+def _http_pool_options() -> dict:
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=HTTP_MAX_CONNECTIONS,
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_openai_http_client() -> httpx.Client:
+    """
+    Get the pooled HTTP client shared by every ChatOpenAI instance.
+
+    HTTP/2 is enabled when the optional h2 package is installed.
+    """
+    client = httpx.Client(**_http_pool_options(), timeout=DEFAULT_LLM_TIMEOUT)
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=1)
+def get_openai_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled async HTTP client shared by every ChatOpenAI instance.
+
+    Pooled connections belong to the event loop that opened them, so the
+    client keeps one pool per loop. Each asyncio.run, e.g. a blocking batch
+    wrapper, then opens fresh connections instead of reusing dead ones. Drive
+    such loops with util.event_loop.run so the pool is closed before the loop
+    ends rather than keeping the loop and its sockets alive.
+    """
+    return httpx.AsyncClient(
+        transport=LoopLocalTransport(**_http_pool_options()),
+        timeout=DEFAULT_LLM_TIMEOUT,
+    )
+
 
-@lru_cache(maxsize=8)
+@lru_cache(maxsize=32)
 def get_openai_llm(
     model: str,
     temperature: float = 0.0,
@@ -43,10 +91,15 @@ def get_openai_llm(
         temperature=temperature,
         request_timeout=timeout,
         max_tokens=max_tokens,
+        # report token usage on streamed responses as well
+        stream_usage=True,
+        # reuse pooled connections across models and agents
+        http_client=get_openai_http_client(),
+        http_async_client=get_openai_async_http_client(),
     )
 
 
-@lru_cache(maxsize=4)
+@lru_cache(maxsize=32)
 def get_google_llm(
     model: str,
     temperature: float = 0.0,
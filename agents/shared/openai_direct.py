@@ -0,0 +1,108 @@
+"""Thin OpenAI SDK wrapper for hot paths that need no LangChain features."""
+
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, Union
+
+import tiktoken
+from openai import OpenAI
+
+from agents.shared.llm_models import DEFAULT_LLM_TIMEOUT, get_openai_http_client
+from models.metrics import TokenUsage
+
+# Reasoning model families that only accept the default sampling temperature
+_FIXED_TEMPERATURE_PREFIXES = ("gpt-5", "o1", "o3", "o4")
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    """Get the shared OpenAI client, reusing the pooled HTTP client."""
+    return OpenAI(http_client=get_openai_http_client(), timeout=DEFAULT_LLM_TIMEOUT)
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(model: str, text: str) -> int:
+    """Count the tokens text will use as input to model."""
+    return len(_get_encoding(model).encode(text))
+
+
+def _supports_temperature(model: str) -> bool:
+    """Match ChatOpenAI, which drops non-default temperatures for reasoning models."""
+    return not model.startswith(_FIXED_TEMPERATURE_PREFIXES) or "chat" in model
+
+
+def _usage_from_response(usage) -> TokenUsage:
+    """Convert an OpenAI usage object into TokenUsage."""
+    if usage is None:
+        return TokenUsage()
+    details = getattr(usage, "prompt_tokens_details", None)
+    return TokenUsage(
+        input_tokens=usage.prompt_tokens or 0,
+        output_tokens=usage.completion_tokens or 0,
+        total_tokens=usage.total_tokens or 0,
+        cache_read_input_tokens=getattr(details, "cached_tokens", None) or 0,
+    )
+
+
+def chat_complete(
+    model: str,
+    messages: Union[str, list[dict]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    stream: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, TokenUsage]:
+    """
+    Run a chat completion directly through the OpenAI SDK.
+
+    Args:
+        model: The OpenAI model name
+        messages: A prompt string or a list of chat messages
+        temperature: Optional sampling temperature. Ignored for reasoning models,
+                     which only accept the default.
+        max_tokens: Maximum tokens in the response (None = no limit)
+        stream: If True, stream the response instead of blocking on completion
+        on_token: Optional callback receiving each streamed text chunk
+
+    Returns:
+        Tuple of (response content, TokenUsage)
+    """
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+
+    params = {"model": model, "messages": messages}
+    if temperature is not None and _supports_temperature(model):
+        params["temperature"] = temperature
+    if max_tokens is not None:
+        params["max_completion_tokens"] = max_tokens
+
+    client = get_openai_client()
+
+    if not stream:
+        response = client.chat.completions.create(**params)
+        content = response.choices[0].message.content or ""
+        return content, _usage_from_response(response.usage)
+
+    parts = []
+    usage = None
+    for chunk in client.chat.completions.create(
+        **params, stream=True, stream_options={"include_usage": True}
+    ):
+        # the final chunk carries usage and no choices
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            if on_token:
+                on_token(delta)
+
+    return "".join(parts), _usage_from_response(usage)
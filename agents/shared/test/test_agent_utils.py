@@ -0,0 +1,144 @@
+import asyncio
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import Tool
+from pydantic import BaseModel
+
+from agents.shared.agent_utils import (
+    LLM_WRAPPER_CACHE_SIZE,
+    _BOUND_LLMS,
+    _STRUCTURED_LLMS,
+    _get_structured_llm,
+    _has_tool_error,
+    arun_agent_with_tools,
+    run_agent_with_tools,
+)
+from agents.shared.llm_cache import LLMCache
+
+
+class LookupResult(BaseModel):
+    value: Optional[float] = None
+    error: Optional[str] = None
+
+
+class LookupResponse(BaseModel):
+    data: dict[str, LookupResult]
+    error: Optional[str] = None
+
+
+class FakeLLM:
+    """Deterministic chat model returning canned responses in order."""
+
+    model_name = "fake-model"
+    temperature = 0
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def bind_tools(self, tools):
+        return self
+
+    def with_structured_output(self, schema, **kwargs):
+        return self
+
+    def invoke(self, llm_input):
+        return self.responses.pop(0)
+
+    async def ainvoke(self, llm_input):
+        return self.responses.pop(0)
+
+
+def _fake_llm() -> FakeLLM:
+    return FakeLLM(
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "lookup", "args": {"ticker": "AAPL"}, "id": "c1"}],
+        ),
+        AIMessage(content="analysis"),
+    )
+
+
+def _lookup_tool(func) -> Tool:
+    return Tool(name="lookup", func=func, description="Look up a ticker")
+
+
+def _raise(ticker: str):
+    raise ConnectionError("upstream unavailable")
+
+
+class TestHasToolError:
+    def test_clean_result(self):
+        assert not _has_tool_error(LookupResult(value=1.0))
+
+    def test_top_level_error(self):
+        assert _has_tool_error(LookupResult(error="failed"))
+
+    def test_nested_error(self):
+        response = LookupResponse(
+            data={"a": LookupResult(value=1.0), "b": LookupResult(error="failed")}
+        )
+        assert _has_tool_error(response)
+
+    def test_plain_values(self):
+        assert not _has_tool_error({"value": [1, 2, 3]})
+        assert not _has_tool_error("error in the text is not a failure")
+
+
+class TestAgentResultCaching:
+    def test_caches_answer_when_tools_succeed(self):
+        cache = LLMCache()
+        tool = _lookup_tool(lambda ticker: LookupResult(value=1.0))
+
+        result = run_agent_with_tools(_fake_llm(), "prompt", [tool], cache=cache)
+
+        assert result == "analysis"
+        assert cache.stats()["size"] == 1
+
+    def test_skips_cache_when_tool_raises(self):
+        cache = LLMCache()
+
+        result = run_agent_with_tools(
+            _fake_llm(), "prompt", [_lookup_tool(_raise)], cache=cache
+        )
+
+        assert result == "analysis"
+        assert cache.stats()["size"] == 0
+
+    def test_skips_cache_when_tool_reports_error(self):
+        cache = LLMCache()
+        tool = _lookup_tool(
+            lambda ticker: LookupResponse(data={"a": LookupResult(error="timeout")})
+        )
+
+        run_agent_with_tools(_fake_llm(), "prompt", [tool], cache=cache)
+
+        assert cache.stats()["size"] == 0
+
+    def test_async_skips_cache_when_tool_raises(self):
+        cache = LLMCache()
+
+        result = asyncio.run(
+            arun_agent_with_tools(
+                _fake_llm(), "prompt", [_lookup_tool(_raise)], cache=cache
+            )
+        )
+
+        assert result == "analysis"
+        assert cache.stats()["size"] == 0
+
+
+class TestLLMWrapperCaches:
+    def test_bound_llms_stay_bounded(self):
+        tool = _lookup_tool(lambda ticker: LookupResult(value=1.0))
+
+        for _ in range(LLM_WRAPPER_CACHE_SIZE + 10):
+            run_agent_with_tools(_fake_llm(), "prompt", [tool])
+
+        assert len(_BOUND_LLMS) == LLM_WRAPPER_CACHE_SIZE
+
+    def test_structured_llms_stay_bounded(self):
+        for _ in range(LLM_WRAPPER_CACHE_SIZE + 10):
+            _get_structured_llm(FakeLLM(), LookupResult)
+
+        assert len(_STRUCTURED_LLMS) == LLM_WRAPPER_CACHE_SIZE
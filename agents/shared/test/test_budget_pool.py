@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from agents.shared.budget_pool import (
+    BudgetExceeded,
+    BudgetPool,
+    get_budget_pool,
+    reservation_size,
+    reserve_budget,
+)
+from agents.shared.token_config import AgentTokenConfig
+
+
+class TestBudgetPool:
+    def test_reservation_counts_while_in_flight(self):
+        pool = BudgetPool(1000)
+        with pool.reserve(400):
+            assert pool.available() == 600
+        assert pool.available() == 1000
+
+    def test_commit_charges_actual_usage(self):
+        pool = BudgetPool(1000)
+        with pool.reserve(400) as reservation:
+            reservation.commit(150)
+        assert pool.committed == 150
+        assert pool.available() == 850
+
+    def test_released_on_exception(self):
+        pool = BudgetPool(1000)
+        with pytest.raises(RuntimeError):
+            with pool.reserve(400):
+                raise RuntimeError("llm call failed")
+        assert pool.committed == 0
+        assert pool.available() == 1000
+
+    def test_committed_usage_kept_on_exception(self):
+        pool = BudgetPool(1000)
+        with pytest.raises(RuntimeError):
+            with pool.reserve(400) as reservation:
+                reservation.commit(300)
+                raise RuntimeError("parsing failed")
+        assert pool.committed == 300
+        assert pool.available() == 700
+
+    def test_rejects_reservation_over_cap(self):
+        pool = BudgetPool(1000)
+        with pool.reserve(700):
+            with pytest.raises(BudgetExceeded) as excinfo:
+                with pool.reserve(400):
+                    pass
+        assert excinfo.value.cap == 1000
+        assert excinfo.value.requested == 400
+        assert excinfo.value.available == 300
+
+    def test_committed_usage_reduces_later_reservations(self):
+        pool = BudgetPool(1000)
+        with pool.reserve(500) as reservation:
+            reservation.commit(900)
+        with pytest.raises(BudgetExceeded):
+            with pool.reserve(200):
+                pass
+
+    def test_unlimited_pool(self):
+        pool = BudgetPool()
+        with pool.reserve(10**9) as reservation:
+            reservation.commit(10**9)
+        assert pool.available() is None
+        assert pool.committed == 10**9
+
+    def test_concurrent_reservations_never_exceed_cap(self):
+        pool = BudgetPool(1000)
+        start = threading.Barrier(8)
+        release = threading.Event()
+        admitted, rejected = [], []
+
+        def worker():
+            start.wait()
+            try:
+                with pool.reserve(300):
+                    admitted.append(1)
+                    release.wait(timeout=5)
+            except BudgetExceeded:
+                rejected.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        # hold the admitted reservations until every worker has tried
+        deadline = time.monotonic() + 5
+        while len(admitted) + len(rejected) < 8 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(admitted) == 3
+        assert pool.available() == 1000
+
+
+class TestReserveBudget:
+    def test_without_pool(self):
+        with reserve_budget(None, 500) as reservation:
+            reservation.commit(100)
+        assert reservation.used == 100
+
+    def test_with_pool(self):
+        pool = BudgetPool(1000)
+        with reserve_budget(pool, 500) as reservation:
+            reservation.commit(100)
+        assert pool.committed == 100
+
+
+class TestHelpers:
+    def test_reservation_size_prefers_token_budget(self):
+        config = AgentTokenConfig(max_output_tokens=500, token_budget=2000)
+        assert reservation_size(config) == 2000
+
+    def test_reservation_size_falls_back_to_output_cap(self):
+        assert reservation_size(AgentTokenConfig(max_output_tokens=500)) == 500
+
+    def test_reservation_size_unlimited(self):
+        assert reservation_size(AgentTokenConfig()) == 0
+
+    def test_get_budget_pool(self):
+        pool = BudgetPool(1000)
+        assert get_budget_pool({"configurable": {"budget_pool": pool}}) is pool
+        assert get_budget_pool({}) is None
@@ -93,8 +93,11 @@ class TokenBudgetConfig(BaseModel):
     )
 
 
-# Default configuration instance - can be overridden per request
-DEFAULT_TOKEN_CONFIG = TokenBudgetConfig()
+# Default configuration instance - can be overridden per request.
+# The request cap covers every agent's budget on the longest path (industry's
+# hedge reserves twice, aggregation runs three times, evaluation twice), about
+# 52k tokens, with headroom for calls that overrun their own budget.
+DEFAULT_TOKEN_CONFIG = TokenBudgetConfig(request_budget=60000)
 
 # Preset configurations for different use cases
 BUDGET_PRESETS = {
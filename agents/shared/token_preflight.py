@@ -0,0 +1,49 @@
+"""Pre-flight prompt token counts using each model's own tokenizer."""
+
+from typing import Any, Optional
+
+from langchain_openai import ChatOpenAI
+
+from agents.shared.llm_cache import get_model_name
+from agents.shared.openai_direct import count_tokens
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Per-message formatting tokens OpenAI adds around each chat message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def count_prompt_tokens(llm: Any, prompt: Any) -> Optional[int]:
+    """
+    Count the input tokens a prompt will use before sending it.
+
+    OpenAI prompts are counted locally with the model's tiktoken encoding.
+    Other models go through LangChain's get_num_tokens, which for Gemini
+    asks the API's count_tokens endpoint rather than estimating from length.
+
+    Args:
+        llm: The chat model the prompt will be sent to
+        prompt: The prompt string or message list
+
+    Returns:
+        The input token count, or None if the model cannot count tokens
+    """
+    model = get_model_name(llm)
+    try:
+        if isinstance(llm, ChatOpenAI) and model:
+            if isinstance(prompt, str):
+                return count_tokens(model, prompt)
+            if all(isinstance(m, dict) for m in prompt):
+                return sum(
+                    count_tokens(model, m.get("content") or "")
+                    + MESSAGE_OVERHEAD_TOKENS
+                    for m in prompt
+                )
+        return llm.get_num_tokens(prompt)
+    except AttributeError:
+        # LLM might not support get_num_tokens
+        return None
+    except Exception as e:
+        logger.warning(f"Could not count prompt tokens for {model}: {e}")
+        return None
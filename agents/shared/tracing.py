@@ -0,0 +1,67 @@
+"""OpenTelemetry tracing for LLM and FRED calls.
+
+Spans go to whatever tracer provider the process configures, e.g. an OTLP
+exporter from opentelemetry-sdk. Without one, the API's no-op tracer makes
+every span a cheap no-op.
+"""
+
+import functools
+import inspect
+from typing import Any, Callable
+
+from opentelemetry import trace
+
+from agents.shared.llm_cache import get_model_name
+from models.metrics import TokenUsage
+
+tracer = trace.get_tracer("lg_equity_research")
+
+
+def _record_result(span: trace.Span, result: Any) -> None:
+    """Attach token usage to the span when the call returned (result, usage)."""
+    if not span.is_recording():
+        return
+    if (
+        isinstance(result, tuple)
+        and len(result) == 2
+        and isinstance(result[1], TokenUsage)
+    ):
+        usage = result[1]
+        span.set_attribute("llm.input_tokens", usage.input_tokens)
+        span.set_attribute("llm.output_tokens", usage.output_tokens)
+        span.set_attribute("llm.cache_hit", usage.cached)
+
+
+def traced_llm_call(span_name: str) -> Callable:
+    """
+    Wrap an LLM helper whose first argument is the chat model in a span.
+
+    The span records the model name and, for helpers returning
+    (result, TokenUsage), the input and output tokens and whether the
+    response came from the LLM cache. Works on sync and async functions.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(llm, *args, **kwargs):
+                with tracer.start_as_current_span(span_name) as span:
+                    span.set_attribute("llm.model", get_model_name(llm) or "")
+                    result = await func(llm, *args, **kwargs)
+                    _record_result(span, result)
+                    return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(llm, *args, **kwargs):
+            with tracer.start_as_current_span(span_name) as span:
+                span.set_attribute("llm.model", get_model_name(llm) or "")
+                result = func(llm, *args, **kwargs)
+                _record_result(span, result)
+                return result
+
+        return wrapper
+
+    return decorator
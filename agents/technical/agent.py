@@ -1,24 +1,64 @@
 import time
 from typing import Optional, Tuple
 
-import dotenv
-
-from agents.shared.agent_utils import run_agent_with_tools
+from agents.shared.agent_utils import arun_agent_with_tools, run_agent_with_tools
+from agents.shared.budget_pool import BudgetPool, reservation_size, reserve_budget
+from agents.shared.llm_cache import get_persistent_llm_cache
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
 from agents.technical.prompt import technical_research_prompt
 from agents.technical.tools import get_technical_analysis_tool
 from models.agent import TechnicalSentimentOutput
-from models.metrics import AgentMetrics
+from models.metrics import AgentMetrics, TokenUsage
+from util.env import load_env
 
-dotenv.load_dotenv()
+load_env()
 
 AGENT_NAME = "technical"
 
+# Static tool set, so the tool-bound llm is built once and reused
+TOOLS = (get_technical_analysis_tool,)
+
+# Indicators move with intraday prices, so only reuse responses briefly
+RESPONSE_CACHE_TTL = 5 * 60
+
+
+def _build_technical_prompt(ticker: str) -> str:
+    # the research instructions go in the system prompt
+    return f"Analyze the technical indicators for ticker: {ticker}"
+
+
+def _get_technical_llm(config: AgentTokenConfig):
+    return get_openai_llm(
+        model=LLM_MODELS["open_ai_smart"],
+        temperature=0.0,
+        max_tokens=config.max_output_tokens,
+    )
+
+
+def _build_metrics(
+    token_usage: TokenUsage, config: AgentTokenConfig, start_time: float
+) -> AgentMetrics:
+    # Check if budget was exceeded
+    budget_exceeded = False
+    if config.token_budget and token_usage.total_tokens > config.token_budget:
+        budget_exceeded = True
+
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    return AgentMetrics(
+        agent_name=AGENT_NAME,
+        latency_ms=latency_ms,
+        token_usage=token_usage,
+        model=LLM_MODELS["open_ai_smart"],
+        budget_exceeded=budget_exceeded,
+        cached=token_usage.cached,
+    )
+
 
 def get_technical_sentiment(
     ticker: str,
     token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
 ) -> Tuple[TechnicalSentimentOutput, AgentMetrics]:
     """
     Generate technical sentiment analysis for a ticker.
@@ -26,37 +66,45 @@ def get_technical_sentiment(
     Args:
         ticker: Stock ticker symbol
         token_config: Optional token configuration for this agent
+        budget_pool: Optional request-wide pool to reserve tokens from
 
     Returns:
         Tuple of (TechnicalSentimentOutput, AgentMetrics)
+
+    Raises:
+        BudgetExceeded: If budget_pool cannot cover this call
     """
     start_time = time.perf_counter()
     config = token_config or DEFAULT_TOKEN_CONFIG.technical
-    model = LLM_MODELS["open_ai_smart"]
 
-    prompt = f"{technical_research_prompt}\n\nAnalyze the technical indicators for ticker: {ticker}"
-    tools = [get_technical_analysis_tool]
-    llm = get_openai_llm(
-        model=model,
-        temperature=0.0,
-        max_tokens=config.max_output_tokens,
-    )
-    result, token_usage = run_agent_with_tools(
-        llm, prompt, tools, TechnicalSentimentOutput,
-        track_tokens=True, token_budget=config.token_budget
-    )
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = run_agent_with_tools(
+            _get_technical_llm(config), _build_technical_prompt(ticker), TOOLS,
+            TechnicalSentimentOutput, track_tokens=True,
+            token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            system_prompt=technical_research_prompt,
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
 
-    # Check if budget was exceeded
-    budget_exceeded = False
-    if config.token_budget and token_usage.total_tokens > config.token_budget:
-        budget_exceeded = True
 
-    latency_ms = (time.perf_counter() - start_time) * 1000
-    metrics = AgentMetrics(
-        agent_name=AGENT_NAME,
-        latency_ms=latency_ms,
-        token_usage=token_usage,
-        model=model,
-        budget_exceeded=budget_exceeded,
-    )
-    return result, metrics
+async def aget_technical_sentiment(
+    ticker: str,
+    token_config: Optional[AgentTokenConfig] = None,
+    budget_pool: Optional[BudgetPool] = None,
+) -> Tuple[TechnicalSentimentOutput, AgentMetrics]:
+    """Async variant of get_technical_sentiment."""
+    start_time = time.perf_counter()
+    config = token_config or DEFAULT_TOKEN_CONFIG.technical
+
+    with reserve_budget(budget_pool, reservation_size(config)) as reservation:
+        result, token_usage = await arun_agent_with_tools(
+            _get_technical_llm(config), _build_technical_prompt(ticker), TOOLS,
+            TechnicalSentimentOutput, track_tokens=True,
+            token_budget=config.token_budget,
+            cache=get_persistent_llm_cache(RESPONSE_CACHE_TTL),
+            system_prompt=technical_research_prompt,
+        )
+        reservation.commit(token_usage.total_tokens)
+    return result, _build_metrics(token_usage, config, start_time)
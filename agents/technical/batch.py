@@ -0,0 +1,87 @@
+"""Concurrent technical sentiment for many tickers, e.g. a watchlist scan.
+
+Each ticker still gets its own tool-calling run, since the indicators come
+from a per-ticker tool call. The runs are gathered on one event loop behind a
+semaphore, so a batch takes roughly as long as its slowest tickers.
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from agents.shared.llm_models import LLM_MODELS
+from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
+from agents.technical.agent import AGENT_NAME, aget_technical_sentiment
+from models.agent import TechnicalSentimentOutput
+from models.metrics import AgentMetrics, TokenUsage
+from util.event_loop import run
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Concurrent agent runs per batch, kept under the OpenAI per-minute request quota
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
+async def aget_technical_sentiment_batch(
+    tickers: List[str],
+    token_config: Optional[AgentTokenConfig] = None,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> List[Tuple[Optional[TechnicalSentimentOutput], AgentMetrics]]:
+    """
+    Get technical sentiment for several tickers concurrently.
+
+    Args:
+        tickers: Stock ticker symbols to analyze
+        token_config: Optional token configuration applied to every run
+        max_concurrency: Maximum number of agent runs in flight at once
+
+    Returns:
+        (TechnicalSentimentOutput or None, AgentMetrics) per ticker, in input
+        order. Failed tickers have a None result.
+    """
+    config = token_config or DEFAULT_TOKEN_CONFIG.technical
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(
+        ticker: str,
+    ) -> Tuple[Optional[TechnicalSentimentOutput], AgentMetrics]:
+        start_time = time.perf_counter()
+        try:
+            async with semaphore:
+                return await aget_technical_sentiment(
+                    ticker=ticker, token_config=config
+                )
+        except Exception as e:
+            logger.error(f"Technical research failed for {ticker}: {e}", exc_info=True)
+            return None, AgentMetrics(
+                agent_name=AGENT_NAME,
+                latency_ms=(time.perf_counter() - start_time) * 1000,
+                token_usage=TokenUsage(),
+                model=LLM_MODELS["open_ai_smart"],
+            )
+
+    # the same ticker listed twice is analyzed once
+    unique = list(dict.fromkeys(tickers))
+    results = dict(
+        zip(unique, await asyncio.gather(*[run_one(ticker) for ticker in unique]))
+    )
+    return [results[ticker] for ticker in tickers]
+
+
+def get_technical_sentiment_batch(
+    tickers: List[str],
+    token_config: Optional[AgentTokenConfig] = None,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> List[Tuple[Optional[TechnicalSentimentOutput], AgentMetrics]]:
+    """
+    Blocking entry point for aget_technical_sentiment_batch.
+
+    Must not be called from a running event loop; await
+    aget_technical_sentiment_batch there instead.
+    """
+    return run(
+        aget_technical_sentiment_batch(
+            tickers, token_config=token_config, max_concurrency=max_concurrency
+        )
+    )
@@ -12,6 +12,7 @@ from data.util.vector_store import (
     get_collection_stats,
     get_or_create_collection,
     collection_exists,
+    mark_collection_updated,
 )
 from data.util.embed_chunks import embed_chunks
 from util.logger import get_logger
@@ -179,5 +180,8 @@ def ingest_ticker_filings(
             )
             stats["errors"] += 1
 
+    if stats["chunks_created"]:
+        mark_collection_updated(ticker)
+
     logger.info(f"Ingestion complete for {ticker}: {stats}")
     return stats
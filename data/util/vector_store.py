@@ -1,31 +1,179 @@
+import hashlib
+import os
+import sqlite3
 import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
 
 import chromadb
+import numpy as np
 from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 
 from agents.shared.embedding_models import EMBEDDING_MODELS
+from util.logger import get_logger
+
+logger = get_logger(__name__)
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 
+# HNSW index parameters, fixed when a collection is created. Existing
+# collections keep their original parameters until they are re-ingested.
+HNSW_M = 16
+HNSW_CONSTRUCTION_EF = 64
+HNSW_SEARCH_EF = 40
+
+COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": HNSW_M,
+    "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+    "hnsw:search_ef": HNSW_SEARCH_EF,
+}
+
+
 def get_chroma_client() -> chromadb.PersistentClient:
     return chromadb.PersistentClient(path="data/chroma")
 
 
-def get_or_create_collection(ticker: str) -> chromadb.Collection:
-    client = get_chroma_client()
+# Query embeddings are reused across requests; search topics rarely change
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+_query_embedding_cache: dict = {}
+_query_embedding_lock = threading.Lock()
+
+# Query embeddings also persist on disk so they survive restarts
+QUERY_EMBEDDING_DB_PATH = os.getenv(
+    "QUERY_EMBEDDING_DB_PATH", "data/query_embeddings.db"
+)
+_query_embedding_db_lock = threading.Lock()
+
+
+# Bumped whenever a ticker's collection changes so cached search results expire
+_collection_generations: dict = {}
+_collection_generations_lock = threading.Lock()
 
-    embedding_fn = SentenceTransformerEmbeddingFunction(
+
+def get_collection_generation(ticker: str) -> int:
+    """Get the current change counter for a ticker's collection."""
+    return _collection_generations.get(ticker.lower(), 0)
+
+
+def mark_collection_updated(ticker: str) -> None:
+    """Record that a ticker's collection changed, invalidating cached searches."""
+    with _collection_generations_lock:
+        key = ticker.lower()
+        _collection_generations[key] = _collection_generations.get(key, 0) + 1
+
+
+@lru_cache(maxsize=1)
+def get_embedding_function() -> SentenceTransformerEmbeddingFunction:
+    """Get the shared embedding function so the model is loaded only once."""
+    return SentenceTransformerEmbeddingFunction(
         model_name=EMBEDDING_MODELS["hf_embed_fast"],
         device="cpu",
         normalize_embeddings=True,
     )
 
+
+@lru_cache(maxsize=1)
+def _get_query_embedding_db() -> sqlite3.Connection:
+    Path(QUERY_EMBEDDING_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(QUERY_EMBEDDING_DB_PATH, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS query_embeddings "
+        "(key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+    )
+    return conn
+
+
+def _query_embedding_key(model: str, text: str) -> str:
+    return hashlib.blake2b(f"{model}|{text}".encode(), digest_size=16).hexdigest()
+
+
+def _load_query_embeddings(model: str, queries: list[str]) -> dict:
+    """Read persisted embeddings for queries, skipping any that are missing."""
+    keys = {_query_embedding_key(model, q): q for q in queries}
+    placeholders = ",".join("?" * len(keys))
+    try:
+        with _query_embedding_db_lock:
+            rows = (
+                _get_query_embedding_db()
+                .execute(
+                    "SELECT key, embedding FROM query_embeddings "
+                    f"WHERE key IN ({placeholders})",
+                    list(keys),
+                )
+                .fetchall()
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read query embedding cache: {e}")
+        return {}
+    return {keys[key]: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+
+
+def _store_query_embeddings(model: str, embeddings: dict) -> None:
+    rows = [
+        (_query_embedding_key(model, q), np.asarray(e, dtype=np.float32).tobytes())
+        for q, e in embeddings.items()
+    ]
+    try:
+        with _query_embedding_db_lock:
+            conn = _get_query_embedding_db()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?)", rows
+                )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not write query embedding cache: {e}")
+
+
+def embed_queries(queries: list[str]) -> list:
+    """
+    Embed search queries, reusing embeddings computed by earlier calls.
+
+    Embeddings are looked up in memory, then in the on-disk cache keyed by
+    model and query text. Remaining queries are embedded together in a
+    single batch.
+
+    Args:
+        queries: Query texts to embed
+
+    Returns:
+        One embedding per query, in the same order as queries
+    """
+    with _query_embedding_lock:
+        found = {
+            q: _query_embedding_cache[q]
+            for q in queries
+            if q in _query_embedding_cache
+        }
+
+    missing = [q for q in dict.fromkeys(queries) if q not in found]
+    if missing:
+        model = EMBEDDING_MODELS["hf_embed_fast"]
+        loaded = _load_query_embeddings(model, missing)
+        computed = [q for q in missing if q not in loaded]
+        if computed:
+            embedded = dict(zip(computed, get_embedding_function()(computed)))
+            _store_query_embeddings(model, embedded)
+            loaded.update(embedded)
+
+        found.update(loaded)
+        with _query_embedding_lock:
+            if len(_query_embedding_cache) + len(loaded) > QUERY_EMBEDDING_CACHE_SIZE:
+                _query_embedding_cache.clear()
+            _query_embedding_cache.update(loaded)
+
+    return [found[q] for q in queries]
+
+
+def get_or_create_collection(ticker: str) -> chromadb.Collection:
+    client = get_chroma_client()
+
     return client.get_or_create_collection(
         name=f"filings_{ticker.lower()}",
-        embedding_function=embedding_fn,
-        metadata={"hnsw:space": "cosine"},
+        embedding_function=get_embedding_function(),
+        metadata=COLLECTION_METADATA,
     )
 
 
@@ -40,6 +188,16 @@ def collection_exists(ticker: str) -> bool:
         return False
 
 
+def get_collection_count(ticker: str) -> int:
+    """Get the number of chunks stored for a ticker (0 if there is no collection)."""
+    client = get_chroma_client()
+
+    try:
+        return client.get_collection(f"filings_{ticker.lower()}").count()
+    except Exception:
+        return 0
+
+
 def get_collection_stats(ticker: str) -> dict:
     if not collection_exists(ticker):
         return {"exists": False, "document_count": 0}
@@ -62,6 +220,7 @@ def delete_collection(ticker: str) -> bool:
 
     try:
         client.delete_collection(collection_name)
+        mark_collection_updated(ticker)
         return True
     except Exception:
         return False
@@ -1,22 +1,23 @@
-from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph, START
 from langgraph.cache.memory import InMemoryCache
-from dotenv import load_dotenv
 from fastapi import HTTPException
 
 
 from agents.evaluation.agent import evaluate_aggregated_sentement
 from agents.headline.agent import get_headline_sentiment
-from agents.industry.agent import get_industry_sentiment
-from agents.peer.agent import get_peer_sentiment
+from agents.industry.agent import aget_industry_sentiment
+from agents.peer.agent import aget_peer_sentiment
 from agents.aggregation.agent import get_aggregated_sentiment
+from agents.shared.budget_pool import get_budget_pool
 from agents.shared.token_config import get_token_config
 
 from models.metrics import RequestMetrics
 from models.state import EquityResearchState
-from agents.fundamentals.agent import get_fundamental_sentiment
-from agents.macro.agent import get_macro_sentiment
-from agents.technical.agent import get_technical_sentiment
+from agents.fundamentals.agent import aget_fundamental_sentiment
+from agents.macro.agent import aget_macro_sentiment
+from agents.technical.agent import aget_technical_sentiment
 
 from util.valiation import validate_ticker
 from util.diagrams import draw_architecture
@@ -28,13 +29,18 @@ from util.cache import (
     create_technical_cache_policy,
 )
 from util.formating import format_sentiment_output
+from util.streaming import TokenBatcher
+from util.env import load_env
 from util.logger import get_logger
 
 from subgraphs.filings_rag_subgraph import filings_rag_subgraph
 
-load_dotenv()
+load_env()
 logger = get_logger(__name__)
 
+# Maximum number of aggregation passes in the evaluation-optimization loop
+MAX_REVISION_ITERATIONS = 3
+
 
 # graph nodes
 def ticker_validation(state: EquityResearchState) -> dict:
@@ -61,15 +67,18 @@ def ticker_router(state: EquityResearchState):
         return END
 
 
-def fundamental_research_agent(state: EquityResearchState) -> dict:
+async def fundamental_research_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate fundamental research sentiment"""
     logger.info(f"Starting fundamental research for {state.ticker}")
     try:
-        config = get_token_config(state.token_preset)
-        fundamental_sentiment, agent_metrics = get_fundamental_sentiment(
+        token_config = get_token_config(state.token_preset)
+        fundamental_sentiment, agent_metrics = await aget_fundamental_sentiment(
             ticker=state.ticker,
             cached_info=state.ticker_info,  # Pass cached yfinance info to avoid duplicate API call
-            token_config=config.fundamental,
+            token_config=token_config.fundamental,
+            budget_pool=get_budget_pool(config),
         )
         logger.info(f"Completed fundamental research for {state.ticker}")
         metrics = RequestMetrics()
@@ -87,14 +96,17 @@ def fundamental_research_agent(state: EquityResearchState) -> dict:
         }
 
 
-def technical_research_agent(state: EquityResearchState) -> dict:
+async def technical_research_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate technical research sentiment"""
     logger.info(f"Starting technical research for {state.ticker}")
     try:
-        config = get_token_config(state.token_preset)
-        technical_sentiment, agent_metrics = get_technical_sentiment(
+        token_config = get_token_config(state.token_preset)
+        technical_sentiment, agent_metrics = await aget_technical_sentiment(
             ticker=state.ticker,
-            token_config=config.technical,
+            token_config=token_config.technical,
+            budget_pool=get_budget_pool(config),
         )
         logger.info(f"Completed technical research for {state.ticker}")
         metrics = RequestMetrics()
@@ -112,12 +124,16 @@ def technical_research_agent(state: EquityResearchState) -> dict:
         }
 
 
-def macro_research_agent(state: EquityResearchState) -> dict:
+async def macro_research_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate macro research sentiment"""
     logger.info("Starting macro research")
     try:
-        config = get_token_config(state.token_preset)
-        macro_sentiment, agent_metrics = get_macro_sentiment(token_config=config.macro)
+        token_config = get_token_config(state.token_preset)
+        macro_sentiment, agent_metrics = await aget_macro_sentiment(
+            token_config=token_config.macro, budget_pool=get_budget_pool(config)
+        )
         logger.info("Completed macro research")
         metrics = RequestMetrics()
         metrics.add_agent_metrics(agent_metrics)
@@ -130,15 +146,18 @@ def macro_research_agent(state: EquityResearchState) -> dict:
         return {"macro_sentiment": "Analysis unavailable due to data retrieval error."}
 
 
-def industry_research_agent(state: EquityResearchState) -> dict:
+async def industry_research_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate industry research sentiment"""
     logger.info(f"Starting industry research for {state.ticker}")
     try:
-        config = get_token_config(state.token_preset)
-        industry_sentiment, agent_metrics = get_industry_sentiment(
+        token_config = get_token_config(state.token_preset)
+        industry_sentiment, agent_metrics = await aget_industry_sentiment(
             ticker=state.ticker,
             industry=state.industry,
-            token_config=config.industry,
+            token_config=token_config.industry,
+            budget_pool=get_budget_pool(config),
         )
         logger.info(f"Completed industry research for {state.ticker}")
         metrics = RequestMetrics()
@@ -154,14 +173,17 @@ def industry_research_agent(state: EquityResearchState) -> dict:
         }
 
 
-def peer_research_agent(state: EquityResearchState) -> dict:
+async def peer_research_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate peer research sentiment"""
     logger.info(f"Starting peer research for {state.business}")
     try:
-        config = get_token_config(state.token_preset)
-        peer_sentiment, agent_metrics = get_peer_sentiment(
+        token_config = get_token_config(state.token_preset)
+        peer_sentiment, agent_metrics = await aget_peer_sentiment(
             business=state.business,
-            token_config=config.peer,
+            token_config=token_config.peer,
+            budget_pool=get_budget_pool(config),
         )
         logger.info(f"Completed peer research for {state.business}")
         metrics = RequestMetrics()
@@ -175,14 +197,17 @@ def peer_research_agent(state: EquityResearchState) -> dict:
         return {"peer_sentiment": "Analysis unavailable due to data retrieval error."}
 
 
-def headline_research_agent(state: EquityResearchState) -> dict:
+def headline_research_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate headline research sentiment"""
     logger.info(f"Starting headline research for {state.business}")
     try:
-        config = get_token_config(state.token_preset)
+        token_config = get_token_config(state.token_preset)
         headline_sentiment, agent_metrics = get_headline_sentiment(
             business=state.business,
-            token_config=config.headline,
+            token_config=token_config.headline,
+            budget_pool=get_budget_pool(config),
         )
         logger.info(f"Completed headline research for {state.business}")
         metrics = RequestMetrics()
@@ -200,19 +225,30 @@ def headline_research_agent(state: EquityResearchState) -> dict:
         }
 
 
-def sentiment_aggregator(state: EquityResearchState) -> dict:
+def sentiment_aggregator(state: EquityResearchState, config: RunnableConfig) -> dict:
     """LLM call to aggregate research findings and synthesize sentiment"""
     iteration = state.revision_iteration_count + 1
     logger.info(
         f"Starting sentiment aggregation for {state.ticker} (iteration {iteration})"
     )
     try:
-        config = get_token_config(state.token_preset)
-        combined_sentiment, agent_metrics = get_aggregated_sentiment(
-            state,
-            iteration,
-            token_config=config.aggregation,
+        token_config = get_token_config(state.token_preset)
+        # forward report tokens to callers streaming with stream_mode="custom",
+        # batched so serialization is not paid per token
+        writer = get_stream_writer()
+        batcher = TokenBatcher(
+            lambda chunk: writer({"aggregation_token": chunk, "iteration": iteration})
         )
+        try:
+            combined_sentiment, agent_metrics = get_aggregated_sentiment(
+                state,
+                iteration,
+                token_config=token_config.aggregation,
+                on_token=batcher,
+                budget_pool=get_budget_pool(config),
+            )
+        finally:
+            batcher.flush()
         logger.info(
             f"Completed sentiment aggregation for {state.ticker} (iteration {iteration})"
         )
@@ -234,16 +270,17 @@ def sentiment_aggregator(state: EquityResearchState) -> dict:
         }
 
 
-def sentiment_evaluator(state: EquityResearchState) -> dict:
+def sentiment_evaluator(state: EquityResearchState, config: RunnableConfig) -> dict:
     """LLM call to evaluate sentiment aggregator output"""
     iteration = state.revision_iteration_count + 1
     logger.info(f"Starting sentiment evaluation (iteration {iteration})")
     try:
-        config = get_token_config(state.token_preset)
+        token_config = get_token_config(state.token_preset)
         sentiment_evaluation, agent_metrics = evaluate_aggregated_sentement(
             sentiment=state.combined_sentiment,
             iteration=iteration,
-            token_config=config.evaluation,
+            token_config=token_config.evaluation,
+            budget_pool=get_budget_pool(config),
         )
         logger.info(f"Completed sentiment evaluation (iteration {iteration})")
         metrics = RequestMetrics()
@@ -261,19 +298,27 @@ def sentiment_evaluator(state: EquityResearchState) -> dict:
         }
 
 
+def aggregation_router(state: EquityResearchState):
+    "Skip evaluation on the final pass, since its feedback could not be acted on"
+    if state.revision_iteration_count + 1 >= MAX_REVISION_ITERATIONS:
+        return "Final"
+    return "Evaluate"
+
+
 def sentiment_router(state: EquityResearchState):
     "Route back to aggregator or terminate based on evaluator feedback"
     if state.compliant == True:
         return "Compliant"
-    elif state.revision_iteration_count > 2:
+    elif state.revision_iteration_count >= MAX_REVISION_ITERATIONS:
         return "Compliant"
     else:
         return "Noncompliant"
 
 
-def run_filings_subgraph(state: EquityResearchState) -> dict:
+def run_filings_subgraph(state: EquityResearchState, config: RunnableConfig) -> dict:
     """Wrapper to run the filings subgraph and filter output to avoid state conflicts"""
-    result = filings_rag_subgraph.invoke(state)
+    # pass the config through so the subgraph shares the request's budget pool
+    result = filings_rag_subgraph.invoke(state, config)
     return {
         "filings_sentiment": result.get("filings_sentiment"),
         "filings_ingested": result.get("filings_ingested"),
@@ -368,7 +413,9 @@ graph_builder.add_edge("industry_research_agent", "aggregator")
 graph_builder.add_edge("peer_research_agent", "aggregator")
 graph_builder.add_edge("headline_research_agent", "aggregator")
 graph_builder.add_edge("filings_workflow", "aggregator")
-graph_builder.add_edge("aggregator", "evaluator")
+graph_builder.add_conditional_edges(
+    "aggregator", aggregation_router, {"Evaluate": "evaluator", "Final": END}
+)
 # evaluation-optimization feedback loop with configured iteraation count
 graph_builder.add_conditional_edges(
     "evaluator", sentiment_router, {"Compliant": END, "Noncompliant": "aggregator"}
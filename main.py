@@ -13,6 +13,8 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from graph import research_chain
+from agents.shared.budget_pool import BudgetPool
+from agents.shared.token_config import get_token_config
 from models.api import EquityResearchRequest
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -97,12 +99,21 @@ async def research_equity(request: Request, req: EquityResearchRequest):
     start_time = time.perf_counter()
     sanitized_ticker = sanitize_ticker(req.ticker)
 
+    # one pool per request caps the combined spend of every LLM agent, sized
+    # from the same preset the graph configures the agents with
+    try:
+        token_config = get_token_config(req.token_preset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    budget_pool = BudgetPool(token_config.request_budget)
     res = await research_chain.ainvoke(
         {
             "ticker": sanitized_ticker,
             "trade_duration": req.trade_duration,
             "trade_direction": req.trade_direction,
-        }
+            "token_preset": req.token_preset,
+        },
+        config={"configurable": {"budget_pool": budget_pool}},
     )
 
     total_latency_ms = (time.perf_counter() - start_time) * 1000
@@ -10,3 +10,4 @@ class EquityResearchRequest(BaseModel):
     ticker: str
     trade_duration: TradeDuration
     trade_direction: TradeDirection
+    token_preset: str = "standard"
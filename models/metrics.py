@@ -10,6 +10,19 @@ class TokenUsage(BaseModel):
     input_tokens: int = 0
     output_tokens: int = 0
     total_tokens: int = 0
+    # Provider prompt-cache accounting (subsets of input_tokens)
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cached: bool = False  # Whether the response was served from the LLM cache
+
+    def add_(self, other: "TokenUsage") -> "TokenUsage":
+        """Add other's token counts to this usage in place and return self."""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.total_tokens += other.total_tokens
+        self.cache_read_input_tokens += other.cache_read_input_tokens
+        self.cache_creation_input_tokens += other.cache_creation_input_tokens
+        return self
 
 
 class AgentMetrics(BaseModel):
@@ -113,6 +126,11 @@ class RequestMetrics(BaseModel):
                 "input": self.total_input_tokens,
                 "output": self.total_output_tokens,
                 "total": self.total_tokens,
+                "cache_read": sum(
+                    m.token_usage.cache_read_input_tokens
+                    for m in self.agent_metrics.values()
+                    if not m.cached
+                ),
             },
             "agents": {
                 name: {
@@ -121,6 +139,8 @@ class RequestMetrics(BaseModel):
                         "input": m.token_usage.input_tokens,
                         "output": m.token_usage.output_tokens,
                         "total": m.token_usage.total_tokens,
+                        "cache_read": m.token_usage.cache_read_input_tokens,
+                        "cache_creation": m.token_usage.cache_creation_input_tokens,
                     },
                     "model": m.model,
                     "cached": m.cached,
@@ -1,7 +1,10 @@
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph, START
 from agents.filings.agents.query_builder import generate_search_queries
 from agents.filings.agents.retriever import get_filings_context
-from agents.filings.agents.synthesis import generate_filings_sentiment
+from agents.filings.agents.synthesis import generate_filings_sentiment_stream
+from agents.shared.budget_pool import get_budget_pool
 from agents.shared.token_config import get_token_config
 from data.util.ingest_sec_filings import ensure_filings_ingested
 from models.state import EquityResearchState
@@ -30,19 +33,22 @@ def filings_rag_ingestion(state: EquityResearchState) -> dict:
         return {"filings_ingested": False}
 
 
-def filings_rag_query_builder(state: EquityResearchState) -> dict:
+def filings_rag_query_builder(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """Generate contextual search queries based on trade context"""
     logger.info(
         f"Building search queries for {state.ticker} "
         f"({state.trade_direction.value}, {state.trade_duration.value})"
     )
     try:
-        config = get_token_config(state.token_preset)
+        token_config = get_token_config(state.token_preset)
         search_queries, agent_metrics = generate_search_queries(
             ticker=state.ticker,
             trade_direction=state.trade_direction,
             trade_duration=state.trade_duration,
-            token_config=config.filings_query_builder,
+            token_config=token_config.filings_query_builder,
+            budget_pool=get_budget_pool(config),
         )
         metrics = RequestMetrics()
         metrics.add_agent_metrics(agent_metrics)
@@ -79,15 +85,21 @@ def filings_rag_retriever(state: EquityResearchState) -> dict:
         }
 
 
-def filings_rag_synthesis_agent(state: EquityResearchState) -> dict:
+def filings_rag_synthesis_agent(
+    state: EquityResearchState, config: RunnableConfig
+) -> dict:
     """LLM call to generate SEC filings research sentiment"""
     logger.info(f"Starting filings synthesis for {state.ticker}")
     try:
-        config = get_token_config(state.token_preset)
-        filings_sentiment, agent_metrics = generate_filings_sentiment(
+        token_config = get_token_config(state.token_preset)
+        # forward partial findings to callers streaming with stream_mode="custom"
+        writer = get_stream_writer()
+        filings_sentiment, agent_metrics = generate_filings_sentiment_stream(
             ticker=state.ticker,
             context=state.filings_context,
-            token_config=config.filings_synthesis,
+            token_config=token_config.filings_synthesis,
+            on_partial=lambda partial: writer({"filings_partial": partial}),
+            budget_pool=get_budget_pool(config),
         )
         metrics = RequestMetrics()
         metrics.add_agent_metrics(agent_metrics)
@@ -137,9 +149,13 @@ filings_rag_builder.add_node(
     cache_policy=create_cache_policy(ttl=86400),
 )
 
+# ingestion and query building are independent, so run them concurrently
+# and join before retrieval
 filings_rag_builder.add_edge(START, "filings_ingestion")
-filings_rag_builder.add_edge("filings_ingestion", "filings_query_builder")
-filings_rag_builder.add_edge("filings_query_builder", "filings_retriever")
+filings_rag_builder.add_edge(START, "filings_query_builder")
+filings_rag_builder.add_edge(
+    ["filings_ingestion", "filings_query_builder"], "filings_retriever"
+)
 filings_rag_builder.add_edge("filings_retriever", "filings_synthesis_agent")
 filings_rag_builder.add_edge("filings_synthesis_agent", END)
 
@@ -0,0 +1,26 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=8)
+def _date_window(day_ordinal: int, lookback_days: int) -> Tuple[str, str]:
+    today = date.fromordinal(day_ordinal)
+    cutoff = today - timedelta(days=lookback_days)
+    return today.isoformat(), cutoff.isoformat()
+
+
+def get_date_window(lookback_days: int) -> Tuple[str, str]:
+    """
+    Get today's date and the date lookback_days earlier as YYYY-MM-DD strings.
+
+    Both dates come from one reading of the clock, and the strings are
+    formatted once per day and lookback.
+
+    Args:
+        lookback_days: Days between the cutoff date and today
+
+    Returns:
+        Tuple of (current_date, cutoff_date)
+    """
+    return _date_window(date.today().toordinal(), lookback_days)
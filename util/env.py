@@ -0,0 +1,24 @@
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def load_env() -> bool:
+    """
+    Load variables from .env into the process environment.
+
+    Only the first call searches the filesystem for a .env file, so every
+    module can call this at import without repeating the lookup. In
+    production (ENVIRONMENT=production, as set by docker-compose) the
+    variables are injected by the container, so neither dotenv nor the
+    .env lookup is loaded at all.
+
+    Returns:
+        True if a .env file was found and loaded
+    """
+    if os.getenv("ENVIRONMENT") == "production":
+        return False
+
+    import dotenv
+
+    return dotenv.load_dotenv()
@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import threading
+import weakref
+from typing import Awaitable, Callable, Coroutine, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# Every loop_local getter, so the running loop's instances can all be released
+_loop_locals: "weakref.WeakSet[Callable]" = weakref.WeakSet()
+
+
+def loop_local(
+    factory: Optional[Callable[[], T]] = None,
+    *,
+    close: Optional[Callable[[T], Awaitable[None]]] = None,
+):
+    """
+    Cache factory's result per running event loop.
+
+    asyncio primitives and pooled async connections only work on the loop
+    that created them, so each loop gets its own instance. Must be called
+    from a running loop.
+
+    An instance is not freed when its loop closes: a contended primitive or
+    an idle pooled connection references the loop, which keeps its own cache
+    entry alive. Call release_loop_resources before the loop ends, or drive
+    the coroutine with run, which does so.
+
+    Args:
+        factory: Builds the instance for the running loop
+        close: Optional coroutine function awaited on an instance when released
+    """
+    if factory is None:
+        return functools.partial(loop_local, close=close)
+
+    instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T]" = (
+        weakref.WeakKeyDictionary()
+    )
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get() -> T:
+        loop = asyncio.get_running_loop()
+        with lock:
+            instance = instances.get(loop)
+            if instance is None:
+                instance = instances[loop] = factory()
+        return instance
+
+    async def release() -> None:
+        """Drop the running loop's instance, closing it if it was created."""
+        with lock:
+            instance = instances.pop(asyncio.get_running_loop(), None)
+        if instance is not None and close is not None:
+            await close(instance)
+
+    get.release = release
+    _loop_locals.add(get)
+    return get
+
+
+async def release_loop_resources() -> None:
+    """Release every loop_local instance created on the running loop."""
+    for get in list(_loop_locals):
+        await get.release()
+
+
+def run(main: Coroutine[None, None, T]) -> T:
+    """
+    asyncio.run that releases loop_local instances before the loop closes.
+
+    Blocking wrappers around async code should use this so each call does not
+    leave its loop, connection pools and sockets referenced for good.
+    """
+
+    async def runner() -> T:
+        try:
+            return await main
+        finally:
+            await release_loop_resources()
+
+    return asyncio.run(runner())
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport keeping a separate connection pool per event loop.
+
+    A client built on it can be shared process-wide. Requests from another
+    loop, e.g. a later asyncio.run, open their own connections instead of
+    reusing ones tied to a loop that may already be closed. The running
+    loop's pool is closed by aclose or release_loop_resources.
+    """
+
+    def __init__(self, **transport_options):
+        self._transport = loop_local(
+            lambda: httpx.AsyncHTTPTransport(**transport_options),
+            close=lambda transport: transport.aclose(),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # only the running loop's connections can be closed from here
+        await self._transport.release()
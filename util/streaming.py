@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class TokenBatcher:
+    """
+    Coalesce streamed tokens into larger chunks before emitting them.
+
+    Emitting every token individually makes per-chunk serialization the
+    dominant cost when many reports stream at once. Tokens are buffered
+    until max_chunks have arrived or window_ms has elapsed since the first
+    buffered token, then emitted as one concatenated string. Call flush()
+    once the stream ends to emit any remainder.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        window_ms: float = 50,
+        max_chunks: int = 32,
+    ):
+        self._emit = emit
+        self._window_s = window_ms / 1000
+        self._max_chunks = max_chunks
+        self._buffer: List[str] = []
+        self._window_start: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, token: str) -> None:
+        with self._lock:
+            if not self._buffer:
+                self._window_start = time.monotonic()
+            self._buffer.append(token)
+            if (
+                len(self._buffer) < self._max_chunks
+                and time.monotonic() - self._window_start < self._window_s
+            ):
+                return
+            chunk = self._drain()
+        self._emit(chunk)
+
+    def flush(self) -> None:
+        """Emit any buffered tokens."""
+        with self._lock:
+            chunk = self._drain()
+        if chunk:
+            self._emit(chunk)
+
+    def _drain(self) -> str:
+        chunk = "".join(self._buffer)
+        self._buffer.clear()
+        self._window_start = None
+        return chunk